@@ -0,0 +1,682 @@
+"""Benchmarks and the multi-threaded stress test for the learning platform.
+
+Kept out of the platform script itself, which this loads as a module.
+Run it from the repository root, e.g.:
+
+    python bench.py --stress-threads 8 --stress-backend sqlite
+    python bench.py --bench-platform --students 5000 --bench-output before.json
+    python bench.py --bench-service 200 --data-file data2.json
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "case3 (5) (4).py")
+
+
+def load_app():
+    """The platform script as module "case3" (its file name cannot be imported)."""
+    if "case3" in sys.modules:
+        return sys.modules["case3"]
+    spec = importlib.util.spec_from_file_location("case3", APP_FILE)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["case3"] = module  # Before running it, so process pools can pickle its functions
+    spec.loader.exec_module(module)
+    return module
+
+
+app = load_app()
+
+
+def benchmark_password_hashing(count=64, kdf="pbkdf2_sha256", cost=None, worker_counts=None):
+    """Print accounts hashed per second for each worker count."""
+    hasher = app.PasswordHasher(kdf, cost)
+    if worker_counts is None:
+        cpus = os.cpu_count() or 1
+        worker_counts = sorted({1, 2, 4, cpus})
+    passwords = [f"password{n}" for n in range(count)]
+    print(f"{kdf} cost={hasher.cost}, {count} accounts")
+    results = {}
+    for workers in worker_counts:
+        start = time.perf_counter()
+        hasher.hash_many(passwords, workers)
+        elapsed = time.perf_counter() - start
+        results[workers] = count / elapsed
+        print(f"  {workers:>3} workers: {results[workers]:10.1f} accounts/sec")
+    return results
+
+
+def _current_rss():
+    """Resident set size of this process in bytes (peak RSS without /proc)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        if resource is None:
+            return 0
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _synthetic_student(n):
+    return {
+        "name": f"Student{n}",
+        "phone": f"{5550000000 + n}",
+        "address": f"{n} Main Street",
+        "date_of_birth": "2000-01-01",
+        "student_id": f"S{n:06d}",
+        "courses": [f"C{n % 50 + 1}"],
+        "grades": [],
+    }
+
+
+def _entity_memory_job(job):
+    # Top-level so ProcessPoolExecutor can pickle it; each run gets a fresh process
+    typed, count = job
+    before = _current_rss()
+    records = (_synthetic_student(n) for n in range(count))
+    students = app.Student.from_dicts(records) if typed else list(records)
+    rss = _current_rss() - before
+    start = time.perf_counter()
+    if typed:
+        total = sum(len(s.student_id) + len(s.courses) for s in students)
+    else:
+        total = sum(len(s["student_id"]) + len(s["courses"]) for s in students)
+    access = time.perf_counter() - start
+    return rss, access, total
+
+
+def benchmark_entity_memory(count=100_000):
+    """Compare RSS and field access time of typed Students vs plain dicts."""
+    print(f"{count} students")
+    results = {}
+    for label, typed in (("dicts", False), ("typed", True)):
+        # A separate process per layout, so memory freed by one run is not reused by the other
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            rss, access, _ = pool.submit(_entity_memory_job, (typed, count)).result()
+        results[label] = (rss, access)
+        print(f"  {label:>5}: {rss / 2**20:8.1f} MiB RSS ({rss / count:6.1f} bytes/student), "
+              f"field access {access * 1000:7.1f} ms")
+    return results
+
+
+SNAPSHOT_VARIANTS = (("json", "none"), ("compact", "none"), ("binary", "none"), ("binary", "zlib"), ("binary", "lzma"))
+
+
+def benchmark_snapshot_formats(students=10000, data_file=None, repeat=3, seed=1):
+    """Encode/decode time and size of each snapshot format.
+
+    Uses data_file if given, else a generated platform with `students`
+    students. Encode is a full write_snapshot (fsync included), decode a
+    full (eager) load; the best of `repeat` runs is reported.
+    """
+    if data_file:
+        with contextlib.redirect_stdout(io.StringIO()):
+            data, _ = app.JsonStore(data_file).load()
+    else:
+        data = app.generate_platform(students, seed=seed, hasher=app.PasswordHasher(cost=1))
+    codec = "orjson" if app.orjson is not None else "json"
+    print(f"{sum(len(data[section]) for section in app.DATA_SECTIONS)} records, compact JSON via {codec}")
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for snapshot_format, compression in SNAPSHOT_VARIANTS:
+            if compression == "lzma" and app.lzma is None:
+                continue
+            path = os.path.join(directory, f"{snapshot_format}-{compression}.data")
+            store = app.JsonStore(path, snapshot_format=snapshot_format, compression=compression)
+            encode = decode = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                store.write_snapshot(data, 0)
+                encode = min(encode, time.perf_counter() - start)
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    store.load()
+                decode = min(decode, time.perf_counter() - start)
+            label = snapshot_format if compression == "none" else f"{snapshot_format}+{compression}"
+            results[label] = {"encode_seconds": encode, "decode_seconds": decode, "bytes": os.path.getsize(path)}
+            print(f"  {label:>12}: encode {encode * 1000:8.1f} ms, decode {decode * 1000:8.1f} ms, "
+                  f"{results[label]['bytes'] / 2 ** 20:8.2f} MiB")
+    return results
+
+
+def _stress_course(name):
+    return {"name": name, "description": "", "assignments": [
+        {"assignment_name": f"Task {a}", "description": "", "due_date": "2030-01-01", "grades": []} for a in range(3)]}
+
+
+def _stress_worker(admin, n, ops, seed, enrolled, written, failures):
+    """One thread of stress_test_threads: a random mix of enroll/grade/list/create/assign."""
+    rng = random.Random(seed * 1000 + n)
+    courses = admin.data["courses"]
+    student_ids = [student["student_id"] for student in admin.data["students"]]
+    instructor_ids = [instructor["instructor_id"] for instructor in admin.data["instructors"]]
+    try:
+        for i in range(ops):
+            roll = rng.random()
+            course_position = rng.randrange(len(courses))
+            course = courses[course_position]
+            student_id = rng.choice(student_ids)
+            if roll < 0.3:
+                if admin.enroll_student(student_id, course):
+                    enrolled.append((student_id, course["course_id"]))
+            elif roll < 0.7:
+                assignment_index = rng.randrange(len(course["assignments"]))
+                assignment_name = course["assignments"][assignment_index]["assignment_name"]
+                grade = f"{n}.{i}"
+                # Recorded first: once the grade is stored, a reader may see it
+                written.append((course["course_id"], assignment_name, student_id, grade))
+                admin.record_assignment_grade(course_position, assignment_index, student_id, grade)
+                admin.save_data()
+            elif roll < 0.9:
+                view = rng.randrange(4)
+                if view == 0:
+                    admin.list_courses()
+                elif view == 1:
+                    admin.view_student_courses(student_id)
+                elif view == 2:
+                    admin.student_timetable(student_id)
+                else:
+                    app.GradebookAnalytics(admin, use_numpy=False).course_stats()
+            elif roll < 0.95:
+                # A few new course names, so threads race to create the same course
+                instructor = app.Instructor("Stress", "09123456789", "", "1980-01-01", rng.choice(instructor_ids))
+                name = course["name"] if rng.random() < 0.5 else f"Stress new {rng.randrange(4)}"
+                instructor.assign_course(_stress_course(name), admin)
+            else:
+                with admin.transaction():
+                    admin.add_course_assignment(course_position, {
+                        "assignment_name": f"Stress {n}.{i}", "description": "", "due_date": "2030-01-01", "grades": [],
+                    })
+                    admin.save_data()
+    except Exception as e:
+        failures.append(f"thread {n}: {type(e).__name__}: {e}")
+
+
+def stress_test_threads(threads=8, ops=300, courses=6, students=40, seed=1, backend="json"):
+    """Hammer one PlatformAdmin from many threads and check its invariants.
+
+    Runs on a temporary journaled data file, or a SQLite database with
+    backend="sqlite". Each thread mixes enrollments,
+    grading (each grade saved on its own), list views, transactions
+    that add assignments and instructors taking on (possibly new) courses.
+    Afterwards checks that no enrollment, grade, course or teaching
+    assignment was duplicated or lost, that the cached grade index, running
+    grade totals, leaderboards and rosters match fresh ones, and that the
+    file on disk reloads to exactly what is in memory.
+    Returns the list of problems found (empty on success).
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        data_file = os.path.join(directory, "data.json")
+
+        def open_admin():
+            if backend == "sqlite":
+                return app.PlatformAdmin(store=app.SqliteStore(os.path.join(directory, "data.db")))
+            return app.PlatformAdmin(data_file, journal=True)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            admin = open_admin()
+            with admin.transaction():
+                for c in range(courses):
+                    admin.append_record("courses", dict(_stress_course(f"Stress course {c}"), course_id=f"S{c:03d}"))
+                for i in range(max(2, threads // 2)):
+                    admin.append_record("instructors", {
+                        "name": f"Instructor{i}", "phone": "09123456789", "address": "", "date_of_birth": "1980-01-01",
+                        "instructor_id": f"I{i:03d}", "courses_taught": [],
+                    })
+                for s in range(students):
+                    admin.append_record("students", dict(_synthetic_student(s), courses=[]))
+                admin.save_data()
+            admin.grade_aggregates()  # Built up front, so the workers keep them up to date
+            admin.leaderboards()
+            admin.rosters()
+            enrolled = []
+            written = []
+            failures = []
+            workers = [threading.Thread(target=_stress_worker, args=(admin, n, ops, seed, enrolled, written, failures))
+                       for n in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+            try:
+                reloaded = open_admin()
+            except Exception as e:
+                reloaded = None
+                failures.append(f"saved data does not reload: {type(e).__name__}: {e}")
+
+        # Enrollments: each successful enroll is stored exactly once
+        expected = {}
+        for student_id, course_id in enrolled:
+            expected.setdefault(student_id, []).append(course_id)
+        for student in admin.data["students"]:
+            stored = student.get("courses", [])
+            if len(stored) != len(set(stored)):
+                failures.append(f"duplicate enrollment for student {student['student_id']}")
+            if sorted(stored) != sorted(expected.get(student["student_id"], [])):
+                failures.append(f"enrollments of student {student['student_id']} do not match the enroll calls")
+
+        # Grades: one entry per student and assignment, holding a value that was written
+        values = {}
+        for course_id, assignment_name, student_id, grade in written:
+            values.setdefault((course_id, assignment_name, student_id), set()).add(grade)
+            values.setdefault((admin.find_course_by_id(course_id)["name"], student_id), set()).add(grade)
+        graded = 0
+        for course in admin.data["courses"]:
+            for assignment in course["assignments"]:
+                seen = set()
+                for entry in assignment["grades"]:
+                    key = (course["course_id"], assignment["assignment_name"], entry["student_id"])
+                    if key in seen:
+                        failures.append(f"duplicate grade {key}")
+                    seen.add(key)
+                    if entry["grade"] not in values.get(key, ()):
+                        failures.append(f"grade {entry['grade']!r} for {key} was never written")
+                graded += len(seen)
+        if graded != len({key for key in values if len(key) == 3}):
+            failures.append(f"{graded} assignment grades stored, expected {len({key for key in values if len(key) == 3})}")
+        for student in admin.data["students"]:
+            names = [entry["course_name"] for entry in student.get("grades", [])]
+            if len(names) != len(set(names)):
+                failures.append(f"duplicate course grade for student {student['student_id']}")
+            for entry in student.get("grades", []):
+                if entry["grade"] not in values.get((entry["course_name"], student["student_id"]), ()):
+                    failures.append(f"course grade {entry['grade']!r} of student {student['student_id']} was never written")
+
+        # Courses: each name and course_id once; each instructor teaches a course at most once
+        for key in ("course_id", "name"):
+            values = [course[key] for course in admin.data["courses"]]
+            if len(values) != len(set(values)):
+                failures.append(f"duplicate course {key} in the catalog")
+        for instructor in admin.data["instructors"]:
+            taught = instructor["courses_taught"]
+            if len(taught) != len(set(taught)):
+                failures.append(f"instructor {instructor['instructor_id']} is assigned a course twice")
+            if any(admin.find_course_by_id(course_id) is None for course_id in taught):
+                failures.append(f"instructor {instructor['instructor_id']} teaches a course not in the catalog")
+
+        # The cached grade index matches one rebuilt from the data
+        def rows(store):
+            return sorted((tuple(store.record(row).values()), store.ref_col[row]) for row in range(len(store)))
+
+        cached = rows(admin.assignment_grades())
+        admin._assignment_grades = None
+        if rows(admin.assignment_grades()) != cached:
+            failures.append("cached assignment grade index differs from a rebuilt one")
+
+        # So do the running grade totals
+        def totals(aggregates):
+            return {kind: {key: {name: round(value, 6) if isinstance(value, float) else value
+                                 for name, value in running.to_dict().items()}
+                           for key, running in getattr(aggregates, kind).items() if running.count}
+                    for kind in ("students", "courses")}
+
+        cached = totals(admin.grade_aggregates())
+        admin._grade_aggregates = None
+        if totals(admin.grade_aggregates()) != cached:
+            failures.append("running grade totals differ from rebuilt ones")
+
+        def ranks(leaderboards):
+            return {key: [(rank, student_id, round(score, 6)) for rank, student_id, score in board.top(len(board))]
+                    for key, board in leaderboards.boards.items() if len(board)}
+
+        cached = ranks(admin.leaderboards())
+        admin._leaderboards = None
+        if ranks(admin.leaderboards()) != cached:
+            failures.append("leaderboards differ from rebuilt ones")
+
+        def members(rosters):
+            return {section: {course_id: sorted(ids) for course_id, ids in by_course.items() if ids}
+                    for section, by_course in rosters.items()}
+
+        cached = members(admin.rosters())
+        admin._rosters = None
+        if members(admin.rosters()) != cached:
+            failures.append("cached rosters differ from rebuilt ones")
+
+        # What was saved is what is in memory
+        def dump(data):
+            return json.dumps({section: data[section] for section in app.DATA_SECTIONS}, sort_keys=True,
+                              default=app.encode_record)
+
+        if reloaded is not None:
+            if dump(reloaded.data) != dump(admin.data):
+                failures.append("data reloaded from disk differs from memory")
+            if reloaded.version != admin.version:
+                failures.append(f"reloaded version {reloaded.version} differs from {admin.version}")
+
+    print(f"{threads} threads x {ops} operations on {backend} in {elapsed:.2f}s: {len(enrolled)} enrollments, "
+          f"{len(written)} grades, data version {admin.version}")
+    for failure in failures[:20]:
+        print(f"  FAILED: {failure}")
+    if not failures:
+        print("All invariants hold.")
+    return failures
+
+
+def _latency_stats(samples):
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "seconds": total,
+        "ops_per_sec": len(samples) / total if total else None,
+        "p50_ms": samples[min(int(0.5 * len(samples)), len(samples) - 1)] * 1000,
+        "p99_ms": samples[min(int(0.99 * len(samples)), len(samples) - 1)] * 1000,
+    }
+
+
+def _platform_bench_job(job):
+    # Top-level so ProcessPoolExecutor can pickle it; a fresh process, so the
+    # peak RSS is this run's own
+    data_file, journal, lazy, snapshot_format, compression, kdf, cost, ops, heavy_ops, loads, seed = job
+    rng = random.Random(seed)
+    results = {}
+
+    def measure(name, count, operation):
+        samples = []
+        rss = _current_rss()
+        for n in range(count):
+            start = time.perf_counter()
+            operation(n)
+            samples.append(time.perf_counter() - start)
+        results[name] = _latency_stats(samples)
+        results[name]["rss_growth_mb"] = (_current_rss() - rss) / 2 ** 20
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        hasher = app.PasswordHasher(kdf, cost)
+        start = time.perf_counter()
+        admin = app.PlatformAdmin(data_file, journal=journal, lazy=lazy, hasher=hasher,
+                              snapshot_format=snapshot_format, compression=compression)
+        first_load = time.perf_counter() - start
+        measure("load_data", loads, lambda n: admin.load_data())
+        results["load_data"]["first_ms"] = first_load * 1000
+        # Sampled up front (and reused) so picking them is not part of what is timed
+        student_ids = [student["student_id"] for student in admin.data["students"]]
+        emails = [user["email"] for user in admin.data["users"]]
+        picks = [rng.choice(student_ids) for _ in range(max(ops, heavy_ops))]
+        courses = admin.data["courses"]
+
+        def login(n):
+            admin.login(rng.choice(emails), app.GENERATED_PASSWORD)
+
+        def view_schedule(n):
+            admin.student_timetable(picks[n])
+
+        def list_grades(n):
+            admin.list_grades(student_id=picks[n])
+
+        def enroll(n):
+            # As the student menu does it: clash check, then enroll (and save)
+            course = rng.choice(courses)
+            student_data = admin.find_student(picks[n])
+            if not admin.schedule_conflicts(course, student_data.get("courses", [])):
+                admin.enroll_student(picks[n], course)
+
+        def teacher(course):
+            instructor_id = admin.rosters()["instructors"][course["course_id"]][0]
+            return app.Instructor.from_dict(admin.find_instructor(instructor_id))
+
+        def assign_grade(n):
+            course = rng.choice(courses)
+            roster = admin.rosters()["students"].get(course["course_id"]) or student_ids
+            assignment = rng.choice(course["assignments"])
+            teacher(course).assign_grade(rng.choice(roster), course["name"], assignment["assignment_name"],
+                                         str(rng.randrange(50, 101)), admin)
+
+        def create_assignment(n):
+            course = rng.choice(courses)
+            teacher(course).create_assignment(course["name"], f"Benchmark {n}", "Generated", "2024-05-01", admin)
+
+        def save_data(n):
+            position = admin._index("_students_by_id")[picks[n]]
+            admin.apply_change("set", ["students", position, "phone"], f"09{rng.randrange(10 ** 9):09d}")
+            admin.save_data()
+
+        measure("login", heavy_ops, login)
+        measure("view_schedule", ops, view_schedule)
+        measure("list_grades", ops, list_grades)
+        measure("enroll", heavy_ops, enroll)
+        measure("assign_grade", heavy_ops, assign_grade)
+        measure("create_assignment", heavy_ops, create_assignment)
+        measure("save_data", heavy_ops, save_data)
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Kilobytes on Linux
+    else:
+        peak = _current_rss()
+    return results, peak
+
+
+def benchmark_platform(students=1000, instructors=None, courses=None, enrollments=4, assignments=5, graded=0.8,
+                       ops=200, heavy_ops=20, loads=3, journal=False, lazy=False, kdf="pbkdf2_sha256", cost=None, seed=1,
+                       output=None, snapshot_format="json", compression="none"):
+    """Time the main platform operations over a generated data file.
+
+    view_schedule and list_grades run ops times. login and the writes
+    (enroll, assign_grade, create_assignment, save_data; each saves, as the
+    menus do) run heavy_ops times, since each costs a key derivation or,
+    without the journal, a rewrite of the whole file; load_data runs loads
+    times. Reports throughput, p50/p99 latency and memory as JSON
+    (written to output, or stdout), with a readable summary on stderr, so
+    results of two versions can be compared with a diff or a script.
+    """
+    sizes = dict(students=students, instructors=instructors, courses=courses, enrollments=enrollments,
+                 assignments=assignments, graded=graded, seed=seed)
+    hasher = app.PasswordHasher(kdf, cost)
+    with tempfile.TemporaryDirectory() as directory:
+        data_file = os.path.join(directory, "data.json")
+        start = time.perf_counter()
+        data = app.write_platform(data_file, journal, lazy, snapshot_format, compression, hasher=hasher, **sizes)
+        generated = time.perf_counter() - start
+        counts = {section: len(data[section]) for section in app.DATA_SECTIONS}
+        counts["enrollments"] = sum(len(student["courses"]) for student in data["students"])
+        counts["assignment_grades"] = sum(len(a["grades"]) for c in data["courses"] for a in c["assignments"])
+        file_bytes = os.path.getsize(data_file)
+        del data
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            operations, peak = pool.submit(
+                _platform_bench_job, (data_file, journal, lazy, snapshot_format, compression, kdf, hasher.cost, ops,
+                                      heavy_ops, loads, seed)).result()
+    report = {
+        "version": {"schema": app.SCHEMA_VERSION, "python": sys.version.split()[0],
+                    "script_sha256": hashlib.sha256(open(app.__file__, "rb").read()).hexdigest()},
+        "config": dict(sizes, ops=ops, heavy_ops=heavy_ops, loads=loads, journal=journal, lazy=lazy,
+                       snapshot_format=snapshot_format, compression=compression, kdf=kdf, kdf_cost=hasher.cost),
+        "data": dict(counts, file_bytes=file_bytes, generate_seconds=generated),
+        "operations": operations,
+        "peak_rss_mb": peak / 2 ** 20,
+    }
+    print(f"{counts['students']} students, {counts['courses']} courses, {counts['enrollments']} enrollments, "
+          f"{counts['assignment_grades']} grades ({file_bytes / 2 ** 20:.1f} MiB, generated in {generated:.1f}s)",
+          file=sys.stderr)
+    for name, stats in operations.items():
+        print(f"  {name:>17}: {stats['ops_per_sec'] or 0:10.1f} ops/sec, p50 {stats['p50_ms']:8.2f} ms, "
+              f"p99 {stats['p99_ms']:8.2f} ms", file=sys.stderr)
+    print(f"  peak RSS {report['peak_rss_mb']:.1f} MiB", file=sys.stderr)
+    encoded = json.dumps(report, indent=4)
+    if output:
+        with open(output, "w") as f:
+            f.write(encoded + "\n")
+    else:
+        print(encoded)
+    return report
+
+
+async def _bench_client(host, port, requests, write_every, student_ids, course_id, token, client_number, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for n in range(requests):
+            if write_every and n % write_every == write_every - 1:
+                kind = "write"
+                body = json.dumps({
+                    "course_id": course_id,
+                    "assignment_name": f"bench-{client_number}-{n}",
+                    "due_date": "2030-01-01",
+                }).encode("utf-8")
+                request = (f"POST /assignments HTTP/1.1\r\nHost: {host}\r\nAuthorization: Bearer {token}\r\n"
+                           f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+            else:
+                kind = "read"
+                student_id = student_ids[(client_number + n) % len(student_ids)]
+                request = (f"GET /students/{urllib.parse.quote(student_id)}/timetable HTTP/1.1\r\nHost: {host}\r\n"
+                           f"Authorization: Bearer {token}\r\n\r\n").encode("latin-1")
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies[kind].append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+def benchmark_service(data_file="data2.json", clients=16, requests=200, write_every=5):
+    """Throughput and latency of the HTTP service over a copy of data_file.
+
+    Each client keeps one connection open and sends requests back to back;
+    every write_every-th request creates an assignment (as an instructor
+    of the course), the rest read a student's timetable.
+    """
+    async def run():
+        with tempfile.TemporaryDirectory() as directory:
+            copy = os.path.join(directory, "data.json")
+            if os.path.exists(data_file):
+                shutil.copy(data_file, copy)
+            with contextlib.redirect_stdout(io.StringIO()):
+                admin = app.PlatformAdmin(copy, journal=True)
+            student_ids = [s["student_id"] for s in admin.data["students"]]
+            if not student_ids or not admin.data["courses"]:
+                print("The data file needs at least one student and one course.")
+                return None
+            service = app.PlatformService(admin)
+            teacher = next((
+                (user, instructor["courses_taught"][0])
+                for user in admin.data["users"] if user["role"] == "instructor"
+                for instructor in [admin.find_instructor(user["person"].get("instructor_id"))]
+                if instructor and instructor.get("courses_taught")
+            ), None)
+            if teacher is None:
+                print("No instructor teaches a course: running reads only.")
+                token, course_id, writes = None, None, 0
+            else:
+                token, course_id, writes = service.open_session(teacher[0]), teacher[1], write_every
+            server = await service.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            latencies = {"read": [], "write": []}
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                _bench_client("127.0.0.1", port, requests, writes, student_ids, course_id, token, n, latencies)
+                for n in range(clients)
+            ))
+            elapsed = time.perf_counter() - start
+            server.close()
+            await server.wait_closed()
+            service.writer.cancel()
+        total = sum(len(values) for values in latencies.values())
+        print(f"{clients} clients x {requests} requests: {total / elapsed:.0f} requests/sec "
+              f"({service.writes} writes in {service.batches} batches)")
+        for kind, values in latencies.items():
+            if values:
+                values.sort()
+                p50, p95, p99 = (values[min(int(q * len(values)), len(values) - 1)] * 1000 for q in (0.5, 0.95, 0.99))
+                print(f"  {kind:>5}: {len(values)} requests, p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms")
+        return total / elapsed
+
+    return asyncio.run(run())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark or stress test the learning platform")
+    parser.add_argument("--data-file", default="data2.json", help="JSON data file (copied) for --bench-service")
+    parser.add_argument("--journal", action="store_true", help="journal changes in --bench-platform")
+    parser.add_argument("--lazy", action="store_true", help="load sections lazily in --bench-platform")
+    parser.add_argument("--format", dest="snapshot_format", choices=app.SNAPSHOT_FORMATS, default="json",
+                        help="snapshot format for --bench-platform")
+    parser.add_argument("--compression", choices=app.SNAPSHOT_COMPRESSIONS, default="none",
+                        help="compression for --format binary")
+    parser.add_argument("--kdf", choices=app.PasswordHasher.KDFS, default="pbkdf2_sha256",
+                        help="password hashing function")
+    parser.add_argument("--kdf-cost", type=int, help="KDF iterations (pbkdf2) or n (scrypt)")
+    parser.add_argument("--bench-formats", action="store_true",
+                        help="compare snapshot formats on a synthetic platform of --students students")
+    parser.add_argument("--bench-service", type=int, metavar="REQUESTS",
+                        help="benchmark the HTTP service with REQUESTS requests per client, on a copy of --data-file")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent clients for --bench-service")
+    parser.add_argument("--bench-platform", action="store_true",
+                        help="benchmark the main operations on a synthetic platform (JSON on stdout)")
+    parser.add_argument("--students", type=int, default=1000, help="students for --bench-platform / --bench-formats")
+    parser.add_argument("--instructors", type=int, help="instructors (default: one per 50 students)")
+    parser.add_argument("--courses", type=int, help="courses (default: one per 20 students)")
+    parser.add_argument("--enrollments", type=int, default=4, help="courses each student takes")
+    parser.add_argument("--assignments", type=int, default=5, help="assignments per course")
+    parser.add_argument("--graded", type=float, default=0.8, help="fraction of assignments graded per student")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for generated data")
+    parser.add_argument("--ops", type=int, default=200, help="timed repetitions of each read operation")
+    parser.add_argument("--heavy-ops", type=int, default=20, help="timed repetitions of login and each write")
+    parser.add_argument("--bench-output", metavar="FILE", help="write the --bench-platform JSON to FILE")
+    parser.add_argument("--stress-threads", type=int, metavar="THREADS",
+                        help="run the multi-threaded stress test with THREADS threads")
+    parser.add_argument("--stress-ops", type=int, default=300, help="operations per thread for --stress-threads")
+    parser.add_argument("--stress-backend", choices=("json", "sqlite"), default="json",
+                        help="store the --stress-threads data in a journaled JSON file or in SQLite")
+    parser.add_argument("--bench-kdf", type=int, metavar="COUNT", help="benchmark password hashing with COUNT accounts")
+    parser.add_argument("--bench-entities", type=int, metavar="COUNT",
+                        help="compare memory of COUNT typed students against plain dicts")
+    args = parser.parse_args(argv)
+    try:
+        app.PasswordHasher(args.kdf, args.kdf_cost)
+    except ValueError as e:
+        parser.error(str(e))
+    return args, parser
+
+
+def main(argv=None):
+    args, parser = parse_args(argv)
+    if args.bench_formats:
+        benchmark_snapshot_formats(args.students, seed=args.seed)
+    elif args.bench_kdf:
+        benchmark_password_hashing(args.bench_kdf, args.kdf, args.kdf_cost)
+    elif args.bench_entities:
+        benchmark_entity_memory(args.bench_entities)
+    elif args.bench_platform:
+        benchmark_platform(args.students, args.instructors, args.courses, args.enrollments, args.assignments,
+                           args.graded, args.ops, args.heavy_ops, journal=args.journal, lazy=args.lazy, kdf=args.kdf,
+                           cost=args.kdf_cost, seed=args.seed, output=args.bench_output,
+                           snapshot_format=args.snapshot_format, compression=args.compression)
+    elif args.stress_threads:
+        sys.exit(1 if stress_test_threads(args.stress_threads, args.stress_ops, backend=args.stress_backend) else 0)
+    elif args.bench_service:
+        benchmark_service(args.data_file, args.clients, args.bench_service)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,1030 +1,5493 @@
-import json
-import hashlib
-from abc import ABC, abstractmethod
-from datetime import datetime
-
-
-class Person(ABC):
-    def __init__(self, name, phone, address, date_of_birth):
-        self._name = name
-        self._phone = phone
-        self._address = address
-        self._date_of_birth = date_of_birth
-
-    @abstractmethod
-    def get_details(self):
-        pass
-
-    @staticmethod
-    def validate_email(email):
-        return "@" in email
-
-    @staticmethod
-    def validate_phone(phone):
-        return phone.isdigit() and len(phone) >= 10
-    @staticmethod
-    def calculate_age(date_of_birth, current_date):
-        return current_date.year - date_of_birth.year
-
-    @staticmethod
-    def format_address(address):
-        return address.title()
-
-    @staticmethod
-    def validate_name(name):
-        return name.isalpha()
-
-    @classmethod
-    def create_from_dict(cls, data):
-        return cls(data['name'], data['phone'], data['address'], data['date_of_birth'])
-
-    @classmethod
-    def create_default(cls):
-        return cls("Default Name", "0000000000", "Default Address", None)
-    
-class User:
-    def __init__(self, id, email, password, role, person):
-        self._id = id
-        self._password = password
-        self._email = email
-        self._person = person
-        self._role = role
-
-    def get_details(self):
-        return {
-            "email": self._email,
-            "password": self._password,
-            "role": self._role,
-            "person": self._person.get_details()
-        }
-
-    def create(self):
-        # TODO
-        pass
-
-    def update(self):
-        # TODO
-        pass
-
-    def delete(self):
-        # TODO
-        pass
-
-class Admin(Person):
-    def __init__(self, name, phone, address, date_of_birth):
-        super().__init__(name, phone, address, date_of_birth)
-
-    def get_details(self):
-        return {
-            "name": self._name,
-            "phone": self._phone,
-            "address": self._address,
-            "date_of_birth": self._date_of_birth
-        }
-
-
-class Student(Person):
-    def __init__(self, name, phone, address, date_of_birth, student_id):
-        super().__init__(name, phone, address, date_of_birth)
-        self.student_id = student_id
-        self.courses = []  # List to hold enrolled courses
-        self.grades = {}  # Dictionary to hold grades for courses  
-
-    def enroll_course(self, course):
-        # Check if the course is already enrolled based on course_id
-        if course['course_id'] not in [c['course_id'] for c in self.courses]:
-            self.courses.append(course)
-            print(f"{self._name} enrolled in {course['name']}.")
-        else:
-            print(f"{self._name} is already enrolled in {course['name']}.")
-
-    def assign_grade(self, course_name, grade):
-        if course_name in self.grades:
-            print(f"{self._name} already has a grade for {course_name}.")
-        else:
-            self.grades[course_name] = grade  # Make sure this is a dictionary update
-            print(f"Assigned grade {grade} to {self._name} for course {course_name}.")
-
-
-    def get_details(self):
-        return {
-            "name": self._name,
-            "phone": self._phone,
-            "address": self._address,
-            "date_of_birth": self._date_of_birth,
-            "student_id": self.student_id,
-            "courses": self.courses,
-            "grades": self.grades,
-        }
-
-    def view_courses(self):
-        if not self.courses:
-            print(f"{self._name} is not enrolled in any courses yet.")
-        else:
-            print(f"Courses enrolled by {self._name}:")
-            for course in self.courses:
-                print(f"- {course['name']}")
-
-    def view_grades(self):
-        if not self.grades:
-            print(f"{self._name} has no grades assigned.")
-        else:
-            print(f"Grades for {self._name}:")
-            for grade_info in self.grades:  # Iterate over the list of grades
-                course_name = grade_info['course_name']
-                grade = grade_info['grade']
-                print(f"Course: {course_name}, Grade: {grade}")
-
-
-
-
-    def view_assignment_grades(self):
-        if not self.grades:
-            print(f"{self._name} has no assignment grades.")
-        else:
-            print(f"Assignment grades for {self._name}:")
-            for grade_info in self.grades:  # Iterate over the list of grades
-                course_name = grade_info['course_name']
-                grade = grade_info['grade']
-                print(f"Course: {course_name}, Grade: {grade}")
-
-
-    # View schedule for all enrolled courses
-    def view_schedule(self):
-        if not self.courses:
-            print(f"{self._name} is not enrolled in any courses yet.")
-        else:
-            print(f"Schedule for {self._name}:")
-            for course in self.courses:
-                if 'schedule' in course:
-                    schedule = course['schedule']
-                    print(f"\nCourse: {course['name']}")
-                    print(f"Start Date: {schedule['start_date']}")
-                    print(f"End Date: {schedule['end_date']}")
-                    print(f"Class Time: {schedule['class_time']}")
-                    print(f"Days: {', '.join(schedule['days'])}")
-                else:
-                    print(f"Schedule not available for {course['name']}.")
-
-
-
-
-
-class Instructor(Person):
-    def __init__(self, name, phone, address, date_of_birth, instructor_id):
-        super().__init__(name, phone, address, date_of_birth)
-        self.instructor_id = instructor_id
-        self.courses_taught = []
-        self.schedules = []  # A list to hold schedules for courses taught by the instructor
-
-    def assign_course(self, course, admin):
-        # Find the instructor data in admin
-        instructor_data = next((i for i in admin.data["instructors"] if i["instructor_id"] == self.instructor_id), None)
-        
-        if not instructor_data:
-            print(f"Instructor with ID {self.instructor_id} not found.")
-            return
-
-        # Check if the course is already assigned
-        if any(c["name"] == course["name"] for c in instructor_data["courses_taught"]):
-            print(f"{self._name} is already teaching the course {course['name']}.")
-        else:
-            # Add course to admin data
-            instructor_data["courses_taught"].append(course)
-
-            # Synchronize to self.courses_taught
-            self.courses_taught.append(course)
-
-            # Save changes to the admin's persistent data
-            admin.save_data()
-
-            print(f"Assigned course {course['name']} to instructor {self._name}.")
-
-
-    def create_assignment(self, course_name, assignment_name, description, due_date, admin):
-       
-        instructor_data = next((i for i in admin.data["instructors"] if i["instructor_id"] == self.instructor_id), None)
-        
-        if not instructor_data:
-            print(f"Instructor with ID {self.instructor_id} not found.")
-            return
-        
-        # Check if the instructor teaches the given course
-        course = next((c for c in instructor_data["courses_taught"] if c["name"] == course_name), None)
-        
-        if not course:
-            print(f"{self._name} is not teaching the course {course_name}.")
-            return
-        
-        # Create the new assignment
-        assignment = {
-            "assignment_name": assignment_name,
-            "description": description,
-            "due_date": due_date,
-            "grades": []  
-        }
-        
-        
-        if "assignments" not in course:
-            course["assignments"] = []
-        
-       
-        course["assignments"].append(assignment)
-        print(f"Assignment '{assignment_name}' added to course '{course_name}' by {self._name}.")
-        
-       
-        admin.save_data()
-
-    def assign_grade(self, student_id, course_name, assignment_name, grade, admin):
-        student_data = next((s for s in admin.data["students"] if s["student_id"] == student_id), None)
-        if not student_data:
-            print(f"Student with ID {student_id} not found.")
-            return
-
-        # Ensure that grades field exists for the student
-        if "grades" not in student_data or not isinstance(student_data["grades"], list):
-            student_data["grades"] = []  # Initialize grades as an empty list if not present
-
-        # Find the course the instructor is teaching
-        course = next((c for c in self.courses_taught if c["name"] == course_name), None)
-        if not course:
-            print(f"{self._name} is not teaching the course {course_name}.")
-            return
-
-        # Find the assignment in the course
-        assignment = next((a for a in course.get("assignments", []) if a["assignment_name"] == assignment_name), None)
-        if not assignment:
-            print(f"Assignment {assignment_name} not found in course {course_name}.")
-            return
-
-        # Ensure that grades field exists for the assignment
-        if "grades" not in assignment:
-            assignment["grades"] = []  # Initialize grades as an empty list if not present
-
-        # Check if the grade for the student already exists in the assignment
-        existing_grade = next((g for g in assignment["grades"] if g["student_id"] == student_id), None)
-        if existing_grade:
-            print(f"Grade for {student_data['name']} in assignment '{assignment_name}' already assigned.")
-            return
-
-        # Add the grade to the assignment
-        assignment["grades"].append({
-            "student_id": student_id,
-            "grade": grade
-        })
-
-        # Add the grade to the student's record
-        student_data["grades"].append({
-            "course_name": course_name,
-            "assignment_name": assignment_name,
-            "grade": grade
-        })
-
-        print(f"Grade {grade} assigned to {student_data['name']} for assignment '{assignment_name}' in course {course_name}.")
-        admin.save_data()
-
-
-
-
-    def assign_grade(self, student_id, course_name, assignment_name, grade, admin):
-        # Find the instructor data
-        instructor_data = next((i for i in admin.data["instructors"] if i["instructor_id"] == self.instructor_id), None)
-
-        if instructor_data:
-            # Check if the instructor is teaching the course
-            if any(course['name'] == course_name for course in instructor_data['courses_taught']):
-                # Find the course and assignment
-                course_data = next((course for course in instructor_data['courses_taught'] if course['name'] == course_name), None)
-                if course_data:
-                    assignment_data = next((assignment for assignment in course_data['assignments'] if assignment['assignment_name'] == assignment_name), None)
-                    if assignment_data:
-                        # Add the grade to the instructor's assignment data
-                        existing_grade = next((g for g in assignment_data.get("grades", []) if g["student_id"] == student_id), None)
-                        if existing_grade:
-                            # Update the existing grade
-                            existing_grade['grade'] = grade
-                        else:
-                            # Add new grade if none exists
-                            assignment_data.setdefault("grades", []).append({
-                                "student_id": student_id,
-                                "grade": grade
-                            })
-
-                        # Now add the grade to the student's record as well
-                        student_data = next((s for s in admin.data["students"] if s["student_id"] == student_id), None)
-                        if student_data:
-                            # Ensure grades is a list
-                            if not isinstance(student_data["grades"], list):
-                                student_data["grades"] = []  # Convert to a list if it's not one
-
-                            student_grade = next((g for g in student_data["grades"] if g["course_name"] == course_name), None)
-                            if student_grade:
-                                student_grade["grade"] = grade  # Update grade if it exists
-                            else:
-                                # Add new grade if none exists
-                                student_data["grades"].append({
-                                    "course_name": course_name,
-                                    "grade": grade
-                                })
-                            print(f"Grade {grade} assigned to student {student_id} for {assignment_name} in {course_name}.")
-                        else:
-                            print(f"Student with ID {student_id} not found.")
-                        
-                        admin.save_data()  # Save after modification
-                    else:
-                        print(f"Assignment {assignment_name} not found in course {course_name}.")
-                else:
-                    print(f"Course {course_name} not found.")
-            else:
-                print(f"{self._name} is not teaching the course {course_name}.")
-        else:
-            print(f"Instructor with ID {self.instructor_id} not found.")
-            
-            
-    def view_courses(self, admin):
-        instructor_data = next((i for i in admin.data["instructors"] if i["instructor_id"] == self.instructor_id), None)
-        if instructor_data and instructor_data["courses_taught"]:
-            print(f"Courses taught by {self._name}:")
-            for course in instructor_data["courses_taught"]:
-                print(f"- {course['name']}")
-        else:
-            print(f"{self._name} is not teaching any courses yet.")
-
-
-
-
-
-
-    def get_details(self):
-        return {
-            "name": self._name,
-            "phone": self._phone,
-            "address": self._address,
-            "date_of_birth": self._date_of_birth,
-            "instructor_id": self.instructor_id,
-            "courses_taught": self.courses_taught,
-        }
-
-    # New Method: Assign a schedule to a course
-    def assign_schedule(self, course_name, start_date, end_date, class_time, days, admin):
-        # Find the course the instructor is teaching
-        course = next((c for c in self.courses_taught if c["name"] == course_name), None)
-        if not course:
-            print(f"{self._name} is not teaching the course {course_name}.")
-            return
-        
-        # Create a new schedule
-        schedule = Schedule(course_name, start_date, end_date, class_time, days)
-        
-        # Add the schedule to the instructor's list of schedules
-        self.schedules.append(schedule)
-        print(f"Schedule assigned to course '{course_name}' by {self._name}.")
-        
-        # Save the updated data (this can be customized if needed)
-        admin.save_data()
-
-    # New Method: View the schedule of a course
-    def view_schedule(self, course_name):
-        # Find the schedule for the given course
-        schedule = next((s for s in self.schedules if s.course_id == course_name), None)
-        if not schedule:
-            print(f"No schedule found for course '{course_name}' taught by {self._name}.")
-            return
-        
-        # Print schedule details
-        print(f"Schedule for course '{course_name}' taught by {self._name}:")
-        print(f"Start Date: {schedule.start_date}")
-        print(f"End Date: {schedule.end_date}")
-        print(f"Class Time: {schedule.class_time}")
-        print(f"Days: {schedule.days}")
-
-
-
-
-
-class Grade:
-    def __init__(self, student_id, course_id, assignment_id, grade_value):
-        self.student_id = student_id
-        self.course_id = course_id
-        self.assignment_id = assignment_id
-        self.grade_value = grade_value
-
-    def get_details(self):
-        return {
-            "student_id": self.student_id,
-            "course_id": self.course_id,
-            "assignment_id": self.assignment_id,
-            "grade_value": self.grade_value,
-        }
-    
-    @staticmethod
-    def is_valid_grade(grade_value):
-        """Validate if the grade value is within a certain range."""
-        return 0 <= grade_value <= 100
-
-    @classmethod
-    def from_dict(cls, data):
-        """Create a Grade object from a dictionary."""
-        return cls(
-            data["student_id"],
-            data["course_id"],
-            data["assignment_id"],
-            data["grade_value"]
-        )
-
-
-class Assignment:
-    def __init__(self, assignment_id, title, description, due_date, course_id):
-        self.assignment_id = assignment_id
-        self.title = title
-        self.description = description
-        self.due_date = due_date
-        self.course_id = course_id
-
-    def get_details(self):
-        return {
-            "assignment_id": self.assignment_id,
-            "title": self.title,
-            "description": self.description,
-            "due_date": self.due_date,
-            "course_id": self.course_id,
-        }
-    @staticmethod
-    def is_due_soon(due_date, current_date):
-        """Check if the assignment is due soon given the current date."""
-        return (due_date - current_date).days <= 3
-
-    @classmethod
-    def from_dict(cls, data):
-        """Create an Assignment object from a dictionary."""
-        return cls(
-            data["assignment_id"],
-            data["title"],
-            data["description"],
-            data["due_date"],
-            data["course_id"]
-        )
-
-
-class Schedule:
-    def __init__(self, course_name, start_date, end_date, class_time, days):
-        self.course_name = course_name
-        self.start_date = start_date
-        self.end_date = end_date
-        self.class_time = class_time
-        self.days = days
-
-    def get_details(self):
-        return {
-            "course_id": self.course_id,
-            "start_date": self.start_date,
-            "end_date": self.end_date,
-            "class_time": self.class_time,
-            "days": self.days,
-        }
-    @staticmethod
-    def is_active(start_date, end_date, current_date):
-        """Check if the schedule is currently active."""
-        return start_date <= current_date <= end_date
-
-    @classmethod
-    def from_dict(cls, data):
-        """Create a Schedule object from a dictionary."""
-        return cls(
-            data["course_id"],
-            data["start_date"],
-            data["end_date"],
-            data["class_time"],
-            data["days"]
-        )
-
-class Course:
-    def __init__(self, course_id, name, description, schedule, duration, level, enrollments, instructor, module_list, start_date,price):
-        self.course_id = course_id
-        self.name = name
-        self.description = description
-        self.schedule = schedule
-        self.duration = duration
-        self.level = level
-        self.enrollments = enrollments
-        self.instructor = instructor
-        self.module_list = module_list
-        self.start_date = start_date
-        self.price = price
-
-    def get_course_details(self):
-        return{
-
-        }
-
-class Module:
-    def __init_(self, module_id, title, description, lessons, module_duration, order):
-        self.module_id = module_id
-        self.title = title
-        self.description = description
-        self.lessons = lessons
-        self.module_duration = module_duration
-        self.order = order
-
-    def get_module():
-        return{
-
-        }
-
-class Online_class:
-    def __init__(self, online_class_id, title, schedule, module, link, class_type, duration, recorded):
-        self.online_class_id = online_class_id
-        self.title = title
-        self.schedule = schedule
-        self.module = module
-        self.link = link
-        self.class_type = class_type
-        self.duraton = duration
-        self.recorded = recorded
-    
-    def get_online_details():
-        return{
-
-        }
-    
-class Enrollment:
-    def __init__(self, enrollment_id, student, course, status, enrollment_date, progress):
-        self.enrollment_id = enrollment_id
-        self.student = student
-        self.course = course
-        self.status = status
-        self.enrollment_date = enrollment_date
-        self.progress = progress
-
-    def get_enroll_student():
-        return{
-
-        }
-
-class PlatformAdmin:
-    def __init__(self, data_file="data2.json"):
-        self.data_file = data_file
-        self.data = {
-            "users": [],
-            "students": [],
-            "instructors": [],
-            "courses": [],
-            "assignments": [],
-            "grades": [],
-            "schedules": [],
-        }
-        self.load_data()
-
-    def add_assignment(self, assignment_id, title, description, due_date, course_id):
-        assignment = Assignment(assignment_id, title, description, due_date, course_id)
-        self.data["assignments"].append(assignment.get_details())
-        self.save_data()
-        print(f"Assignment {title} added successfully!")
-
-    def list_assignments(self, course_id=None):
-        if course_id:
-            assignments = [a for a in self.data["assignments"] if a["course_id"] == course_id]
-        else:
-            assignments = self.data["assignments"]
-
-        if assignments:
-            print("Assignments:")
-            for assignment in assignments:
-                print(f"- {assignment['title']} (ID: {assignment['assignment_id']})")
-        else:
-            print("No assignments found.")
-
-    def add_schedule(self, course_id, start_date, end_date, class_time, days):
-        schedule = Schedule(course_id, start_date, end_date, class_time, days)
-        self.data["schedules"].append(schedule.get_details())
-        self.save_data()
-        print(f"Schedule for course {course_id} added successfully!")
-
-    def list_schedules(self):
-        if self.data["schedules"]:
-            print("Course Schedules:")
-            for schedule in self.data["schedules"]:
-                print(
-                    f"- Course ID: {schedule['course_id']}, Start: {schedule['start_date']}, "
-                    f"End: {schedule['end_date']}, Time: {schedule['class_time']}, Days: {schedule['days']}"
-                )
-        else:
-            print("No schedules found.")
-
-    def add_grade(self, student_id, course_id, assignment_id, grade_value):
-        grade = Grade(student_id, course_id, assignment_id, grade_value)
-        self.data["grades"].append(grade.get_details())
-        self.save_data()
-        print(f"Grade {grade_value} added for student {student_id} in course {course_id}.")
-
-    def list_grades(self, student_id=None, course_id=None):
-        grades = self.data["grades"]
-        if student_id:
-            grades = [g for g in grades if g["student_id"] == student_id]
-        if course_id:
-            grades = [g for g in grades if g["course_id"] == course_id]
-
-        if grades:
-            print("Grades:")
-            for grade in grades:
-                print(
-                    f"- Student ID: {grade['student_id']}, Course ID: {grade['course_id']}, "
-                    f"Assignment ID: {grade['assignment_id']}, Grade: {grade['grade_value']}"
-                )
-        else:
-            print("No grades found.")
-
-    def load_data(self):
-        try:
-            with open(self.data_file, "r") as f:
-                self.data = json.load(f)
-                print("Data loaded successfully.")
-        except FileNotFoundError:
-            print("Data file not found. Starting with empty data.")
-        except json.JSONDecodeError:
-            print("Data file is corrupt. Starting with empty data.")
-
-    def save_data(self):
-        with open(self.data_file, "w") as f:
-            json.dump(self.data, f, indent=4)
-            print("Data saved successfully.")
-
-    def sign_up(self, name, email, phone, address, date_of_birth, password, role):
-        hashed_password = hashlib.sha256(password.encode()).hexdigest()
-        user_id = len(self.data["users"]) + 1
-
-        if role == "student":
-            student_id = input("Enter Student ID: ")
-            student = Student(name, phone, address, date_of_birth, student_id)
-            user = User(id=user_id, email=email, password=hashed_password, role=role, person=student)
-            self.data["users"].append(user.get_details())
-            self.data["students"].append(student.get_details())
-            self.save_data()
-            print(f"Student {name} signed up successfully with ID {student_id}!")
-        elif role == "instructor":
-            instructor_id = input("Enter Instructor ID: ")
-            instructor = Instructor(name, phone, address, date_of_birth, instructor_id)
-            user = User(id=user_id, email=email, password=hashed_password, role=role, person=instructor)
-            self.data["users"].append(user.get_details())
-            self.data["instructors"].append(instructor.get_details())
-            self.save_data()
-            print(f"Instructor {name} signed up successfully with ID {instructor_id}!")
-        elif role == "admin":
-            admin = Admin(name, phone, address, date_of_birth)
-            user = User(id=user_id, email=email, password=hashed_password, role=role, person=admin)
-            self.data["users"].append(user.get_details())
-            self.save_data()
-
-    def login(self, email, password):
-        for user in self.data["users"]:
-            if user["email"] == email:
-                hashed_password = hashlib.sha256(password.encode()).hexdigest()
-                if user["password"] == hashed_password:
-                    print(f"Welcome {user['person']['name']}!")
-                    return user["role"]
-                else:
-                    print("Invalid password.")
-                    return None
-        print("User not found.")
-        return None
-
-    def add_course(self, course):
-        self.data["courses"].append(course)
-        self.save_data()
-        print(f"Added course {course['name']}.")
-
-    def list_courses(self):
-        print("Available courses:")
-        for course in self.data["courses"]:
-            print(f"- {course['name']}")
-
-    def view_student_courses(self, student_id):
-        student = next((s for s in self.data["students"] if s["student_id"] == student_id), None)
-        if student:
-            print(f"Courses for student {student['name']}:")
-            for course in student["courses"]:
-                print(f"- {course['name']}")
-        else:
-            print("Student not found.")
-
-
-    def add_grade(self, assignment_id, student_id, grade):
-        print(f"Grade for assignment {assignment_id} and student {student_id} is now {grade}.")
-       
-
-
-def student_menu(admin, student_id):
-    while True:
-        print("\n--- Student Menu ---")
-        print("1. View Courses")
-        print("2. View Grades for Courses")
-        print("3. View Assignment Grades")
-        print("4. Enroll in a Course") 
-        print("5. View Schedule")  # New option to view schedule
-        print("6. Logout")
-        
-        choice = input("Select an option: ")
-
-        if choice == "1":
-            student_data = next((s for s in admin.data["students"] if s["student_id"] == student_id), None)
-            if student_data:
-                student = Student(
-                    student_data["name"],
-                    student_data["phone"],
-                    student_data["address"],
-                    student_data["date_of_birth"],
-                    student_data["student_id"]
-                )
-                student.courses = student_data.get("courses", [])
-                student.view_courses()
-            else:
-                print("Student not found.")
-
-        elif choice == "2":
-            student_data = next((s for s in admin.data["students"] if s["student_id"] == student_id), None)
-            if student_data:
-                student = Student(
-                    student_data["name"],
-                    student_data["phone"],
-                    student_data["address"],
-                    student_data["date_of_birth"],
-                    student_data["student_id"]
-                )
-                student.grades = student_data.get("grades", {})
-                student.view_grades()
-            else:
-                print("Student not found.")
-
-        elif choice == "3":
-            student_data = next((s for s in admin.data["students"] if s["student_id"] == student_id), None)
-            if student_data:
-                student = Student(
-                    student_data["name"],
-                    student_data["phone"],
-                    student_data["address"],
-                    student_data["date_of_birth"],
-                    student_data["student_id"]
-                )
-                student.grades = student_data.get("grades", {})
-                student.view_assignment_grades()
-            else:
-                print("Student not found.")
-
-        elif choice == "4":
-            admin.list_courses()
-            course_name = input("Enter the name of the course you want to enroll in: ")
-            course = next((c for c in admin.data["courses"] if c.get("name") == course_name), None)
-            if course:
-                student_data = next((s for s in admin.data["students"] if s["student_id"] == student_id), None)
-                if student_data:
-                    student = Student(
-                        student_data["name"],
-                        student_data["phone"],
-                        student_data["address"],
-                        student_data["date_of_birth"],
-                        student_data["student_id"]
-                    )
-                    student.enroll_course(course)
-
-                    # Here, we're appending the full course object to the student's course list, including the schedule
-                    student_data["courses"].append(course)
-                    admin.save_data()
-                    print(f"{student_data['name']} successfully enrolled in {course['name']}!")
-                else:
-                    print("Student not found.")
-            else:
-                print(f"Course with Name '{course_name}' not found.")
-
-
-        # Inside the student_menu function, when the user selects option 5 (View Schedule)
-        elif choice == "5":
-            student_data = next((s for s in admin.data["students"] if s["student_id"] == student_id), None)
-            if student_data:
-                student = Student(
-                    student_data["name"],
-                    student_data["phone"],
-                    student_data["address"],
-                    student_data["date_of_birth"],
-                    student_data["student_id"]
-                )
-                student.courses = student_data.get("courses", [])
-                
-                # View the schedule for each course the student is enrolled in
-                print(f"\nSchedule for {student._name}:")
-                student.view_schedule()  # Call view_schedule without passing any argument
-            else:
-                print("Student not found.")
-
-
-        elif choice == "6":
-            print("Logging out...")
-            break
-
-        else:
-            print("Invalid option, please try again.")
-
-
-
-def instructor_menu(admin, instructor_id):
-    # Retrieve instructor data at the beginning of the menu
-    instructor_data = next((i for i in admin.data["instructors"] if i["instructor_id"] == instructor_id), None)
-
-    # Check if instructor data exists
-    if not instructor_data:
-        print(f"Error: No instructor found with ID {instructor_id}.")
-        return  # Exit the function if no instructor is found
-
-    # Create the instructor instance once
-    instructor = Instructor(
-        instructor_data["name"],
-        instructor_data["phone"],
-        instructor_data["address"],
-        instructor_data["date_of_birth"],
-        instructor_data["instructor_id"]
-    )
-
-    # Instructor menu options
-    while True:
-        print("\n--- Instructor Menu ---")
-        print("1. View Courses")
-        print("2. Assign Grade")
-        print("3. Add Course to Teach")
-        print("4. Create Assignment")
-        print("5. Logout")
-        choice = input("Select an option: ")
-
-        if choice == "1":
-            instructor.view_courses(admin)
-
-        elif choice == "2":
-            course_name = input("Enter course name: ")
-            assignment_name = input("Enter assignment name: ")
-            grade = input(f"Enter grade for assignment {assignment_name}: ")
-            student_id = input("Enter student ID: ")
-            instructor.assign_grade(student_id, course_name, assignment_name, grade, admin)
-
-        elif choice == "3":
-            course_name = input("Enter course name: ")
-            course_description = input("Enter course description: ")
-            course = {"name": course_name, "description": course_description, "assignments": []}
-            instructor.assign_course(course, admin)
-
-        elif choice == "4":
-            course_name = input("Enter course name: ")
-            assignment_name = input("Enter assignment name: ")
-            description = input("Enter assignment description: ")
-            due_date = input("Enter due date (YYYY-MM-DD): ")
-            instructor.create_assignment(course_name, assignment_name, description, due_date, admin)
-
-        elif choice == "5":
-            print("Logging out...")
-            break
-
-        else:
-            print("Invalid choice. Please try again.")
-
-
-
-
-def admin_menu(admin):
-    while True:
-        print("\n--- Admin Menu ---")
-        print("1. Add Student")
-        print("2. Add Instructor")
-        print("3. Add Course")
-        print("4. List Students")
-        print("5. List Instructors")
-        print("6. List Courses")
-        print("7. Logout")
-        choice = input("Select an option: ")
-
-        if choice == "1":
-            name = input("Enter student's name: ")
-            email = input("Enter student's email: ")
-            phone = input("Enter student's phone: ")
-            address = input("Enter student's address: ")
-            date_of_birth = input("Enter student's date of birth (YYYY-MM-DD): ")
-            student_id = input("Enter student ID: ")
-
-           
-            student = Student(name, phone, address, date_of_birth, student_id)
-            admin.data["students"].append(student.get_details())
-
-            temp_password = "password123"  # Temporary default password
-            hashed_password = hashlib.sha256(temp_password.encode()).hexdigest()
-            user_id = len(admin.credentials) + 1
-            user = User(id=user_id, email=email, password=hashed_password, role="student", person=student)
-            admin.data["users"].append(user.get_details())
-
-            # admin.credentials[user_id] = {
-            #     "name": name,
-            #     "email": email,
-            #     "password": hashed_password,
-            #     "role": "student"
-            # }
-           
-            admin.save_data()
-            # admin.save_credentials()
-
-            print(f"Student {name} added successfully!")
-            print(f"Credentials for {name}:")
-            print(f"Username: {email}")
-            print(f"Password: {temp_password} (Change it after logging in!)")
-
-        elif choice == "2":
-            
-            name = input("Enter instructor's name: ")
-            email = input("Enter instructor's email: ")
-            phone = input("Enter instructor's phone: ")
-            address = input("Enter instructor's address: ")
-            date_of_birth = input("Enter instructor's date of birth (YYYY-MM-DD): ")
-            instructor_id = input("Enter instructor ID: ")
-
-            instructor = Instructor(name, phone, address, date_of_birth, instructor_id)
-            admin.data["instructors"].append(instructor.get_details())
-
-            temp_password = "password123"  # Temporary default password
-            hashed_password = hashlib.sha256(temp_password.encode()).hexdigest()
-            user_id = len(admin.credentials) + 1
-            user = User(id=user_id, email=email, password=hashed_password, role="student", person=instructor)
-            admin.data["users"].append(user.get_details())
-
-            admin.save_data()
-            print(f"Instructor {name} added successfully!")
-            print(f"Credentials for {name}:")
-            print(f"Username: {email}")
-            print(f"Password: {temp_password} (Change it after logging in!)")
-
-        elif choice == "3":
-         
-            course_id = input("Enter course ID: ")
-            course_name = input("Enter course name: ")
-            course_description = input("Enter course description: ")
-            course = {"course_id": course_id, "name": course_name, "description": course_description}
-            admin.add_course(course)
-
-        elif choice == "4":
-            print("Listing all students:")
-            for student in admin.data["students"]:
-                print(f"- {student['name']} (ID: {student['student_id']})")
-
-        elif choice == "5":
-            print("Listing all instructors:")
-            for instructor in admin.data["instructors"]:
-                print(f"- {instructor['name']} (ID: {instructor['instructor_id']})")
-
-        elif choice == "6":
-            admin.list_courses()
-
-        elif choice == "7":
-            print("Logging out...")
-            break
-
-        else:
-            print("Invalid option. Please try again.")
-
-def main():
-    admin = PlatformAdmin()
-
-    while True:
-        print("\n--- Main Menu ---")
-        print("1. Sign Up")
-        print("2. Login")
-        print("3. Exit")
-        choice = input("Select an option: ")
-
-        if choice == "1":
-            name = input("Enter your name: ")
-            email = input("Enter your email: ")
-            phone = input("Enter phone number: ")
-            address = input("Enter address: ")
-            date_of_birth = input("Enter date of birth (YYYY-MM-DD): ")
-            password = input("Enter password: ")
-            role = input("Enter role (student/instructor/admin): ")
-            if role not in ["student", "instructor", "admin"]:
-                print("Invalid role. Please choose 'student', 'instructor', or 'admin'.")
-                continue
-            admin.sign_up(name, email, phone, address, date_of_birth, password, role)
-
-        elif choice == "2":
-            email = input("Enter email: ")
-            password = input("Enter password: ")
-            role = admin.login(email, password)
-            if role == "admin":
-                admin_menu(admin)
-            elif role == "instructor":
-                instructor_id = input("Enter your instructor ID: ")
-                instructor_menu(admin, instructor_id)
-            elif role == "student":
-                student_id = input("Enter your student ID: ")
-                student_menu(admin, student_id)
-            else:
-                print("Login failed.")
-
-        elif choice == "3":
-            print("Goodbye!")
-            break
- 
-
-if __name__ == "__main__":
-    main()
+import argparse
+import asyncio
+import contextlib
+import copy
+import cProfile
+import csv
+import functools
+import gc
+import json
+import hashlib
+import heapq
+import hmac
+import io
+import itertools
+import math
+import os
+import pstats
+import random
+import re
+import secrets
+import shutil
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.parse
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; sessions are then not locked
+    fcntl = None
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; analytics fall back to the stdlib
+    np = None
+
+try:
+    import lzma
+except ImportError:  # Python can be built without liblzma; binary snapshots then offer zlib only
+    lzma = None
+
+try:
+    import orjson
+except ImportError:  # Optional fast JSON codec; the json module is used without it
+    orjson = None
+
+
+class Record(MutableMapping):
+    """Dict-style access to a slotted entity.
+
+    FIELDS maps each stored key to the attribute holding it, in the order
+    to_dict writes them. Keys the class does not know about are kept in an
+    "_extra" dict, so records round-trip unchanged. Code written against the
+    plain dicts (record["name"], record.get(...), apply_change paths) keeps
+    working on the typed objects.
+    """
+    __slots__ = ()
+    FIELDS = {}
+
+    def __getitem__(self, key):
+        attr = self.FIELDS.get(key)
+        if attr is not None:
+            try:
+                return getattr(self, attr)
+            except AttributeError:  # Slot never set: the key is absent
+                raise KeyError(key) from None
+        extra = getattr(self, "_extra", None)
+        if extra and key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        attr = self.FIELDS.get(key)
+        if attr is not None:
+            setattr(self, attr, value)
+            return
+        extra = getattr(self, "_extra", None)
+        if extra is None:
+            extra = self._extra = {}
+        extra[key] = value
+
+    def __delitem__(self, key):
+        attr = self.FIELDS.get(key)
+        try:
+            if attr is not None:
+                delattr(self, attr)
+            else:
+                del self._extra[key]
+        except (AttributeError, KeyError, TypeError):
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        for key, attr in self.FIELDS.items():
+            if hasattr(self, attr):
+                yield key
+        yield from getattr(self, "_extra", None) or ()
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self):
+        data = {}
+        for key, attr in self.FIELDS.items():
+            try:
+                data[key] = getattr(self, attr)
+            except AttributeError:
+                pass
+        extra = getattr(self, "_extra", None)
+        if extra:
+            data.update(extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build an instance straight from a stored dict (no __init__ checks)."""
+        record = cls.__new__(cls)
+        fields = cls.FIELDS
+        extra = None
+        for key, value in data.items():
+            attr = fields.get(key)
+            if attr is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+            else:
+                setattr(record, attr, value)
+        record._extra = extra
+        return record
+
+    @classmethod
+    def from_dicts(cls, records):
+        """Bulk from_dict; records that are already typed are kept as they are."""
+        from_dict = cls.from_dict
+        return [r if isinstance(r, cls) else from_dict(r) for r in records]
+
+
+class Person(ABC):
+    __slots__ = ("_name", "_phone", "_address", "_date_of_birth", "_extra")
+
+    def __init__(self, name, phone, address, date_of_birth):
+        self._name = name
+        self._phone = phone
+        self._address = address
+        self._date_of_birth = date_of_birth
+
+    @abstractmethod
+    def get_details(self):
+        pass
+
+    @staticmethod
+    def validate_email(email):
+        return "@" in email
+
+    @staticmethod
+    def validate_phone(phone):
+        return phone.isdigit() and len(phone) >= 10
+    @staticmethod
+    def calculate_age(date_of_birth, current_date):
+        return current_date.year - date_of_birth.year
+
+    @staticmethod
+    def format_address(address):
+        return address.title()
+
+    @staticmethod
+    def validate_name(name):
+        return name.isalpha()
+
+    @classmethod
+    def create_from_dict(cls, data):
+        return cls(data['name'], data['phone'], data['address'], data['date_of_birth'])
+
+    @classmethod
+    def create_default(cls):
+        return cls("Default Name", "0000000000", "Default Address", None)
+    
+class User:
+    def __init__(self, id, email, password, role, person):
+        self._id = id
+        self._password = password
+        self._email = email
+        self._person = person
+        self._role = role
+
+    def get_details(self):
+        return {
+            "email": self._email,
+            "password": self._password,
+            "role": self._role,
+            "person": self._person.get_details()
+        }
+
+    def create(self):
+        # TODO
+        pass
+
+    def update(self):
+        # TODO
+        pass
+
+    def delete(self):
+        # TODO
+        pass
+
+class Admin(Person):
+    def __init__(self, name, phone, address, date_of_birth):
+        super().__init__(name, phone, address, date_of_birth)
+
+    def get_details(self):
+        return {
+            "name": self._name,
+            "phone": self._phone,
+            "address": self._address,
+            "date_of_birth": self._date_of_birth
+        }
+
+
+class Student(Person, Record):
+    __slots__ = ("student_id", "courses", "grades")
+    FIELDS = {
+        "name": "_name",
+        "phone": "_phone",
+        "address": "_address",
+        "date_of_birth": "_date_of_birth",
+        "student_id": "student_id",
+        "courses": "courses",
+        "grades": "grades",
+    }
+
+    def __init__(self, name, phone, address, date_of_birth, student_id):
+        super().__init__(name, phone, address, date_of_birth)
+        self.student_id = student_id
+        self.courses = []  # List to hold enrolled courses
+        self.grades = {}  # Dictionary to hold grades for courses  
+
+    def enroll_course(self, course):
+        # Check if the course is already enrolled based on course_id
+        if course['course_id'] not in [c['course_id'] for c in self.courses]:
+            self.courses.append(course)
+            print(f"{self._name} enrolled in {course['name']}.")
+        else:
+            print(f"{self._name} is already enrolled in {course['name']}.")
+
+    def assign_grade(self, course_name, grade):
+        if course_name in self.grades:
+            print(f"{self._name} already has a grade for {course_name}.")
+        else:
+            self.grades[course_name] = grade  # Make sure this is a dictionary update
+            print(f"Assigned grade {grade} to {self._name} for course {course_name}.")
+
+
+    def get_details(self):
+        return {
+            "name": self._name,
+            "phone": self._phone,
+            "address": self._address,
+            "date_of_birth": self._date_of_birth,
+            "student_id": self.student_id,
+            "courses": self.courses,
+            "grades": self.grades,
+        }
+
+    def view_courses(self):
+        if not self.courses:
+            print(f"{self._name} is not enrolled in any courses yet.")
+        else:
+            print(f"Courses enrolled by {self._name}:")
+            for course in self.courses:
+                print(f"- {course['name']}")
+
+    def view_grades(self, summary=None):
+        if not self.grades:
+            print(f"{self._name} has no grades assigned.")
+        else:
+            print(f"Grades for {self._name}:")
+            for grade_info in self.grades:  # Iterate over the list of grades
+                course_name = grade_info['course_name']
+                grade = grade_info['grade']
+                print(f"Course: {course_name}, Grade: {grade}")
+            self.print_summary(summary)
+
+    @staticmethod
+    def print_summary(summary):
+        # summary is a RunningGrade kept by PlatformAdmin.grade_aggregates()
+        if summary is not None and summary.count:
+            print(f"Average: {summary.average():.2f} over {summary.count} courses, "
+                  f"weighted average: {summary.weighted_average():.2f}, GPA: {summary.gpa():.2f}")
+
+
+
+
+    def view_assignment_grades(self, summary=None):
+        if not self.grades:
+            print(f"{self._name} has no assignment grades.")
+        else:
+            print(f"Assignment grades for {self._name}:")
+            for grade_info in self.grades:  # Iterate over the list of grades
+                course_name = grade_info['course_name']
+                grade = grade_info['grade']
+                print(f"Course: {course_name}, Grade: {grade}")
+            self.print_summary(summary)
+
+
+    # View schedule for all enrolled courses
+    def view_schedule(self):
+        if not self.courses:
+            print(f"{self._name} is not enrolled in any courses yet.")
+        else:
+            print(f"Schedule for {self._name}:")
+            for course in self.courses:
+                if 'schedule' in course:
+                    schedule = course['schedule']
+                    print(f"\nCourse: {course['name']}")
+                    print(f"Start Date: {schedule['start_date']}")
+                    print(f"End Date: {schedule['end_date']}")
+                    print(f"Class Time: {schedule['class_time']}")
+                    print(f"Days: {', '.join(schedule['days'])}")
+                else:
+                    print(f"Schedule not available for {course['name']}.")
+
+
+
+
+
+class Instructor(Person, Record):
+    __slots__ = ("instructor_id", "courses_taught", "schedules")
+    FIELDS = {
+        "name": "_name",
+        "phone": "_phone",
+        "address": "_address",
+        "date_of_birth": "_date_of_birth",
+        "instructor_id": "instructor_id",
+        "courses_taught": "courses_taught",
+    }
+
+    def __init__(self, name, phone, address, date_of_birth, instructor_id):
+        super().__init__(name, phone, address, date_of_birth)
+        self.instructor_id = instructor_id
+        self.courses_taught = []
+        self.schedules = []  # A list to hold schedules for courses taught by the instructor
+
+    def assign_course(self, course, admin):
+        # The check and the assignment happen under the write lock, so two
+        # threads cannot both assign the course or create the same course_id
+        with admin.lock.write():
+            # Find the instructor data in admin
+            instructor_data = admin.find_instructor(self.instructor_id)
+        
+            if not instructor_data:
+                print(f"Instructor with ID {self.instructor_id} not found.")
+                return
+
+            # Check if the course is already assigned
+            if admin.taught_course_position(instructor_data, course["name"]) is not None:
+                print(f"{self._name} is already teaching the course {course['name']}.")
+            else:
+                # Courses live once in the catalog; the instructor only references them
+                catalog_course = admin.find_course(course["name"])
+                clashes = admin.schedule_conflicts(catalog_course or course, instructor_data["courses_taught"])
+                if clashes:
+                    print(f"{self._name} cannot teach {course['name']}: it clashes with "
+                          f"{', '.join(c['name'] for c in clashes)}.")
+                    return
+                if not catalog_course:
+                    catalog_course = dict(course)
+                    if not catalog_course.get("course_id"):
+                        catalog_course["course_id"] = next_course_id(admin._index("_courses_by_id"))
+                    catalog_course = admin.append_record("courses", catalog_course)
+                admin.assign_teacher(self.instructor_id, catalog_course)
+
+                # Synchronize to self.courses_taught
+                self.courses_taught.append(catalog_course)
+
+                # Save changes to the admin's persistent data
+                admin.save_data()
+
+                print(f"Assigned course {course['name']} to instructor {self._name}.")
+
+
+    def create_assignment(self, course_name, assignment_name, description, due_date, admin):
+       
+        instructor_data = admin.find_instructor(self.instructor_id)
+        
+        if not instructor_data:
+            print(f"Instructor with ID {self.instructor_id} not found.")
+            return
+        
+        # Check if the instructor teaches the given course
+        course_position = admin.taught_course_position(instructor_data, course_name)
+        
+        if course_position is None:
+            print(f"{self._name} is not teaching the course {course_name}.")
+            return
+        # Create the new assignment
+        assignment = {
+            "assignment_name": assignment_name,
+            "description": description,
+            "due_date": due_date,
+            "grades": []  
+        }
+        
+        admin.add_course_assignment(course_position, assignment)
+        print(f"Assignment '{assignment_name}' added to course '{course_name}' by {self._name}.")
+        
+       
+        admin.save_data()
+
+    def assign_grade(self, student_id, course_name, assignment_name, grade, admin):
+        # Find the instructor data
+        instructor_data = admin.find_instructor(self.instructor_id)
+
+        if instructor_data:
+            # Check if the instructor is teaching the course
+            course_position = admin.taught_course_position(instructor_data, course_name)
+            if course_position is not None:
+                # Find the course and assignment (positions are needed for the change paths)
+                course_data = admin.data["courses"][course_position]
+                if course_data:
+                    assignment_index = next((k for k, assignment in enumerate(course_data.get('assignments', [])) if assignment['assignment_name'] == assignment_name), None)
+                    if assignment_index is not None:
+                        student_data = admin.record_assignment_grade(course_position, assignment_index, student_id, grade)
+                        if student_data:
+                            print(f"Grade {grade} assigned to student {student_id} for {assignment_name} in {course_name}.")
+                        else:
+                            print(f"Student with ID {student_id} not found.")
+                        
+                        admin.save_data()  # Save after modification
+                    else:
+                        print(f"Assignment {assignment_name} not found in course {course_name}.")
+                else:
+                    print(f"Course {course_name} not found.")
+            else:
+                print(f"{self._name} is not teaching the course {course_name}.")
+        else:
+            print(f"Instructor with ID {self.instructor_id} not found.")
+            
+            
+    def view_courses(self, admin):
+        instructor_data = admin.find_instructor(self.instructor_id)
+        if instructor_data and instructor_data["courses_taught"]:
+            print(f"Courses taught by {self._name}:")
+            for course in admin.resolve_courses(instructor_data["courses_taught"]):
+                summary = admin.course_grade_summary(course["course_id"])
+                if summary.count:
+                    print(f"- {course['name']} ({summary.count} grades, average {summary.average():.2f})")
+                else:
+                    print(f"- {course['name']}")
+        else:
+            print(f"{self._name} is not teaching any courses yet.")
+
+    def view_leaderboard(self, course_name, assignment_name, admin, k=10, student_id=""):
+        # A blank assignment_name ranks students over the whole course
+        instructor_data = admin.find_instructor(self.instructor_id)
+        if not instructor_data:
+            print(f"Instructor with ID {self.instructor_id} not found.")
+            return
+        course_position = admin.taught_course_position(instructor_data, course_name)
+        if course_position is None:
+            print(f"{self._name} is not teaching the course {course_name}.")
+            return
+        course_data = admin.data["courses"][course_position]
+        if assignment_name and not any(a["assignment_name"] == assignment_name for a in course_data.get("assignments", [])):
+            print(f"Assignment {assignment_name} not found in course {course_name}.")
+            return
+        board = admin.leaderboard(course_data["course_id"], assignment_name or None)
+        title = f"{course_name} - {assignment_name}" if assignment_name else course_name
+        if not len(board):
+            print(f"No numeric grades for {title} yet.")
+            return
+        print(f"Top {min(k, len(board))} of {len(board)} students in {title}:")
+        for rank, ranked_id, score in board.top(k):
+            print(f"{rank}. {ranked_id}: {score:.2f}")
+        print(f"Lowest {min(k, len(board))} (at risk):")
+        for rank, ranked_id, score in board.bottom(k):
+            print(f"{rank}. {ranked_id}: {score:.2f}")
+        if student_id:
+            place = board.rank(student_id)
+            if place:
+                print(f"Student {student_id} is ranked {place[0]} of {len(board)} with {place[1]:.2f}.")
+            else:
+                print(f"Student {student_id} has no numeric grade in {title}.")
+
+
+
+
+
+
+    def get_details(self):
+        return {
+            "name": self._name,
+            "phone": self._phone,
+            "address": self._address,
+            "date_of_birth": self._date_of_birth,
+            "instructor_id": self.instructor_id,
+            "courses_taught": self.courses_taught,
+        }
+
+    # New Method: Assign a schedule to a course
+    def assign_schedule(self, course_name, start_date, end_date, class_time, days, admin):
+        # Find the course the instructor is teaching
+        course = next((c for c in self.courses_taught if c["name"] == course_name), None)
+        if not course:
+            print(f"{self._name} is not teaching the course {course_name}.")
+            return
+        
+        # Create a new schedule
+        schedule = Schedule(course_name, start_date, end_date, class_time, days)
+        
+        # Add the schedule to the instructor's list of schedules
+        self.schedules.append(schedule)
+        print(f"Schedule assigned to course '{course_name}' by {self._name}.")
+        
+        # Save the updated data (this can be customized if needed)
+        admin.save_data()
+
+    # New Method: View the schedule of a course
+    def view_schedule(self, course_name):
+        # Find the schedule for the given course
+        schedule = next((s for s in self.schedules if s.course_id == course_name), None)
+        if not schedule:
+            print(f"No schedule found for course '{course_name}' taught by {self._name}.")
+            return
+        
+        # Print schedule details
+        print(f"Schedule for course '{course_name}' taught by {self._name}:")
+        print(f"Start Date: {schedule.start_date}")
+        print(f"End Date: {schedule.end_date}")
+        print(f"Class Time: {schedule.class_time}")
+        print(f"Days: {schedule.days}")
+
+
+
+
+
+class Grade(Record):
+    __slots__ = ("student_id", "course_id", "assignment_id", "grade_value", "_extra")
+    FIELDS = {name: name for name in ("student_id", "course_id", "assignment_id", "grade_value")}
+
+    def __init__(self, student_id, course_id, assignment_id, grade_value):
+        self.student_id = student_id
+        self.course_id = course_id
+        self.assignment_id = assignment_id
+        self.grade_value = grade_value
+
+    def get_details(self):
+        return {
+            "student_id": self.student_id,
+            "course_id": self.course_id,
+            "assignment_id": self.assignment_id,
+            "grade_value": self.grade_value,
+        }
+    
+    @staticmethod
+    def is_valid_grade(grade_value):
+        """Validate if the grade value is within a certain range."""
+        return 0 <= grade_value <= 100
+
+
+class Assignment(Record):
+    __slots__ = ("assignment_id", "title", "description", "due_date", "course_id", "_extra")
+    FIELDS = {name: name for name in ("assignment_id", "title", "description", "due_date", "course_id")}
+
+    def __init__(self, assignment_id, title, description, due_date, course_id):
+        self.assignment_id = assignment_id
+        self.title = title
+        self.description = description
+        self.due_date = due_date
+        self.course_id = course_id
+
+    def get_details(self):
+        return {
+            "assignment_id": self.assignment_id,
+            "title": self.title,
+            "description": self.description,
+            "due_date": self.due_date,
+            "course_id": self.course_id,
+        }
+    @staticmethod
+    def is_due_soon(due_date, current_date):
+        """Check if the assignment is due soon given the current date."""
+        return (due_date - current_date).days <= 3
+
+
+class Schedule(Record):
+    __slots__ = ("course_id", "start_date", "end_date", "class_time", "days", "_extra")
+    FIELDS = {name: name for name in ("course_id", "start_date", "end_date", "class_time", "days")}
+
+    def __init__(self, course_name, start_date, end_date, class_time, days):
+        self.course_id = course_name
+        self.start_date = start_date
+        self.end_date = end_date
+        self.class_time = class_time
+        self.days = days
+
+    @property
+    def course_name(self):
+        return self.course_id
+
+    def get_details(self):
+        return {
+            "course_id": self.course_id,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "class_time": self.class_time,
+            "days": self.days,
+        }
+    @staticmethod
+    def is_active(start_date, end_date, current_date):
+        """Check if the schedule is currently active."""
+        return start_date <= current_date <= end_date
+
+
+class Course(Record):
+    __slots__ = (
+        "course_id", "name", "description", "schedule", "assignments", "duration", "level",
+        "enrollments", "instructor", "module_list", "start_date", "price", "_extra",
+    )
+    FIELDS = {name: name for name in __slots__[:-1]}
+
+    def __init__(self, course_id, name, description, schedule, duration, level, enrollments, instructor, module_list, start_date,price):
+        self.course_id = course_id
+        self.name = name
+        self.description = description
+        self.schedule = schedule
+        self.duration = duration
+        self.level = level
+        self.enrollments = enrollments
+        self.instructor = instructor
+        self.module_list = module_list
+        self.start_date = start_date
+        self.price = price
+
+    def get_course_details(self):
+        return{
+
+        }
+
+class Module:
+    def __init_(self, module_id, title, description, lessons, module_duration, order):
+        self.module_id = module_id
+        self.title = title
+        self.description = description
+        self.lessons = lessons
+        self.module_duration = module_duration
+        self.order = order
+
+    def get_module():
+        return{
+
+        }
+
+class Online_class:
+    def __init__(self, online_class_id, title, schedule, module, link, class_type, duration, recorded):
+        self.online_class_id = online_class_id
+        self.title = title
+        self.schedule = schedule
+        self.module = module
+        self.link = link
+        self.class_type = class_type
+        self.duraton = duration
+        self.recorded = recorded
+    
+    def get_online_details():
+        return{
+
+        }
+    
+class Enrollment(Record):
+    __slots__ = ("enrollment_id", "student", "course", "status", "enrollment_date", "progress", "_extra")
+    FIELDS = {name: name for name in __slots__[:-1]}
+
+    def __init__(self, enrollment_id, student, course, status, enrollment_date, progress):
+        self.enrollment_id = enrollment_id
+        self.student = student
+        self.course = course
+        self.status = status
+        self.enrollment_date = enrollment_date
+        self.progress = progress
+
+    def get_enroll_student():
+        return{
+
+        }
+
+def _hash_password_job(job):
+    # Top-level so ProcessPoolExecutor can pickle it
+    kdf, cost, password = job
+    return PasswordHasher(kdf, cost).hash(password)
+
+
+class PasswordHasher:
+    """Salted, tunable password hashing.
+
+    Stored hashes look like "pbkdf2_sha256$<iterations>$<salt>$<hash>" or
+    "scrypt$<n>$<salt>$<hash>" (salt and hash in hex). Plain 64-character
+    hex digests are the legacy unsalted sha256 hashes; they still verify and
+    are reported by needs_rehash so login can upgrade them.
+    """
+    KDFS = ("pbkdf2_sha256", "scrypt")
+    DEFAULT_COST = {"pbkdf2_sha256": 100_000, "scrypt": 2 ** 14}
+    SCRYPT_R, SCRYPT_P = 8, 1
+    MAX_SCRYPT_MEMORY = 2 ** 31 - 1  # hashlib.scrypt takes maxmem as a C int
+    PARALLEL_MIN_BATCH = 32  # Smaller batches hash faster than a process pool starts
+
+    def __init__(self, kdf="pbkdf2_sha256", cost=None):
+        if kdf not in self.KDFS:
+            raise ValueError(f"Unknown KDF: {kdf}")
+        cost = self.DEFAULT_COST[kdf] if cost is None else cost
+        self.check_cost(kdf, cost)
+        self.kdf = kdf
+        self.cost = cost
+
+    @classmethod
+    def _scrypt_memory(cls, n):
+        """Bytes scrypt needs for n (OpenSSL's own estimate), plus 1 MiB of headroom."""
+        return 128 * cls.SCRYPT_R * (n + cls.SCRYPT_P + 2) + 2 ** 20
+
+    @classmethod
+    def check_cost(cls, kdf, cost):
+        """Raise ValueError if cost is not usable with kdf."""
+        if isinstance(cost, bool) or not isinstance(cost, int) or cost < 1:
+            raise ValueError(f"{kdf} cost must be a positive integer, not {cost!r}")
+        if kdf == "scrypt":
+            if cost < 2 or cost & (cost - 1):
+                raise ValueError(f"scrypt cost (n) must be a power of 2 greater than 1, not {cost}")
+            if cls._scrypt_memory(cost) > cls.MAX_SCRYPT_MEMORY:
+                raise ValueError(f"scrypt cost (n) {cost} needs more than 2 GiB of memory")
+
+    @classmethod
+    def _derive(cls, kdf, cost, password, salt):
+        if kdf == "pbkdf2_sha256":
+            return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, cost)
+        return hashlib.scrypt(password.encode(), salt=salt, n=cost, r=cls.SCRYPT_R, p=cls.SCRYPT_P,
+                              maxmem=cls._scrypt_memory(cost))
+
+    def hash(self, password):
+        salt = os.urandom(16)
+        derived = self._derive(self.kdf, self.cost, password, salt)
+        return f"{self.kdf}${self.cost}${salt.hex()}${derived.hex()}"
+
+    def verify(self, password, stored):
+        """True if password matches the stored hash; False for a wrong or malformed one."""
+        if not isinstance(stored, str):
+            return False
+        if "$" not in stored:
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy, stored)
+        try:
+            kdf, cost, salt, expected = stored.split("$")
+            cost = int(cost)
+            if kdf not in self.KDFS:
+                return False
+            self.check_cost(kdf, cost)
+            derived = self._derive(kdf, cost, password, bytes.fromhex(salt))
+        except ValueError:
+            return False
+        return hmac.compare_digest(derived.hex(), expected)
+
+    def needs_rehash(self, stored):
+        """True for legacy or malformed hashes and ones made with another KDF or a lower cost."""
+        if not isinstance(stored, str) or "$" not in stored:
+            return True
+        kdf, cost = stored.split("$")[:2]
+        try:
+            return kdf != self.kdf or int(cost) < self.cost
+        except ValueError:
+            return True
+
+    def parallel(self, count, workers=None):
+        """Whether hashing count passwords is worth a process pool.
+
+        Hashing is CPU bound, so more workers than CPUs only adds overhead.
+        """
+        cpus = os.cpu_count() or 1
+        return min(workers or cpus, cpus) > 1 and count >= self.PARALLEL_MIN_BATCH
+
+    def hash_many(self, passwords, workers=None, executor=None):
+        """Hash a batch of passwords, in parallel across processes if workers > 1.
+
+        Batches below PARALLEL_MIN_BATCH, or with only one CPU to use, are
+        hashed in this process. executor is a ProcessPoolExecutor
+        to reuse; without one, a pool is started for this batch.
+        """
+        jobs = [(self.kdf, self.cost, password) for password in passwords]
+        if not self.parallel(len(jobs), workers):
+            return [_hash_password_job(job) for job in jobs]
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        if executor is not None:
+            return list(executor.map(_hash_password_job, jobs, chunksize=chunksize))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_hash_password_job, jobs, chunksize=chunksize))
+
+
+class KeyCodes:
+    """Dictionary encoding of keys to dense int codes."""
+    def __init__(self):
+        self.codes = {}
+        self.keys = []
+
+    def code(self, key):
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.keys)
+            self.keys.append(key)
+        return code
+
+    def get(self, key):
+        return self.codes.get(key)
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class GradeStore:
+    """Columnar grade table with O(1) upsert by (student, course, assignment).
+
+    Student, course and assignment IDs are dictionary-encoded to ints and
+    each column is a typed array, so a grade costs a few dozen bytes instead
+    of a dict. The composite (student, course, assignment) index is an
+    open-addressing hash table of row numbers, also a typed array, so a
+    lookup or upsert is constant time on average. Rows can carry a "ref"
+    (e.g. the grade's position in the list it mirrors). Records go in and
+    out in the Grade.get_details() shape.
+    """
+    # How grade_value was given, so records round-trip unchanged
+    FLOAT, INT, TEXT, OTHER = range(4)
+    EMPTY = -1
+
+    def __init__(self):
+        self.students = KeyCodes()
+        self.courses = KeyCodes()
+        self.assignments = KeyCodes()
+        self.student_col = array("i")
+        self.course_col = array("i")
+        self.assignment_col = array("i")
+        self.value_col = array("d")
+        self.kind_col = array("b")
+        self.ref_col = array("q")
+        self.other_values = {}  # row -> grade_value that is not a number
+        self.slots = array("q", [self.EMPTY]) * 8  # Hash slots holding row numbers
+
+    def __len__(self):
+        return len(self.value_col)
+
+    def _probe(self, student_code, course_code, assignment_code):
+        """Slot for the codes: the one holding their row, or the empty one to use."""
+        slots = self.slots
+        mask = len(slots) - 1
+        slot = hash((student_code, course_code, assignment_code)) & mask
+        while True:
+            row = slots[slot]
+            if row == self.EMPTY or (
+                self.student_col[row] == student_code
+                and self.course_col[row] == course_code
+                and self.assignment_col[row] == assignment_code
+            ):
+                return slot
+            slot = (slot + 1) & mask  # Linear probing
+
+    def _grow(self):
+        self.slots = array("q", [self.EMPTY]) * (len(self.slots) * 2)
+        for row in range(len(self)):
+            slot = self._probe(self.student_col[row], self.course_col[row], self.assignment_col[row])
+            self.slots[slot] = row
+
+    def row_of(self, student_id, course_id, assignment_id):
+        student_code = self.students.get(student_id)
+        course_code = self.courses.get(course_id)
+        assignment_code = self.assignments.get(assignment_id)
+        if student_code is None or course_code is None or assignment_code is None:
+            return None
+        row = self.slots[self._probe(student_code, course_code, assignment_code)]
+        return None if row == self.EMPTY else row
+
+    def _set_value(self, row, value):
+        self.other_values.pop(row, None)
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            kind, number = self.OTHER, float("nan")
+        elif isinstance(value, int):
+            kind, number = self.INT, float(value)
+        elif isinstance(value, float):
+            kind, number = self.FLOAT, value
+        else:
+            try:
+                kind, number = self.TEXT, float(value)
+            except ValueError:
+                kind, number = self.OTHER, float("nan")
+            if kind == self.TEXT and f"{number:g}" != value:
+                kind = self.OTHER  # e.g. "090" would not round-trip
+        if kind == self.OTHER:
+            self.other_values[row] = value
+        self.value_col[row] = number
+        self.kind_col[row] = kind
+
+    def value(self, row):
+        kind = self.kind_col[row]
+        number = self.value_col[row]
+        if kind == self.INT:
+            return int(number)
+        if kind == self.TEXT:
+            return f"{number:g}"
+        if kind == self.OTHER:
+            return self.other_values[row]
+        return number
+
+    def upsert(self, student_id, course_id, assignment_id, value, ref=-1):
+        """Insert or overwrite a grade; returns (row, created)."""
+        student_code = self.students.code(student_id)
+        course_code = self.courses.code(course_id)
+        assignment_code = self.assignments.code(assignment_id)
+        slot = self._probe(student_code, course_code, assignment_code)
+        row = self.slots[slot]
+        created = row == self.EMPTY
+        if created:
+            row = self.slots[slot] = len(self.value_col)
+            self.student_col.append(student_code)
+            self.course_col.append(course_code)
+            self.assignment_col.append(assignment_code)
+            self.value_col.append(0.0)
+            self.kind_col.append(self.FLOAT)
+            self.ref_col.append(ref)
+            if len(self) * 2 > len(self.slots):  # Keep the load factor under 1/2
+                self._grow()
+        elif ref != -1:
+            self.ref_col[row] = ref
+        self._set_value(row, value)
+        return row, created
+
+    def get(self, student_id, course_id, assignment_id, default=None):
+        row = self.row_of(student_id, course_id, assignment_id)
+        return default if row is None else self.value(row)
+
+    def record(self, row):
+        return Grade(
+            self.students.keys[self.student_col[row]],
+            self.courses.keys[self.course_col[row]],
+            self.assignments.keys[self.assignment_col[row]],
+            self.value(row),
+        ).get_details()
+
+    def records(self):
+        """Yield every grade as a Grade.get_details() dict."""
+        for row in range(len(self)):
+            yield self.record(row)
+
+    @classmethod
+    def from_records(cls, records):
+        store = cls()
+        for record in records:
+            grade = Grade.from_dict(record)
+            store.upsert(grade.student_id, grade.course_id, grade.assignment_id, grade.grade_value)
+        return store
+
+
+class RunningGrade:
+    """Count, sum and weighted sums of a set of numeric grades."""
+    __slots__ = ("count", "total", "weight", "weighted_total", "points")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.weight = 0.0
+        self.weighted_total = 0.0
+        self.points = 0.0  # Weighted grade points, for the GPA
+
+    def add(self, value, weight=1, sign=1):
+        self.count += sign
+        self.total += sign * value
+        self.weight += sign * weight
+        self.weighted_total += sign * weight * value
+        self.points += sign * weight * GradeAggregates.grade_points(value)
+
+    def average(self):
+        return self.total / self.count if self.count else None
+
+    def weighted_average(self):
+        return self.weighted_total / self.weight if self.weight else None
+
+    def gpa(self):
+        return self.points / self.weight if self.weight else None
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "average": self.average(),
+            "weighted_average": self.weighted_average(),
+            "gpa": self.gpa(),
+        }
+
+
+class GradeAggregates:
+    """Running grade totals per student and per course.
+
+    Student totals cover the per-course grades on each student, weighted
+    by the course's "credits" (default 1); course totals cover that
+    course's assignment grades, weighted by the assignment's "weight"
+    (default 1). Each new or overwritten grade is an O(1) update: the old
+    value is taken out and the new one added. Grades that are not numbers
+    are left out, like in GradebookAnalytics.
+    """
+    # Lowest mark for each grade point value, highest first
+    GPA_SCALE = ((90, 4.0), (85, 3.5), (80, 3.0), (75, 2.5), (70, 2.0), (65, 1.5), (60, 1.0), (0, 0.0))
+
+    def __init__(self):
+        self.students = {}  # student_id -> RunningGrade
+        self.courses = {}  # course_id -> RunningGrade
+
+    @staticmethod
+    def number(value):
+        """value as a float, or None if it is not a numeric grade."""
+        if isinstance(value, bool):
+            return None
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        return number if math.isfinite(number) else None  # NaN and infinities would poison the totals
+
+    @classmethod
+    def grade_points(cls, value):
+        for mark, points in cls.GPA_SCALE:
+            if value >= mark:
+                return points
+        return 0.0
+
+    def _update(self, totals, key, old, new, weight):
+        old, new = self.number(old), self.number(new)
+        if old is None and new is None:
+            return
+        running = totals.get(key)
+        if running is None:
+            running = totals[key] = RunningGrade()
+        if old is not None:
+            running.add(old, weight, -1)
+        if new is not None:
+            running.add(new, weight)
+
+    def update_student(self, student_id, old, new, credits=1):
+        """Replace a student's course grade old (None if there was none) by new."""
+        self._update(self.students, student_id, old, new, credits)
+
+    def update_course(self, course_id, old, new, weight=1):
+        """Replace an assignment grade old (None if there was none) by new."""
+        self._update(self.courses, course_id, old, new, weight)
+
+    def student(self, student_id):
+        return self.students.get(student_id) or RunningGrade()
+
+    def course(self, course_id):
+        return self.courses.get(course_id) or RunningGrade()
+
+
+class Leaderboard:
+    """Students ranked by score, best first.
+
+    Keeps (-score, student_id) keys sorted in blocks of up to
+    2 * BLOCK_SIZE keys, with the last key of each block in maxes (a sqrt
+    decomposition, as sortedcontainers does). One bisect on maxes finds a
+    key's block and one more its place in it, so set and remove shift a
+    single block, O(log n + BLOCK_SIZE), rather than the whole board; a
+    block is split when it grows past 2 * BLOCK_SIZE and dropped when it
+    empties. A rank adds up the lengths of the blocks before it,
+    O(n / BLOCK_SIZE), and the top and bottom k read k keys from the ends.
+    Students with equal scores share a rank.
+    """
+    BLOCK_SIZE = 256
+
+    def __init__(self):
+        self.blocks = []  # Sorted runs of keys, each wholly before the next
+        self.maxes = []  # Last key of each block
+        self.scores = {}  # student_id -> score
+
+    def __len__(self):
+        return len(self.scores)
+
+    def _locate(self, key):
+        """(block, position in it) of key, or of where it would go."""
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            i -= 1
+            return i, len(self.blocks[i])
+        return i, bisect_left(self.blocks[i], key)
+
+    def remove(self, student_id):
+        score = self.scores.pop(student_id, None)
+        if score is None:
+            return
+        i, j = self._locate((-score, student_id))
+        block = self.blocks[i]
+        del block[j]
+        if block:
+            self.maxes[i] = block[-1]
+        else:
+            del self.blocks[i], self.maxes[i]
+
+    def set(self, student_id, score):
+        """Insert the student, or move them to a new score."""
+        self.remove(student_id)
+        self.scores[student_id] = score
+        key = (-score, student_id)
+        if not self.blocks:
+            self.blocks.append([key])
+            self.maxes.append(key)
+            return
+        i, j = self._locate(key)
+        block = self.blocks[i]
+        block.insert(j, key)
+        self.maxes[i] = block[-1]
+        if len(block) > 2 * self.BLOCK_SIZE:
+            half = len(block) // 2
+            self.blocks[i:i + 1] = [block[:half], block[half:]]
+            self.maxes[i:i + 1] = [block[half - 1], block[-1]]
+
+    def top(self, k=10):
+        """[(rank, student_id, score)] of the k best students."""
+        keys = itertools.islice(itertools.chain.from_iterable(self.blocks), k)
+        return [(self.rank_of_score(-negated), student_id, -negated) for negated, student_id in keys]
+
+    def bottom(self, k=10):
+        """[(rank, student_id, score)] of the k lowest students, lowest first."""
+        keys = itertools.islice(itertools.chain.from_iterable(map(reversed, reversed(self.blocks))), k)
+        return [(self.rank_of_score(-negated), student_id, -negated) for negated, student_id in keys]
+
+    def rank_of_score(self, score):
+        key = (-score,)
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            return len(self.scores) + 1
+        return sum(map(len, self.blocks[:i])) + bisect_left(self.blocks[i], key) + 1
+
+    def rank(self, student_id):
+        """(rank, score) of the student, or None if they have no score."""
+        score = self.scores.get(student_id)
+        if score is None:
+            return None
+        return self.rank_of_score(score), score
+
+
+class Leaderboards:
+    """A Leaderboard per course and per assignment.
+
+    A course ranks students by the weighted average of their assignment
+    grades in it (kept as a RunningGrade per student and course), an
+    assignment by the grade itself. Updated in place for each new or
+    overwritten grade; grades that are not numbers take a student off the
+    assignment's board.
+    """
+    def __init__(self):
+        self.boards = {}  # course_id or (course_id, assignment name) -> Leaderboard
+        self.running = {}  # (course_id, student_id) -> RunningGrade
+
+    def board(self, course_id, assignment_name=None):
+        key = course_id if assignment_name is None else (course_id, assignment_name)
+        return self.boards.get(key) or Leaderboard()
+
+    def update(self, course_id, assignment_name, student_id, old, new, weight=1):
+        """Replace a student's assignment grade old (None if there was none) by new."""
+        old, new = GradeAggregates.number(old), GradeAggregates.number(new)
+        assignment_board = self.boards.setdefault((course_id, assignment_name), Leaderboard())
+        if new is None:
+            assignment_board.remove(student_id)
+        else:
+            assignment_board.set(student_id, new)
+        if old is None and new is None:
+            return
+        running = self.running.setdefault((course_id, student_id), RunningGrade())
+        if old is not None:
+            running.add(old, weight, -1)
+        if new is not None:
+            running.add(new, weight)
+        course_board = self.boards.setdefault(course_id, Leaderboard())
+        average = running.weighted_average() if running.count else None
+        if average is None:
+            course_board.remove(student_id)
+        else:
+            course_board.set(student_id, average)
+
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+CLASS_TIME_FORMATS = ("%I:%M %p", "%I:%M%p", "%I %p", "%I%p", "%H:%M")
+DEFAULT_CLASS_MINUTES = 60  # Length of a class whose class_time has no end
+FIRST_DATE, LAST_DATE = "0000-01-01", "9999-12-31"  # Open ends of a date range
+
+
+def parse_time_of_day(text):
+    """Minutes after midnight for "10:00 AM", "2 PM" or "14:00"."""
+    for fmt in CLASS_TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(text.strip().upper(), fmt)
+        except ValueError:
+            continue
+        return parsed.hour * 60 + parsed.minute
+    raise ValueError(f"Unrecognised time: {text!r}")
+
+
+def parse_class_time(class_time):
+    """(start, end) minutes after midnight for "10:00 AM" or "10:00 AM - 11:30 AM"."""
+    start, _, end = str(class_time).partition("-")
+    start = parse_time_of_day(start)
+    end = parse_time_of_day(end) if end.strip() else start + DEFAULT_CLASS_MINUTES
+    if end <= start:
+        raise ValueError(f"Class ends before it starts: {class_time!r}")
+    return start, end
+
+
+def parse_days(days):
+    """Weekday numbers (Monday is 0) for ["Monday", "Wed"] or "Monday, Wednesday"."""
+    if isinstance(days, str):
+        days = days.replace(";", ",").split(",")
+    numbers = []
+    for day in days or ():
+        prefix = str(day).strip().lower()[:3]
+        number = next((n for n, name in enumerate(WEEKDAYS) if name.startswith(prefix)), None) if prefix else None
+        if number is None:
+            raise ValueError(f"Unrecognised day: {day!r}")
+        numbers.append(number)
+    return sorted(set(numbers))
+
+
+class IntervalList:
+    """Date ranges sorted by start, with the running maximum of their ends.
+
+    Everything starting on or before a query's end is found with one bisect;
+    walking back from there stops as soon as the running maximum end falls
+    before the query's start. That prunes ranges that all ended long ago,
+    but it is not an interval tree: one long range early in the list keeps
+    the running maximum high, and a query then walks every entry before its
+    end, so the worst case is O(n) per query, hit or miss. add is O(n) too
+    (list inserts and rewriting the maxima after the new entry). Lists here
+    hold one (weekday, slot) of one catalog, so n stays small.
+    """
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.items = []
+        self.max_ends = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, start, end, item):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.items.insert(i, item)
+        self.max_ends.insert(i, end)
+        running = self.max_ends[i - 1] if i else end
+        for j in range(i, len(self.ends)):
+            running = max(running, self.ends[j])
+            self.max_ends[j] = running
+
+    def overlapping(self, start, end):
+        """Items whose range shares at least one day with [start, end]."""
+        j = bisect_right(self.starts, end) - 1
+        while j >= 0 and self.max_ends[j] >= start:
+            if self.ends[j] >= start:
+                yield self.items[j]
+            j -= 1
+
+
+class CalendarIndex:
+    """Class meetings indexed by (weekday, time slot) over date ranges.
+
+    Every meeting of a schedule is entered under each SLOT_MINUTES slot it
+    touches, as (course_id, start minute, end minute, room) in an
+    IntervalList of its start/end dates, and also under its course so
+    clash checks against a known set of courses (a student's) only read
+    those courses' meetings. "In class at" queries look at one slot.
+    """
+    SLOT_MINUTES = 30
+
+    def __init__(self):
+        self.slots = {}  # (weekday, slot) -> IntervalList
+        self.course_meetings = {}  # course_id -> [(keys, start minute, end minute, start date, end date)]
+        self.schedules = {}  # course_id -> its schedules (including unparseable ones)
+        self.rooms = set()
+        self.unparsed = []  # (course_id, error) for schedules that could not be indexed
+
+    @classmethod
+    def meetings(cls, schedule):
+        """((weekday, slot) keys, start minute, end minute, start date, end date)."""
+        start, end = parse_class_time(schedule.get("class_time"))
+        keys = [
+            (weekday, slot)
+            for weekday in parse_days(schedule.get("days"))
+            for slot in range(start // cls.SLOT_MINUTES, (end - 1) // cls.SLOT_MINUTES + 1)
+        ]
+        return keys, start, end, schedule.get("start_date") or FIRST_DATE, schedule.get("end_date") or LAST_DATE
+
+    def add(self, course_id, schedule):
+        self.schedules.setdefault(course_id, []).append(schedule)
+        try:
+            keys, start, end, start_date, end_date = self.meetings(schedule)
+        except ValueError as e:
+            self.unparsed.append((course_id, str(e)))
+            return False
+        room = schedule.get("room")
+        for key in keys:
+            self.slots.setdefault(key, IntervalList()).add(start_date, end_date, (course_id, start, end, room))
+        self.course_meetings.setdefault(course_id, []).append((frozenset(keys), start, end, start_date, end_date))
+        if room:
+            self.rooms.add(room)
+        return True
+
+    def conflicts(self, schedule, course_ids=None):
+        """Courses meeting at the same time as schedule.
+
+        With course_ids, only those courses' meetings are read; without,
+        every course in the slots schedule touches is a candidate.
+        """
+        try:
+            keys, start, end, start_date, end_date = self.meetings(schedule)
+        except ValueError:
+            return []
+        found = {}
+        if course_ids is not None:
+            keys = set(keys)
+            for course_id in course_ids:
+                for other_keys, other_start, other_end, other_start_date, other_end_date in (
+                    self.course_meetings.get(course_id, ())
+                ):
+                    if (other_start < end and start < other_end
+                            and other_start_date <= end_date and start_date <= other_end_date
+                            and not keys.isdisjoint(other_keys)):
+                        found[course_id] = None
+                        break
+            return list(found)
+        for key in keys:
+            intervals = self.slots.get(key)
+            if intervals is None:
+                continue
+            for course_id, other_start, other_end, _ in intervals.overlapping(start_date, end_date):
+                if other_start < end and start < other_end:
+                    found[course_id] = None
+        return list(found)
+
+    def in_class(self, when):
+        """(course_id, room) pairs meeting at datetime when."""
+        minute = when.hour * 60 + when.minute
+        intervals = self.slots.get((when.weekday(), minute // self.SLOT_MINUTES))
+        if intervals is None:
+            return []
+        day = when.strftime("%Y-%m-%d")
+        return [
+            (course_id, room)
+            for course_id, start, end, room in intervals.overlapping(day, day)
+            if start <= minute < end
+        ]
+
+
+class DeadlineIndex:
+    """Assignments ordered by due date, platform-wide and per course.
+
+    Each scope keeps a sorted list of (due date, insertion number) keys next
+    to its entries, so the deadlines in a date window are one bisect away:
+    O(log n + k). A student's deadlines merge the slices of their courses.
+    """
+    def __init__(self):
+        self.scopes = {None: ([], [])}  # course_id (None: every course) -> (keys, entries)
+        self.added = 0
+        self.unparsed = 0  # Assignments whose due date is not YYYY-MM-DD
+
+    def __len__(self):
+        return len(self.scopes[None][0])
+
+    @staticmethod
+    def parse_due_date(due_date):
+        try:
+            return datetime.strptime(str(due_date).strip()[:10], "%Y-%m-%d").date()
+        except ValueError:
+            return None
+
+    def add(self, course_id, assignment_name, due_date, description=""):
+        due = self.parse_due_date(due_date)
+        if due is None:
+            self.unparsed += 1
+            return False
+        key = (due, self.added)
+        self.added += 1
+        entry = {
+            "course_id": course_id,
+            "assignment_name": assignment_name,
+            "due_date": due_date,
+            "description": description,
+        }
+        for scope in (None, course_id):
+            keys, entries = self.scopes.setdefault(scope, ([], []))
+            i = bisect_right(keys, key)
+            keys.insert(i, key)
+            entries.insert(i, entry)
+        return True
+
+    def _window(self, scope, start, end):
+        keys, entries = self.scopes.get(scope, ((), ()))
+        lo = bisect_left(keys, (start,))
+        hi = bisect_left(keys, (end + timedelta(days=1),))
+        return zip(keys[lo:hi], entries[lo:hi])
+
+    def upcoming(self, days=7, today=None, course_ids=None):
+        """Entries due from today through today + days, earliest first.
+
+        course_ids limits the result to those courses (None: all of them).
+        """
+        start = today or date.today()
+        end = start + timedelta(days=days)
+        if course_ids is None:
+            windows = [self._window(None, start, end)]
+        else:
+            windows = [self._window(course_id, start, end) for course_id in dict.fromkeys(course_ids)]
+        return [entry for _, entry in heapq.merge(*windows, key=lambda pair: pair[0])]
+
+
+class PrefixTrie:
+    """Words in a character trie, for prefix completion.
+
+    Each node is a dict of next character -> node; the "" key of a node
+    holds the word ending there and how many documents use it.
+    """
+    def __init__(self):
+        self.root = {}
+
+    def add(self, word, documents=1):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        previous = node.get("", (word, 0))[1]
+        node[""] = (word, previous + documents)
+
+    def words(self, prefix):
+        """(word, document count) of every word starting with prefix."""
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        found = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char:
+                    stack.append(child)
+                else:
+                    found.append(child)
+        return found
+
+    def complete(self, prefix, limit=10):
+        """The limit most used words starting with prefix."""
+        return [word for word, _ in heapq.nsmallest(limit, self.words(prefix), key=lambda pair: (-pair[1], pair[0]))]
+
+
+SEARCH_TOKEN = re.compile(r"[^\W_]+")  # Runs of letters and digits
+
+
+def search_tokens(text):
+    return SEARCH_TOKEN.findall(str(text or "").lower())
+
+
+class CourseSearchIndex:
+    """Inverted index over course names, descriptions and assignment titles.
+
+    Each token maps to {course_id: field-weighted count}. A query's
+    tokens must all match; the last one is taken as a prefix (looked up in
+    a PrefixTrie) so results appear while the user is still typing.
+    Matches are ranked by the sum of their token weights times the
+    token's inverse document frequency. Every word starting with the
+    prefix is tried, however rarely used, so the prefix costs time in
+    proportion to how many indexed words start with it (short prefixes are
+    the expensive ones). Each posting is also kept sorted by weight
+    (rebuilt on first use after it changes), so a query made of a prefix
+    alone only reads the best few courses of each of those words.
+    """
+    FIELD_WEIGHTS = {"name": 3.0, "assignment": 2.0, "description": 1.0}
+
+    def __init__(self):
+        self.postings = {}  # token -> {course_id: weight}
+        self.ranked = {}  # token -> [(-weight, course_id)], sorted
+        self.trie = PrefixTrie()
+        self.courses = set()
+
+    def __len__(self):
+        return len(self.courses)
+
+    def add_text(self, course_id, text, field):
+        self.courses.add(course_id)
+        weight = self.FIELD_WEIGHTS[field]
+        for token in search_tokens(text):
+            posting = self.postings.setdefault(token, {})
+            if course_id not in posting:
+                self.trie.add(token)
+            posting[course_id] = posting.get(course_id, 0.0) + weight
+            self.ranked.pop(token, None)
+
+    def add_course(self, course):
+        course_id = course["course_id"]
+        self.add_text(course_id, course.get("name"), "name")
+        self.add_text(course_id, course.get("description"), "description")
+        for assignment in course.get("assignments", []):
+            self.add_text(course_id, assignment.get("assignment_name"), "assignment")
+
+    def _idf(self, posting):
+        return math.log(1 + len(self.courses) / len(posting))
+
+    def _ranked(self, token):
+        ranked = self.ranked.get(token)
+        if ranked is None:
+            ranked = self.ranked[token] = sorted((-weight, course_id) for course_id, weight in self.postings[token].items())
+        return ranked
+
+    def _expansions(self, prefix):
+        """[(posting, idf, word)] of every word starting with prefix."""
+        return [(self.postings[word], self._idf(self.postings[word]), word) for word, _ in self.trie.words(prefix)]
+
+    def _prefix_scores(self, expansions, candidates=None, limit=None):
+        """{course_id: score} for the prefix: its best word's weight times idf.
+
+        With candidates, only those courses are scored; with limit, only the
+        limit best courses of each word are read (enough for a top-limit).
+        """
+        scores = {}
+        for posting, idf, word in expansions:
+            if candidates is not None:
+                pairs = ((course_id, posting[course_id]) for course_id in candidates if course_id in posting)
+            elif limit is not None:
+                pairs = ((course_id, -negated) for negated, course_id in self._ranked(word)[:limit])
+            else:
+                pairs = posting.items()
+            for course_id, weight in pairs:
+                scores[course_id] = max(scores.get(course_id, 0.0), weight * idf)
+        return scores
+
+    def search(self, query, limit=10, prefix=True):
+        """[(course_id, score)] of the best matches, best first."""
+        tokens = search_tokens(query)
+        if not tokens:
+            return []
+        postings = []
+        for token in tokens[:-1] if prefix else tokens:
+            posting = self.postings.get(token)
+            if not posting:
+                return []
+            postings.append((posting, self._idf(posting)))
+        postings.sort(key=lambda pair: len(pair[0]))  # Intersect starting from the rarest token
+        if postings:
+            scores = {}
+            for course_id in postings[0][0]:
+                score = 0.0
+                for posting, idf in postings:
+                    weight = posting.get(course_id)
+                    if weight is None:
+                        break
+                    score += weight * idf
+                else:
+                    scores[course_id] = score
+        if prefix:
+            expansions = self._expansions(tokens[-1])
+            if not postings:
+                scores = self._prefix_scores(expansions, limit=limit)
+            elif len(scores) * len(expansions) < sum(len(posting) for posting, _, _ in expansions):
+                last = self._prefix_scores(expansions, candidates=scores)  # Fewer lookups than the union
+                scores = {course_id: score + last[course_id] for course_id, score in scores.items() if course_id in last}
+            else:
+                last = self._prefix_scores(expansions)
+                scores = {course_id: score + last[course_id] for course_id, score in scores.items() if course_id in last}
+        return heapq.nsmallest(limit, scores.items(), key=lambda pair: (-pair[1], pair[0]))
+
+
+DATA_SECTIONS = ("users", "students", "instructors", "courses", "assignments", "grades", "schedules")
+SCHEMA_VERSION = 2  # 2: students/instructors reference courses by course_id
+
+# Typed entity held in memory for each section ("users" stay plain dicts)
+ENTITY_TYPES = {
+    "students": Student,
+    "instructors": Instructor,
+    "courses": Course,
+    "assignments": Assignment,
+    "grades": Grade,
+    "schedules": Schedule,
+}
+
+
+def decode_section(section, records):
+    """Typed records for a section read from storage."""
+    entity = ENTITY_TYPES.get(section)
+    return entity.from_dicts(records) if entity else records
+
+
+def decode_data(data):
+    """Swap the plain dicts of every loaded section for typed records."""
+    is_loaded = getattr(data, "is_loaded", data.__contains__)
+    for section in ENTITY_TYPES:
+        if is_loaded(section):
+            data[section] = decode_section(section, data[section])
+    if isinstance(data, LazySections):
+        data.decode = decode_section  # Sections parsed later are decoded too
+
+
+def encode_section(records):
+    """Plain dicts for a section, so json.dumps can use its C encoder."""
+    return [r.to_dict() if isinstance(r, Record) else r for r in records]
+
+
+def encode_record(value):
+    """json.dumps default= hook for typed records nested in a change."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def snapshot_value(value):
+    """value as it is now: containers are deep-copied, scalars shared."""
+    if isinstance(value, (list, dict, Record)):
+        return copy.deepcopy(value)
+    return value
+
+
+def encode_change(change):
+    """One journal line for a pending change dict."""
+    return json.dumps(change, separators=(",", ":"), default=encode_record) + "\n"
+
+
+class Metrics:
+    """Operation timers, counters and histograms for one process.
+
+    Off by default, and then costs nothing on the timed methods: enable()
+    wraps each method in INSTRUMENTED_METHODS with a timer (recorded in the
+    platform_operation_seconds histogram, by "Class.method") and disable()
+    puts the originals back. The few counters inside hot code check
+    METRICS.enabled before calling count(). Menu actions are timed from the
+    choice to the next menu, prompts included. dump() writes the Prometheus
+    text format, or JSON for a .json file; capture() profiles a session
+    with cProfile and/or tracemalloc.
+    """
+    # Histogram bucket upper bounds, in seconds
+    BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.enabled = False
+        self.counters = {}  # (name, labels) -> value
+        self.gauges = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [count per bucket..., count above the last, sum]
+        self._lock = threading.Lock()
+        self._wrapped = []  # (class, attribute, original method)
+        self._actions = {}  # Menu -> (choice, start) of the action in progress
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def count(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def gauge(self, name, value, **labels):
+        if self.enabled:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(self.BUCKETS) + 1) + [0.0]
+            histogram[bisect_left(self.BUCKETS, seconds)] += 1
+            histogram[-1] += seconds
+
+    def _instrument(self, owner, attribute):
+        original = owner.__dict__[attribute]
+        op = f"{owner.__name__}.{attribute}"
+        metrics = self
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            except BaseException:
+                metrics.count("platform_operation_errors_total", op=op)
+                raise
+            finally:
+                metrics.observe("platform_operation_seconds", time.perf_counter() - start, op=op)
+
+        setattr(owner, attribute, timed)
+        self._wrapped.append((owner, attribute, original))
+
+    def enable(self, methods=None):
+        if self.enabled:
+            return
+        for owner, attributes in INSTRUMENTED_METHODS if methods is None else methods:
+            for attribute in attributes:
+                self._instrument(owner, attribute)
+        self.enabled = True
+
+    def disable(self):
+        for owner, attribute, original in reversed(self._wrapped):
+            setattr(owner, attribute, original)
+        self._wrapped = []
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def menu_action(self, menu, choice=None):
+        """Finish the menu's running action and start timing choice (None: just finish)."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        running = self._actions.pop(menu, None)
+        if running is not None:
+            self.observe("platform_menu_action_seconds", now - running[1], menu=menu, choice=running[0])
+        if choice is not None:
+            self._actions[menu] = (choice, now)
+
+    def to_dict(self):
+        def samples(values):
+            return [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(values.items())]
+
+        histograms = []
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            cumulative = list(itertools.accumulate(histogram[:-1]))
+            histograms.append({
+                "name": name,
+                "labels": dict(labels),
+                "count": cumulative[-1],
+                "sum": histogram[-1],
+                "buckets": {str(bound): n for bound, n in zip(self.BUCKETS + ("+Inf",), cumulative)},
+            })
+        return {"counters": samples(self.counters), "gauges": samples(self.gauges), "histograms": histograms}
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+    def to_prometheus(self):
+        lines = []
+        typed = set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            declare(name, "counter")
+            lines.append(f"{name}{self._labels(labels)} {value}")
+        for (name, labels), value in sorted(self.gauges.items()):
+            declare(name, "gauge")
+            lines.append(f"{name}{self._labels(labels)} {value}")
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            declare(name, "histogram")
+            cumulative = list(itertools.accumulate(histogram[:-1]))
+            for bound, n in zip(self.BUCKETS + ("+Inf",), cumulative):
+                lines.append(f"{name}_bucket{self._labels(labels, [('le', bound)])} {n}")
+            lines.append(f"{name}_sum{self._labels(labels)} {histogram[-1]}")
+            lines.append(f"{name}_count{self._labels(labels)} {cumulative[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path, fmt=None):
+        """Write the metrics to path; fmt is "json" or "prometheus" (default: by extension)."""
+        fmt = fmt or ("json" if path.endswith(".json") else "prometheus")
+        with open(path, "w") as f:
+            if fmt == "json":
+                json.dump(self.to_dict(), f, indent=4)
+            else:
+                f.write(self.to_prometheus())
+
+    @contextlib.contextmanager
+    def capture(self, profile_file=None, trace_memory=False, top=15):
+        """Profile the block: cProfile stats to profile_file, tracemalloc's top allocations.
+
+        Summaries go to stderr; the peak traced memory is also kept as a gauge.
+        """
+        profiler = cProfile.Profile() if profile_file else None
+        if trace_memory:
+            tracemalloc.start()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            if trace_memory:
+                # Taken before the profile is printed, so pstats' own allocations are left out
+                snapshot = tracemalloc.take_snapshot().filter_traces([
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, cProfile.__file__),
+                ])
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.gauge("platform_traced_memory_bytes", current)
+                self.gauge("platform_traced_memory_peak_bytes", peak)
+                print(f"Traced memory: {current / 2 ** 20:.1f} MiB now, {peak / 2 ** 20:.1f} MiB peak. "
+                      f"Top {top} allocation sites:", file=sys.stderr)
+                for stat in snapshot.statistics("lineno")[:top]:
+                    print(f"  {stat}", file=sys.stderr)
+            if profiler:
+                profiler.dump_stats(profile_file)
+                print(f"Profile written to {profile_file}. Top {top} by cumulative time:", file=sys.stderr)
+                pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(top)
+
+
+METRICS = Metrics()
+
+
+def empty_data():
+    return {section: [] for section in DATA_SECTIONS}
+
+
+def resolve_path(data, path):
+    node = data
+    for key in path:
+        node = node[key]
+    return node
+
+
+def apply_path_change(data, op, path, value):
+    """Apply one journaled change ("append" or "set") to a data tree."""
+    if op == "append":
+        resolve_path(data, path).append(value)
+    elif op == "set":
+        resolve_path(data, path[:-1])[path[-1]] = value
+    else:
+        raise ValueError(f"Unknown change operation: {op}")
+
+
+def next_course_id(existing_ids):
+    """Generate an unused course_id ("C1", "C2", ...)."""
+    number = len(existing_ids) + 1
+    while f"C{number}" in existing_ids:
+        number += 1
+    return f"C{number}"
+
+
+def merge_course(target, source):
+    """Fold an embedded course copy into its catalog entry."""
+    for key, value in source.items():
+        if key not in target:
+            target[key] = value
+    # Keep assignments (and their grades) that only existed on the copy
+    assignments = {a["assignment_name"]: a for a in target.get("assignments", [])}
+    for assignment in source.get("assignments", []):
+        existing = assignments.get(assignment["assignment_name"])
+        if existing is None:
+            target["assignments"].append(assignment)
+            assignments[assignment["assignment_name"]] = assignment
+        elif existing is not assignment:
+            graded = {g["student_id"] for g in existing.setdefault("grades", [])}
+            existing["grades"].extend(g for g in assignment.get("grades", []) if g["student_id"] not in graded)
+
+
+def normalize_data(data):
+    """Migrate embedded course copies to course_id references.
+
+    Older files store the whole course dict in each student's "courses" and
+    each instructor's "courses_taught". Every course now lives once in
+    data["courses"], and those lists hold course IDs. Returns True if
+    anything had to be migrated. Normalized data is tagged with "_schema" so
+    later loads can skip the scan (and lazy loads stay lazy).
+    """
+    if data.get("_schema") == SCHEMA_VERSION:
+        return False
+    data["_schema"] = SCHEMA_VERSION
+    courses = data["courses"]
+    changed = False
+    by_id = {}
+    by_name = {}
+    for course in courses:
+        if not course.get("course_id"):
+            course["course_id"] = next_course_id(by_id)
+            changed = True
+        by_id.setdefault(course["course_id"], course)
+        by_name.setdefault(course.get("name"), course)
+
+    def catalog_id(course):
+        catalog_course = by_id.get(course.get("course_id")) or by_name.get(course.get("name"))
+        if catalog_course is None:
+            catalog_course = dict(course)
+            if not catalog_course.get("course_id"):
+                catalog_course["course_id"] = next_course_id(by_id)
+            courses.append(catalog_course)
+            by_id[catalog_course["course_id"]] = catalog_course
+            by_name.setdefault(catalog_course.get("name"), catalog_course)
+        else:
+            merge_course(catalog_course, course)
+        return catalog_course["course_id"]
+
+    people = data["students"] + data["instructors"] + [u["person"] for u in data["users"] if "person" in u]
+    for person in people:
+        for key in ("courses", "courses_taught"):
+            references = person.get(key)
+            if references and any(isinstance(c, dict) for c in references):
+                ids = [catalog_id(c) if isinstance(c, dict) else c for c in references]
+                person[key] = list(dict.fromkeys(ids))
+                changed = True
+    return changed
+
+
+def scan_json_sections(raw):
+    """Parse a top-level JSON object, noting where each value lies.
+
+    Returns (data, offsets) where offsets maps each key to the (start, end)
+    byte range of its value in raw.
+    """
+    text = raw.decode("utf-8")
+    decoder = json.JSONDecoder()
+    whitespace = " \t\r\n"
+
+    def skip(i):
+        while i < len(text) and text[i] in whitespace:
+            i += 1
+        return i
+
+    def byte_offset(i):
+        return i if ascii_only else len(text[:i].encode("utf-8"))
+
+    ascii_only = text.isascii()
+    data = {}
+    offsets = {}
+    i = skip(0)
+    if text[i:i + 1] != "{":
+        raise json.JSONDecodeError("Expected a JSON object", text, i)
+    i = skip(i + 1)
+    while text[i:i + 1] != "}":
+        key, i = decoder.raw_decode(text, i)
+        i = skip(i)
+        if text[i:i + 1] != ":":
+            raise json.JSONDecodeError("Expected ':'", text, i)
+        start = skip(i + 1)
+        data[key], end = decoder.raw_decode(text, start)
+        offsets[key] = (byte_offset(start), byte_offset(end))
+        i = skip(end)
+        if text[i:i + 1] == ",":
+            i = skip(i + 1)
+    return data, offsets
+
+
+@contextlib.contextmanager
+def gc_paused():
+    """Suspend the cyclic garbage collector for the block.
+
+    Parsing a snapshot allocates millions of containers, none of them
+    garbage, and each collection triggered meanwhile walks them all again;
+    that is about half the time of a fast parse.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def json_loads(raw):
+    """Parse JSON text or bytes, with orjson when it is installed."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def compact_json(value):
+    """value as JSON without whitespace and with non-ASCII escaped, as json.dumps does."""
+    if orjson is not None:
+        encoded = orjson.dumps(value, default=encode_record).decode()
+        if encoded.isascii():  # orjson writes UTF-8; offsets need ASCII
+            return encoded
+    return json.dumps(value, separators=(",", ":"), default=encode_record)
+
+
+def _snapshot_items(data, extra=None):
+    """(key, value) pairs of a snapshot: the sections in order, then the rest."""
+    items = [(section, data[section]) for section in DATA_SECTIONS]
+    items += [(key, value) for key, value in data.items() if key not in DATA_SECTIONS]
+    items += list((extra or {}).items())
+    return [(key, encode_section(value) if key in ENTITY_TYPES else value) for key, value in items]
+
+
+def dump_sectioned_json(data, f, extra=None, compact=False):
+    """Write data the way json.dump(data, f, indent=4) does (or without whitespace, if compact).
+
+    Sections are written one at a time so each value's byte range is known;
+    returns {key: (start, end)}. The output is ASCII, so characters and
+    bytes line up.
+    """
+    items = _snapshot_items(data, extra)
+    offsets = {}
+    position = f.write("{")
+    for n, (key, value) in enumerate(items):
+        if compact:
+            position += f.write(("," if n else "") + json.dumps(key) + ":")
+            encoded = compact_json(value)
+        else:
+            position += f.write(("," if n else "") + "\n    " + json.dumps(key) + ": ")
+            encoded = json.dumps(value, indent=4, default=encode_record).replace("\n", "\n    ")
+        offsets[key] = (position, position + len(encoded))
+        position += f.write(encoded)
+    f.write("\n}" if items and not compact else "}")
+    return offsets
+
+
+SNAPSHOT_FORMATS = ("json", "compact", "binary")
+SNAPSHOT_MAGIC = b"\x89PSNAP\r\n"  # Starts every binary snapshot; JSON never does
+SNAPSHOT_VERSION = 1
+SNAPSHOT_COMPRESSIONS = ("none", "zlib", "lzma")
+SNAPSHOT_RECORD = struct.Struct("<QI")  # Payload length, CRC-32 of the payload
+
+
+def _compress(compression, raw):
+    if compression == "zlib":
+        return zlib.compress(raw, 6)
+    if compression == "lzma":
+        if lzma is None:
+            raise ValueError("lzma compression is not available in this Python")
+        return lzma.compress(raw, preset=1)
+    return raw
+
+
+def _decompress(compression, payload):
+    if compression == "lzma" and lzma is None:
+        raise ValueError("The snapshot is lzma-compressed, which this Python cannot read")
+    try:
+        if compression == "zlib":
+            return zlib.decompress(payload)
+        if compression == "lzma":
+            return lzma.decompress(payload)
+    except (zlib.error, EOFError) + ((lzma.LZMAError,) if lzma else ()) as e:
+        raise ValueError(f"Cannot decompress the snapshot: {e}")
+    return payload
+
+
+def is_binary_snapshot(f):
+    """True if the file object (opened in binary mode) holds a binary snapshot. Rewinds it."""
+    head = f.read(len(SNAPSHOT_MAGIC))
+    f.seek(0)
+    return head == SNAPSHOT_MAGIC
+
+
+def dump_binary_snapshot(data, f, extra=None, compression="none"):
+    """Write data as a length-prefixed binary snapshot to a binary file.
+
+    After SNAPSHOT_MAGIC, a version byte and the compression (an index
+    into SNAPSHOT_COMPRESSIONS) comes one record per top-level key:
+    <u16 name length><name><u64 payload length><u32 CRC-32 of payload>
+    <payload>, the payload being the key's compact JSON, compressed if
+    asked. Every section can be found by skipping records and verified on
+    its own. Returns {key: (start, end)} of the payloads.
+    """
+    f.write(SNAPSHOT_MAGIC + bytes((SNAPSHOT_VERSION, SNAPSHOT_COMPRESSIONS.index(compression))))
+    position = len(SNAPSHOT_MAGIC) + 2
+    offsets = {}
+    for key, value in _snapshot_items(data, extra):
+        name = key.encode("utf-8")
+        payload = _compress(compression, compact_json(value).encode("ascii"))
+        position += f.write(struct.pack("<H", len(name)) + name)
+        position += f.write(SNAPSHOT_RECORD.pack(len(payload), zlib.crc32(payload)))
+        offsets[key] = (position, position + len(payload))
+        position += f.write(payload)
+    return offsets
+
+
+def scan_binary_snapshot(f):
+    """Read a binary snapshot's record headers, skipping the payloads.
+
+    Returns (compression, {key: (start, end, crc)}).
+    """
+    header = f.read(len(SNAPSHOT_MAGIC) + 2)
+    if header[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC or len(header) != len(SNAPSHOT_MAGIC) + 2:
+        raise ValueError("Not a binary snapshot")
+    version, compression = header[-2:]
+    if version > SNAPSHOT_VERSION or compression >= len(SNAPSHOT_COMPRESSIONS):
+        raise ValueError(f"Unsupported snapshot version {version} or compression {compression}")
+    size = os.fstat(f.fileno()).st_size
+    directory = {}
+    while True:
+        prefix = f.read(2)
+        if not prefix:
+            break
+        name = f.read(struct.unpack("<H", prefix)[0])
+        record = f.read(SNAPSHOT_RECORD.size)
+        if len(record) != SNAPSHOT_RECORD.size:
+            raise ValueError("The snapshot is truncated")
+        length, crc = SNAPSHOT_RECORD.unpack(record)
+        start = f.tell()
+        if start + length > size:
+            raise ValueError("The snapshot is truncated")
+        directory[name.decode("utf-8")] = (start, start + length, crc)
+        f.seek(length, os.SEEK_CUR)
+    return SNAPSHOT_COMPRESSIONS[compression], directory
+
+
+def verify_binary_snapshot(f, directory):
+    """Check every record's CRC-32 without parsing it (ValueError on a mismatch).
+
+    Reads the payloads in chunks, so the cost is one pass over the file
+    at CRC speed, far below what parsing the sections would take.
+    """
+    for key, (start, end, crc) in directory.items():
+        f.seek(start)
+        value = 0
+        remaining = end - start
+        while remaining:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                raise ValueError("The snapshot is truncated")
+            value = zlib.crc32(chunk, value)
+            remaining -= len(chunk)
+        if value != crc:
+            raise ValueError(f"Checksum mismatch in section {key!r}")
+
+
+def decode_binary_section(key, payload, crc, compression):
+    """Verify and parse one record's payload."""
+    if zlib.crc32(payload) != crc:
+        raise ValueError(f"Checksum mismatch in section {key!r}")
+    return json_loads(_decompress(compression, payload))
+
+
+def load_binary_snapshot(f):
+    """Parse every record of a binary snapshot into a dict."""
+    compression, directory = scan_binary_snapshot(f)
+    data = {}
+    for key, (start, end, crc) in directory.items():
+        f.seek(start)
+        data[key] = decode_binary_section(key, f.read(end - start), crc, compression)
+    return data
+
+
+class LazySections(dict):
+    """Top-level data dict whose sections are parsed on first access.
+
+    Built from a section offset table: small scalar keys are read up front,
+    each list section only when something indexes it. Journaled changes for a
+    section that is not loaded yet are held back and applied when it is.
+    Sections are read through the file object the table was checked
+    against, so a snapshot another session renames into place meanwhile
+    does not shift the offsets under us. parse(key, raw) turns a section's
+    bytes into its value (JSON by default; binary snapshots also verify
+    and decompress).
+    """
+    def __init__(self, data_file, offsets, file=None, parse=None):
+        super().__init__()
+        self.data_file = data_file
+        self.file = file or open(data_file, "rb")
+        self.parse = parse or (lambda key, raw: json_loads(raw))
+        self.offsets = dict(offsets)  # Unloaded key -> (start, end) in data_file
+        self.deferred = {}  # Unloaded section -> journaled changes
+        self.decode = None  # decode(key, value) run on each section as it is parsed
+        self._lock = threading.Lock()  # One parse at a time through the shared file
+        for key in [k for k in self.offsets if k not in DATA_SECTIONS]:
+            self[key]
+
+    def __missing__(self, key):
+        with self._lock:
+            if dict.__contains__(self, key):
+                # Another thread parsed it while we waited
+                return dict.__getitem__(self, key)
+            if key not in self.offsets:
+                raise KeyError(key)
+            start, end = self.offsets[key]
+            self.file.seek(start)
+            # Completed before it is stored, so other threads never see a half-decoded section
+            try:
+                with gc_paused():
+                    loaded = {key: self.parse(key, self.file.read(end - start))}
+            except ValueError as e:  # Reported as load_eager does, though it is too late to start empty
+                raise ValueError(f"Data file is corrupt ({e}): {self.data_file}") from e
+            for change in self.deferred.pop(key, []):
+                apply_path_change(loaded, change["op"], change["path"], change["value"])
+            value = loaded[key]
+            if self.decode:
+                value = self.decode(key, value)
+            self[key] = value
+            del self.offsets[key]
+            if not self.offsets:
+                self.file.close()
+            return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self.offsets
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def is_loaded(self, key):
+        return dict.__contains__(self, key)
+
+    def defer(self, change):
+        """Apply a journaled change now, or once its section is loaded."""
+        section = change["path"][0]
+        with self._lock:
+            if section in self.offsets:
+                self.deferred.setdefault(section, []).append(change)
+                return
+        apply_path_change(self, change["op"], change["path"], change["value"])
+
+    def load_all(self):
+        for key in list(self.offsets):
+            self[key]
+
+
+class DataStore(ABC):
+    """Persistence backend for PlatformAdmin.
+
+    load returns the data tree and the sequence number of the last change it
+    contains. write_changes receives the (op, path, change) changes made
+    since the last save, change being the journal entry as a dict; write_snapshot rewrites everything.
+
+    Stores that several sessions may share set lock_file: lock then takes
+    an fcntl advisory lock on it, and stamp tells a session whether another
+    one has saved since it last looked.
+    """
+    # Whether PlatformAdmin should queue changes for write_changes
+    tracks_changes = False
+    bytes_written = 0  # Written by this store so far (journal lines, snapshots, row documents)
+    verbose = True  # Print status messages (loads here, saves in PlatformAdmin)
+    lock_file = None
+    _lock_depth = 0
+
+    @contextlib.contextmanager
+    def lock(self, exclusive=False):
+        """Context manager held around loads (shared) and writes (exclusive)."""
+        # Re-entrant: a nested lock (e.g. a reload while saving) reuses the held one
+        if fcntl is None or self.lock_file is None or self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        with open(self.lock_file, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1  # Closing the file releases the lock
+
+    def say(self, message):
+        if self.verbose:
+            print(message)
+
+    def stamp(self):
+        """A cheap fingerprint that changes whenever another session saves (None: not tracked)."""
+        return None
+
+    @abstractmethod
+    def load(self):
+        pass
+
+    @abstractmethod
+    def write_changes(self, data, seq, changes):
+        pass
+
+    @abstractmethod
+    def write_snapshot(self, data, seq):
+        pass
+
+
+class JsonStore(DataStore):
+    """The original single JSON file, with an optional append-only journal.
+
+    With journal=True, changes are appended as compact JSON lines to
+    <data_file>.journal and replayed over the snapshot on load. Once at
+    least compact_every entries have accumulated and the journal has grown
+    as large as the snapshot, a fresh snapshot is written atomically and the
+    journal truncated, which keeps compaction cost amortized O(1) per change.
+
+    With lazy=True, a section offset table (<data_file>.sections) is kept
+    next to the file and load returns a LazySections dict, so a session only
+    parses the sections it actually touches.
+
+    Several sessions may share the files: lock takes an fcntl advisory lock
+    on <data_file>.lock (shared for loads, exclusive for writes), snapshots
+    are always renamed into place, and stamp (two stat calls) tells a
+    session whether anyone else has saved since it last looked.
+
+    snapshot_format picks how snapshots are written: "json" (indented, the
+    original layout), "compact" (no whitespace) or "binary" (see
+    dump_binary_snapshot, optionally zlib or lzma compressed). Loads detect
+    the format of whatever file is there, so switching needs no migration.
+    """
+    def __init__(self, data_file="data2.json", journal=False, compact_every=1000, lazy=False,
+                 snapshot_format="json", compression="none"):
+        if snapshot_format not in SNAPSHOT_FORMATS:
+            raise ValueError(f"Unknown snapshot format: {snapshot_format}")
+        if compression not in SNAPSHOT_COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "lzma" and lzma is None:
+            raise ValueError("lzma compression is not available in this Python")
+        self.data_file = data_file
+        self.snapshot_format = snapshot_format
+        self.compression = compression
+        self.journal = journal
+        self.lazy = lazy
+        self.journal_file = data_file + ".journal"
+        self.sections_file = data_file + ".sections"
+        self.compact_every = compact_every
+        self.journal_entries = 0  # Changes in the journal since the last snapshot
+        self.journal_bytes = 0
+        self.snapshot_bytes = 0
+        self.tracks_changes = journal
+        self.lock_file = data_file + ".lock"
+
+    def stamp(self):
+        stamp = []
+        for path in (self.data_file, self.journal_file):
+            try:
+                stat = os.stat(path)
+                stamp.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def load(self):
+        data = self.load_lazy() if self.lazy else None
+        if data is None:
+            with gc_paused():
+                data = self.load_eager()
+        seq = data.pop("_journal_seq", 0)
+        self.snapshot_bytes = os.path.getsize(self.data_file) if os.path.exists(self.data_file) else 0
+        # Older data files may be missing some sections (e.g. "schedules")
+        for section in DATA_SECTIONS:
+            if section not in data:
+                data[section] = []
+        # Always replay, so a non-journaled session never drops journaled changes
+        seq = self.replay_journal(data, seq)
+        return data, seq
+
+    def load_eager(self):
+        data = empty_data()
+        try:
+            with open(self.data_file, "rb") as f:
+                if is_binary_snapshot(f):
+                    data = load_binary_snapshot(f)
+                elif self.lazy:
+                    # Parse once while recording the offset table for next time
+                    data, offsets = scan_json_sections(f.read())
+                    self.write_offsets(offsets)
+                else:
+                    data = json_loads(f.read())
+            self.say("Data loaded successfully.")
+        except FileNotFoundError:
+            self.say("Data file not found. Starting with empty data.")
+        except ValueError as e:  # Bad JSON or UTF-8, or a binary snapshot that fails its checks
+            self.say(f"Data file is corrupt ({e}). Starting with empty data.")
+        return data
+
+    def load_lazy(self):
+        """Open the data file through its offset table, if it is current.
+
+        Binary snapshots carry their own table: the record headers. Their
+        checksums are all verified here, so a damaged snapshot falls back
+        to load_eager (which reports it) instead of failing mid-session.
+        Returns None whenever the eager path should be taken.
+        """
+        try:
+            data_file = open(self.data_file, "rb")
+        except FileNotFoundError:
+            return None
+        if is_binary_snapshot(data_file):
+            try:
+                compression, directory = scan_binary_snapshot(data_file)
+                verify_binary_snapshot(data_file, directory)
+            except ValueError:
+                data_file.close()
+                return None  # load_eager reports it
+
+            def parse(key, raw):
+                return decode_binary_section(key, raw, directory[key][2], compression)
+
+            offsets = {key: (start, end) for key, (start, end, _) in directory.items()}
+            return self._open_lazy(offsets, data_file, parse)
+        try:
+            with open(self.sections_file, "r") as f:
+                table = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data_file.close()
+            return None
+        stat = os.fstat(data_file.fileno())
+        if table.get("size") != stat.st_size or table.get("mtime_ns") != stat.st_mtime_ns:
+            data_file.close()
+            return None  # The data file changed since the table was written
+        return self._open_lazy(table["offsets"], data_file)
+
+    def _open_lazy(self, offsets, data_file, parse=None):
+        try:
+            data = LazySections(self.data_file, offsets, data_file, parse)  # Parses the small keys now
+        except ValueError:
+            data_file.close()
+            return None  # load_eager reports it
+        self.say("Data loaded successfully.")
+        return data
+
+    def write_offsets(self, offsets):
+        stat = os.stat(self.data_file)
+        table = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "offsets": offsets}
+        with open(self.sections_file, "w") as f:
+            json.dump(table, f)
+
+    def replay_journal(self, data, seq):
+        """Re-apply journaled changes newer than the loaded snapshot."""
+        self.journal_entries = 0
+        self.journal_bytes = 0
+        try:
+            with open(self.journal_file, "r") as f:
+                for line in f:
+                    try:
+                        change = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from a crash mid-write; stop here
+                        self.say("Journal has an incomplete entry. Ignoring the rest.")
+                        break
+                    self.journal_entries += 1
+                    self.journal_bytes += len(line)
+                    if change["seq"] <= seq:
+                        continue
+                    if isinstance(data, LazySections):
+                        data.defer(change)
+                    else:
+                        apply_path_change(data, change["op"], change["path"], change["value"])
+                    seq = change["seq"]
+        except FileNotFoundError:
+            pass
+        return seq
+
+    def write_changes(self, data, seq, changes):
+        lines = "".join(encode_change(change) for _, _, change in changes)
+        with open(self.journal_file, "a") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_entries += len(changes)
+        self.journal_bytes += len(lines)
+        self.bytes_written += len(lines)
+        if self.journal_entries >= self.compact_every and self.journal_bytes >= self.snapshot_bytes:
+            self.write_snapshot(data, seq)
+
+    def write_snapshot(self, data, seq):
+        if isinstance(data, LazySections):
+            # The file is about to be replaced, so read what is still unparsed
+            data.load_all()
+        # Written aside and renamed into place, so readers (and a crash) only
+        # ever see a whole file. The snapshot records its sequence number (the
+        # data version), so a crash between the rename and the truncate only
+        # leaves already-applied journal entries.
+        temp_file = self.data_file + ".tmp"
+        with open(temp_file, "wb" if self.snapshot_format == "binary" else "w") as f:
+            if self.snapshot_format == "binary":
+                dump_binary_snapshot(data, f, {"_journal_seq": seq}, self.compression)
+                offsets = None  # Binary snapshots are their own offset table
+            else:
+                offsets = dump_sectioned_json(data, f, {"_journal_seq": seq}, self.snapshot_format == "compact")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.data_file)
+        if self.journal or self.journal_entries:
+            open(self.journal_file, "w").close()
+            self.journal_entries = 0
+            self.journal_bytes = 0
+        self.snapshot_bytes = os.path.getsize(self.data_file)
+        self.bytes_written += self.snapshot_bytes
+        if self.lazy and offsets is not None:
+            self.write_offsets(offsets)
+
+
+class SqliteStore(DataStore):
+    """SQLite backend: a table per data section, plus child tables for the
+    lists that grow with use.
+
+    Enrollments, course assignments, assignment grades and students'
+    course grades live in their own tables, keyed by their positions in
+    the lists they mirror (as section rows are by position). A change only
+    rewrites the rows under its path: a new grade is one row insert and a
+    regrade a one-row update, whatever the size of the course. Lookup
+    fields are copied into indexed columns for querying the database
+    directly. PlatformAdmin works on the whole data tree in memory, so
+    load still reads every table.
+
+    Rows are keyed by position, so two sessions appending to the same list
+    would claim the same row. Sessions therefore share it as they share a
+    JSON file: writes hold an fcntl lock on <db_file>.lock, and every write
+    bumps a version counter in meta, which is the stamp. A session that
+    finds the version moved reloads and replays its changes first (see
+    PlatformAdmin._rebase), so its appends land after the other session's.
+    """
+    tracks_changes = True
+    LAYOUT = "2"  # 2: nested lists in child tables (1 kept them inside the parent's doc)
+
+    # Section -> columns extracted from each record (besides position/doc)
+    COLUMNS = {
+        "users": ("email", "role"),
+        "students": ("student_id", "name"),
+        "instructors": ("instructor_id", "name"),
+        "courses": ("course_id", "name"),
+        "assignments": ("assignment_id", "course_id", "due_date"),
+        "grades": ("student_id", "course_id", "assignment_id", "grade_value"),
+        "schedules": ("course_id", "start_date", "end_date"),
+    }
+    # Path of a nested list (section, then list keys) -> its table and columns
+    CHILD_TABLES = {
+        ("students", "courses"): ("enrollments", ("course_id",)),
+        ("students", "grades"): ("student_grades", ("course_name", "grade")),
+        ("courses", "assignments"): ("course_assignments", ("assignment_name", "due_date")),
+        ("courses", "assignments", "grades"): ("assignment_grades", ("student_id", "grade")),
+    }
+    INDEXES = {
+        "users": (("email",),),
+        "students": (("student_id",),),
+        "instructors": (("instructor_id",),),
+        "courses": (("course_id",), ("name",)),
+        "assignments": (("course_id", "due_date"),),
+        "grades": (("student_id", "course_id"), ("course_id", "assignment_id")),
+        "schedules": (("course_id",),),
+        "enrollments": (("course_id",),),
+        "student_grades": (("course_name",),),
+        "course_assignments": (("due_date",),),
+        "assignment_grades": (("student_id",),),
+    }
+
+    def __init__(self, db_file="data2.db"):
+        self.db_file = db_file
+        self.lock_file = db_file + ".lock"
+        # One connection for every thread of the session, only used under
+        # _conn_lock (PlatformAdmin's locks already keep writes one at a time)
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn_lock = threading.RLock()
+        self.create_tables()
+
+    @staticmethod
+    def _table(kind):
+        return kind[0] if len(kind) == 1 else SqliteStore.CHILD_TABLES[kind][0]
+
+    @staticmethod
+    def _keys(kind):
+        """Key columns of a kind of row: its position in each list on its path."""
+        return ("position",) if len(kind) == 1 else tuple(f"pos{n}" for n in range(len(kind)))
+
+    def _columns(self, kind):
+        return self.COLUMNS[kind[0]] if len(kind) == 1 else self.CHILD_TABLES[kind][1]
+
+    def _children(self, kind):
+        return [child[-1] for child in self.CHILD_TABLES if child[:-1] == kind]
+
+    def create_tables(self):
+        with self._conn_lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            for kind in [(section,) for section in DATA_SECTIONS] + list(self.CHILD_TABLES):
+                table = self._table(kind)
+                keys = self._keys(kind)
+                key_sql = "position INTEGER PRIMARY KEY" if len(kind) == 1 else ", ".join(f"{k} INTEGER" for k in keys)
+                column_sql = "".join(f", {column} TEXT" for column in self._columns(kind))
+                primary_sql = "" if len(kind) == 1 else f", PRIMARY KEY ({', '.join(keys)})"
+                self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({key_sql}{column_sql}, doc TEXT NOT NULL{primary_sql})")
+                for index_columns in self.INDEXES.get(table, ()):
+                    index_name = f"idx_{table}_{'_'.join(index_columns)}"
+                    self.conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({', '.join(index_columns)})"
+                    )
+
+    def _rows(self, kind, keys, record, rows, nested=True):
+        """Add the row of a record (and, if nested, everything under it) to rows ({kind: [row]})."""
+        children = self._children(kind)
+        is_mapping = isinstance(record, (dict, Record))
+        doc = record
+        if is_mapping:
+            doc = record.to_dict() if isinstance(record, Record) else dict(record)
+        values = []
+        for column in self._columns(kind):
+            value = doc.get(column) if is_mapping else doc  # Enrollments are bare course IDs
+            values.append(None if value is None else str(value))
+        for name in children:
+            if is_mapping and isinstance(doc.get(name), list):
+                if nested:
+                    for n, child in enumerate(doc[name]):
+                        self._rows(kind + (name,), keys + (n,), child, rows)
+                doc[name] = []  # Refilled from the child table on load
+        rows.setdefault(kind, []).append((*keys, *values, json.dumps(doc, separators=(",", ":"), default=encode_record)))
+
+    def _insert(self, rows):
+        for kind, kind_rows in rows.items():
+            placeholders = ", ".join("?" * len(kind_rows[0]))
+            self.bytes_written += sum(len(row[-1]) for row in kind_rows)
+            self.conn.executemany(f"INSERT OR REPLACE INTO {self._table(kind)} VALUES ({placeholders})", kind_rows)
+
+    def _delete(self, kind, keys):
+        """Delete the row at keys (all of the section's rows if keys is empty) and everything under it."""
+        for table_kind in [kind] + [child for child in self.CHILD_TABLES if child[:len(kind)] == kind and child != kind]:
+            where = " AND ".join(f"{column} = ?" for column in self._keys(table_kind)[:len(keys)])
+            self.conn.execute(f"DELETE FROM {self._table(table_kind)}" + (f" WHERE {where}" if where else ""), keys)
+
+    def load(self):
+        with self._conn_lock:
+            return self._load()
+
+    def _load(self):
+        data = empty_data()
+        for section in DATA_SECTIONS:
+            cursor = self.conn.execute(f"SELECT doc FROM {section} ORDER BY position")
+            data[section] = [json.loads(doc) for (doc,) in cursor]
+        # Parents before children, each in list order, so every append lands in place
+        for kind in sorted(self.CHILD_TABLES, key=len):
+            keys = self._keys(kind)
+            cursor = self.conn.execute(f"SELECT {', '.join(keys)}, doc FROM {self._table(kind)} ORDER BY {', '.join(keys)}")
+            for *positions, doc in cursor:
+                node = data[kind[0]][positions[0]]
+                for name, position in zip(kind[1:-1], positions[1:-1]):
+                    node = node[name][position]
+                node.setdefault(kind[-1], []).append(json.loads(doc))
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()
+        seq = int(row[0]) if row else 0
+        layout = self.conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+        if layout is None or layout[0] != self.LAYOUT:
+            self.write_snapshot(data, seq)  # Move nested lists out of older databases' docs
+        self.say("Data loaded successfully.")
+        return data, seq
+
+    def _target(self, data, path):
+        """(kind, keys, rewrite_subtree) of the row a change path falls in.
+
+        The row is the deepest section record or child-table item on the
+        path. The whole subtree under it is rewritten when the change
+        replaces the row itself or one of its child lists; otherwise only
+        the row's own document changed.
+        """
+        kind = (path[0],)
+        if len(path) == 1:
+            return kind, (), True  # The whole section was replaced
+        keys = (path[1],)
+        try:
+            node = data[path[0]][path[1]]
+        except (IndexError, KeyError, TypeError):
+            return kind, keys, True  # Gone since (replaced by a later change): just delete it
+        i = 2
+        while i < len(path):
+            name = path[i]
+            if kind + (name,) in self.CHILD_TABLES and i + 1 == len(path):
+                return kind, keys, True  # The child list itself was replaced
+            if kind + (name,) not in self.CHILD_TABLES or not isinstance(node, (dict, Record)) \
+                    or not isinstance(node.get(name), list):
+                return kind, keys, False  # A field of this row's document
+            kind, keys = kind + (name,), keys + (path[i + 1],)
+            try:
+                node = node[name][path[i + 1]]
+            except (IndexError, KeyError, TypeError):
+                return kind, keys, True
+            i += 2
+        return kind, keys, True
+
+    def _resolve(self, data, kind, keys):
+        node = data[kind[0]]
+        if not keys:
+            return node
+        node = node[keys[0]]
+        for name, position in zip(kind[1:], keys[1:]):
+            node = node[name][position]
+        return node
+
+    def _rewrite(self, data, kind, keys):
+        self._delete(kind, keys)
+        try:
+            record = self._resolve(data, kind, keys)
+        except (IndexError, KeyError, TypeError):
+            return  # No longer exists
+        rows = {}
+        if keys:
+            self._rows(kind, keys, record, rows)
+        else:
+            for position, section_record in enumerate(record):
+                self._rows(kind, (position,), section_record, rows)
+        self._insert(rows)
+
+    def stamp(self):
+        with self._conn_lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _write_meta(self, seq):
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('seq', ?)", (str(seq),))
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('layout', ?)", (self.LAYOUT,))
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('version', '0')")
+        self.conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'")
+
+    def write_changes(self, data, seq, changes):
+        subtrees = set()
+        documents = set()
+        for op, path, change in changes:
+            if op == "append":
+                path = list(path) + [change["index"]]
+            kind, keys, subtree = self._target(data, path)
+            (subtrees if subtree else documents).add((kind, keys))
+        with self._conn_lock, self.conn:
+            # Shallowest first, skipping what an enclosing rewrite already covered
+            done = []
+            for kind, keys in sorted(subtrees, key=lambda target: len(target[1])):
+                if any(kind[:len(k)] == k and keys[:len(p)] == p for k, p in done):
+                    continue
+                self._rewrite(data, kind, keys)
+                done.append((kind, keys))
+            for kind, keys in documents:
+                if any(kind[:len(k)] == k and keys[:len(p)] == p for k, p in done):
+                    continue
+                rows = {}
+                try:
+                    record = self._resolve(data, kind, keys)
+                except (IndexError, KeyError, TypeError):
+                    continue
+                self._rows(kind, keys, record, rows, nested=False)  # Its children are unchanged
+                self._insert(rows)
+            self._write_meta(seq)
+
+    def write_snapshot(self, data, seq):
+        with self._conn_lock, self.conn:
+            for section in DATA_SECTIONS:
+                self._rewrite(data, (section,), ())
+            self._write_meta(seq)
+
+    def close(self):
+        with self._conn_lock:
+            self.conn.close()
+
+
+def migrate_json_to_sqlite(json_file, db_file):
+    """One-shot copy of a JSON data file (and its journal) into SQLite."""
+    data, seq = JsonStore(json_file).load()
+    normalize_data(data)
+    store = SqliteStore(db_file)
+    store.write_snapshot(data, seq)
+    for section in DATA_SECTIONS:
+        print(f"Migrated {len(data[section])} {section}.")
+    store.close()
+
+
+def convert_snapshot(source, target, snapshot_format="binary", compression="none"):
+    """Rewrite a data file (and its journal) in another snapshot format.
+
+    Works in every direction, since loads detect the source's format.
+    source and target may be the same file.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        data, seq = JsonStore(source).load()
+    if isinstance(data, LazySections):
+        data.load_all()
+    JsonStore(target, snapshot_format=snapshot_format, compression=compression).write_snapshot(data, seq)
+    label = snapshot_format if compression == "none" else f"{snapshot_format}+{compression}"
+    print(f"Wrote {target} as {label}: {os.path.getsize(target)} bytes.")
+
+
+class RWLock:
+    """Reader-writer lock: many readers or one writer.
+
+    Writers are preferred (new readers wait while a writer is queued), so a
+    steady stream of list views cannot starve a save. Both sides are
+    re-entrant, and the writing thread may also read; a thread that only
+    holds the read lock cannot upgrade to writing (two such threads would
+    deadlock), which raises RuntimeError instead.
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None  # Ident of the thread holding the write lock
+        self._write_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()  # Per thread: held reads, True if counted in _readers
+
+    def _held(self):
+        held = getattr(self._local, "held", None)
+        if held is None:
+            held = self._local.held = []
+        return held
+
+    def acquire_read(self):
+        held = self._held()
+        if self._writer == threading.get_ident():
+            held.append(False)  # Covered by our write lock
+            return
+        with self._cond:
+            # A thread already reading does not wait for queued writers: they wait for it
+            while not held and (self._writer is not None or self._writers_waiting):
+                self._cond.wait()
+            self._readers += 1
+        held.append(True)
+
+    def release_read(self):
+        if self._held().pop():
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        if self._writer == me:
+            self._write_depth += 1
+            return
+        if any(self._held()):
+            raise RuntimeError("Cannot take the write lock while holding the read lock.")
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        self._write_depth -= 1
+        if self._write_depth:
+            return
+        with self._cond:
+            self._writer = None
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class KeyedLocks:
+    """One re-entrant lock per key (course_id, student_id), created on demand."""
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def __call__(self, key):
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(key, threading.RLock())
+        return lock
+
+
+class Transaction:
+    """Defers PlatformAdmin.save_data until the block exits.
+
+    Every save_data call inside the block is coalesced into a single write on
+    a clean exit. If an exception escapes, the in-memory data is rolled back
+    and nothing is written. The admin's write lock is held for the whole
+    block, so other threads never see (or add to) a half-done transaction.
+    """
+    def __init__(self, admin):
+        self.admin = admin
+        self.saves = 0  # save_data calls made inside the block
+        self.coalesced = 0  # Writes avoided by coalescing them
+
+    def __enter__(self):
+        admin = self.admin
+        admin.lock.acquire_write()
+        self._undo_mark = len(admin._undo)
+        self._pending_mark = len(admin._pending)
+        self._seq_mark = admin._journal_seq
+        self._saves_mark = admin._deferred_saves
+        if admin._transaction_depth == 0:
+            admin._deferred_full = False
+        admin._transaction_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            return self._finish(exc_type)
+        finally:
+            self.admin.lock.release_write()
+
+    def _finish(self, exc_type):
+        admin = self.admin
+        admin._transaction_depth -= 1
+        if exc_type is not None:
+            admin.rollback(self._undo_mark)
+            del admin._pending[self._pending_mark:]
+            admin._journal_seq = self._seq_mark
+            admin._deferred_saves = self._saves_mark
+            admin.say("Transaction rolled back.")
+            return False
+        self.saves = admin._deferred_saves - self._saves_mark
+        if admin._transaction_depth == 0:
+            admin._undo = []
+            admin._deferred_saves = 0
+            if self.saves:
+                admin.save_data(full=admin._deferred_full)
+                self.coalesced = self.saves - 1
+                admin.say(f"Transaction committed: {self.saves} saves coalesced into one write.")
+        return False
+
+
+class PlatformAdmin:
+    def __init__(self, data_file="data2.json", journal=False, compact_every=1000, store=None, lazy=False, hasher=None,
+                 snapshot_format="json", compression="none"):
+        self.data_file = data_file
+        self.hasher = hasher or PasswordHasher()
+        # Persistence backend; by default the JSON file, optionally journaled
+        # so that saves append the change instead of rewriting the file, and
+        # optionally lazy so sections are only parsed when first used.
+        # Snapshots are written in snapshot_format (see JsonStore).
+        self.store = store or JsonStore(data_file, journal, compact_every, lazy, snapshot_format, compression)
+        self._journal_seq = 0  # Sequence number of the last applied change (the data version)
+        self._pending = []  # (op, path, change) changes not yet saved
+        self._disk_stamp = None  # store.stamp() as of our last load or save
+        # Thread safety: readers share self.lock, and anything that adds or
+        # reorders records, reloads or saves takes it exclusively. Edits of
+        # one course or one student's records (grades, enrollments) only
+        # need a read lock plus that record's lock, so graders working in
+        # different courses run side by side. _state_lock serializes the
+        # shared bookkeeping: apply_change, and the lazily built indexes.
+        self.lock = RWLock()
+        self._course_locks = KeyedLocks()
+        self._student_locks = KeyedLocks()
+        self._state_lock = threading.RLock()
+        # Transaction state (see Transaction)
+        self._transaction_depth = 0
+        self._undo = []  # Inverse of each change made inside a transaction
+        self._deferred_saves = 0
+        self._deferred_full = False
+        self.data = empty_data()
+        # Hash indexes: key -> position in the matching self.data section
+        self._users_by_email = {}
+        self._students_by_id = {}
+        self._instructors_by_id = {}
+        self._courses_by_name = {}
+        self._courses_by_id = {}
+        self._indexed_sections = set()  # Sections whose indexes are built
+        # Grade positions in the nested lists, built on first use:
+        # (student, course_id, assignment) -> index in assignment["grades"]
+        # (student, course name, "") -> index in student["grades"]
+        self._assignment_grades = None
+        self._student_course_grades = None
+        self._grade_aggregates = None  # GradeAggregates, kept up to date by record_assignment_grade
+        self._leaderboards = None  # Leaderboards, kept up to date by record_assignment_grade
+        self._course_search = None  # CourseSearchIndex of the catalog
+        self._calendar = None  # CalendarIndex of every course schedule
+        self._rosters = None  # {"students"/"instructors": {course_id: [ids]}}
+        self._deadlines = None  # DeadlineIndex of every assignment
+        # Materialized student timetables, dropped when their inputs change
+        self._timetables = {}  # student_id -> timetable
+        self._timetable_students = {}  # course_id -> student_ids with a cached timetable using it
+        self.timetable_hits = 0
+        self.timetable_misses = 0
+        self.load_data()
+
+    # Index key fields for each indexed section of self.data
+    INDEXED_FIELDS = {
+        "users": (("email", "_users_by_email"),),
+        "students": (("student_id", "_students_by_id"),),
+        "instructors": (("instructor_id", "_instructors_by_id"),),
+        "courses": (("name", "_courses_by_name"), ("course_id", "_courses_by_id")),
+    }
+
+    # Index attribute -> the section it indexes
+    INDEX_SECTIONS = {
+        index_name: section
+        for section, fields in INDEXED_FIELDS.items()
+        for _, index_name in fields
+    }
+
+    def _index(self, index_name):
+        """An index dict, built on first use so untouched sections stay unloaded."""
+        section = self.INDEX_SECTIONS[index_name]
+        if section not in self._indexed_sections:
+            with self._state_lock:
+                if section not in self._indexed_sections:
+                    for _, name in self.INDEXED_FIELDS[section]:
+                        setattr(self, name, {})
+                    for position in range(len(self.data[section])):
+                        self._index_record(section, position)
+                    # Marked last, so other threads never see a half-built index
+                    self._indexed_sections.add(section)
+        return getattr(self, index_name)
+
+    def _index_record(self, section, position):
+        record = self.data[section][position]
+        for field, index_name in self.INDEXED_FIELDS.get(section, ()):
+            key = record.get(field)
+            if key is not None:
+                # Keep the first match, like the old linear next(...) scans did
+                getattr(self, index_name).setdefault(key, position)
+
+    def rebuild_indexes(self):
+        """Drop every lookup index; each is rebuilt on its next use."""
+        for fields in self.INDEXED_FIELDS.values():
+            for _, index_name in fields:
+                setattr(self, index_name, {})
+        self._indexed_sections = set()
+        self._assignment_grades = None
+        self._student_course_grades = None
+        self._grade_aggregates = None
+        self._leaderboards = None
+        self._course_search = None
+        self._calendar = None
+        self._rosters = None
+        self._deadlines = None
+        self._timetables = {}
+        self._timetable_students = {}
+
+    def calendar(self):
+        """CalendarIndex of course schedules and data["schedules"], built on first use."""
+        with self._state_lock:  # Built once, even when several threads ask
+            if self._calendar is None:
+                calendar = CalendarIndex()
+                for course in self.data["courses"]:
+                    if course.get("schedule"):
+                        calendar.add(course["course_id"], course["schedule"])
+                for schedule in self.data["schedules"]:
+                    calendar.add(schedule["course_id"], schedule)
+                self._calendar = calendar
+        return self._calendar
+
+    def rosters(self):
+        """course_id -> enrolled student IDs / teaching instructor IDs."""
+        with self._state_lock:  # Built once, even when several threads ask
+            if self._rosters is None:
+                rosters = {"students": {}, "instructors": {}}
+                for section, id_field, courses_field in (
+                    ("students", "student_id", "courses"),
+                    ("instructors", "instructor_id", "courses_taught"),
+                ):
+                    for person in self.data[section]:
+                        for course_id in person.get(courses_field) or ():
+                            rosters[section].setdefault(course_id, []).append(person[id_field])
+                self._rosters = rosters
+        return self._rosters
+
+    def _add_to_roster(self, section, course_id, person_id):
+        with self._state_lock:
+            if self._rosters is not None:
+                self._rosters[section].setdefault(course_id, []).append(person_id)
+
+    def schedule_conflicts(self, course, course_ids):
+        """Catalog courses among course_ids whose classes clash with course's."""
+        others = set(course_ids)
+        others.discard(course.get("course_id"))
+        if not others:
+            return []
+        calendar = self.calendar()
+        schedules = calendar.schedules.get(course.get("course_id"))
+        if schedules is None:
+            # Not in the catalog yet (e.g. a new course being assigned)
+            schedules = [course["schedule"]] if course.get("schedule") else []
+        clashes = {}
+        for schedule in schedules:
+            for course_id in calendar.conflicts(schedule, others):
+                clashes[course_id] = None
+        return self.resolve_courses(clashes)
+
+    def in_class_at(self, when):
+        """What is happening at datetime when.
+
+        Returns (courses, student_ids, instructor_ids, free_instructor_ids,
+        free_rooms); rooms are the "room" values seen on schedules.
+        """
+        meetings = self.calendar().in_class(when)
+        course_ids = list(dict.fromkeys(course_id for course_id, _ in meetings))
+        rosters = self.rosters()
+        students = list(dict.fromkeys(s for c in course_ids for s in rosters["students"].get(c, ())))
+        instructors = list(dict.fromkeys(i for c in course_ids for i in rosters["instructors"].get(c, ())))
+        busy = set(instructors)
+        free_instructors = [i["instructor_id"] for i in self.data["instructors"] if i["instructor_id"] not in busy]
+        free_rooms = sorted(self.calendar().rooms - {room for _, room in meetings})
+        return self.resolve_courses(course_ids), students, instructors, free_instructors, free_rooms
+
+    def student_timetable(self, student_id):
+        """A student's weekly class meetings, sorted by weekday and time.
+
+        Returns {"meetings": [...], "unscheduled": [course names]}. The result
+        is cached until the student's enrollments or one of their courses'
+        schedules change (see _invalidate_views), so repeat views are a dict
+        lookup; timetable_hits / timetable_misses count how often that works.
+        """
+        with self._state_lock:
+            timetable = self._timetables.get(student_id)
+            if METRICS.enabled:
+                METRICS.count("platform_timetable_cache_total", result="miss" if timetable is None else "hit")
+            if timetable is not None:
+                self.timetable_hits += 1
+                return timetable
+            self.timetable_misses += 1
+            student = self.find_student(student_id)
+            if not student:
+                return None
+            calendar = self.calendar()
+            meetings = []
+            unscheduled = []
+            for course in self.resolve_courses(student.get("courses", [])):
+                schedules = calendar.schedules.get(course["course_id"])
+                if not schedules:
+                    unscheduled.append(course["name"])
+                for schedule in schedules or ():
+                    try:
+                        start, end = parse_class_time(schedule.get("class_time"))
+                        weekdays = parse_days(schedule.get("days"))
+                    except ValueError:
+                        # Shown as stored, after the meetings that could be placed
+                        start, end, weekdays = None, None, [None]
+                    for weekday in weekdays:
+                        meetings.append({
+                            "weekday": weekday,
+                            "start": start,
+                            "end": end,
+                            "course_id": course["course_id"],
+                            "name": course["name"],
+                            "schedule": schedule,
+                        })
+                self._timetable_students.setdefault(course["course_id"], set()).add(student_id)
+            meetings.sort(key=lambda m: (m["weekday"] is None, m["weekday"] or 0, m["start"] or 0, m["name"]))
+            timetable = {"meetings": meetings, "unscheduled": unscheduled}
+            self._timetables[student_id] = timetable
+            return timetable
+
+    def _invalidate_views(self, op, path, value):
+        """Drop cached timetables (and the calendar) that a change makes stale."""
+        section = path[0]
+        if section == "students" and len(path) > 1 and (len(path) == 2 or path[2] == "courses"):
+            self._timetables.pop(self.data["students"][path[1]].get("student_id"), None)
+        elif section == "courses" and len(path) > 1 and (len(path) == 2 or path[2] in ("schedule", "name", "course_id")):
+            self._calendar = None
+            self._invalidate_course_timetables(self.data["courses"][path[1]].get("course_id"))
+        elif section == "schedules":
+            if len(path) > 1:
+                self._calendar = None  # Appends are added to the calendar by append_record
+                value = self.data["schedules"][path[1]]
+            self._invalidate_course_timetables(value.get("course_id"))
+
+    def _invalidate_course_timetables(self, course_id):
+        for student_id in self._timetable_students.pop(course_id, ()):
+            self._timetables.pop(student_id, None)
+
+    def deadlines(self):
+        """DeadlineIndex of course assignments and data["assignments"], built on first use."""
+        with self._state_lock:  # Built once, even when several threads ask
+            if self._deadlines is None:
+                deadlines = DeadlineIndex()
+                for course in self.data["courses"]:
+                    for assignment in course.get("assignments", []):
+                        deadlines.add(course["course_id"], assignment["assignment_name"], assignment.get("due_date"),
+                                      assignment.get("description", ""))
+                for assignment in self.data["assignments"]:
+                    deadlines.add(assignment["course_id"], assignment["title"], assignment["due_date"],
+                                  assignment["description"])
+                self._deadlines = deadlines
+        return self._deadlines
+
+    def upcoming_deadlines(self, days=7, today=None, course_id=None, student_id=None):
+        """Assignments due in the next days days: platform-wide, for a course or for a student."""
+        course_ids = None
+        if course_id is not None:
+            course_ids = [course_id]
+        elif student_id is not None:
+            student = self.find_student(student_id)
+            course_ids = student.get("courses", []) if student else []
+        return self.deadlines().upcoming(days, today, course_ids)
+
+    def add_course_assignment(self, course_position, assignment):
+        """Append an assignment to a catalog course. Does not save."""
+        course = self.data["courses"][course_position]
+        course_path = ["courses", course_position]
+        with self.record_locks(course_id=course["course_id"]):
+            if "assignments" not in course:
+                self.apply_change("set", course_path + ["assignments"], [])
+            self.apply_change("append", course_path + ["assignments"], assignment)
+            with self._state_lock:
+                if self._deadlines is not None:
+                    self._deadlines.add(course["course_id"], assignment["assignment_name"], assignment.get("due_date"),
+                                        assignment.get("description", ""))
+                if self._course_search is not None:
+                    self._course_search.add_text(course["course_id"], assignment["assignment_name"], "assignment")
+
+    def assignment_grades(self):
+        """GradeStore of every catalog assignment grade, refs are list positions."""
+        with self._state_lock:  # Built once, even when several threads ask
+            if self._assignment_grades is None:
+                store = GradeStore()
+                for course in self.data["courses"]:
+                    for assignment in course.get("assignments", []):
+                        for g, entry in enumerate(assignment.get("grades", [])):
+                            # The first entry wins, as the old linear scans did
+                            if store.row_of(entry["student_id"], course["course_id"], assignment["assignment_name"]) is None:
+                                store.upsert(entry["student_id"], course["course_id"], assignment["assignment_name"], entry["grade"], g)
+                self._assignment_grades = store
+        return self._assignment_grades
+
+    def student_course_grades(self):
+        """GradeStore of the per-course grades kept on each student."""
+        with self._state_lock:  # Built once, even when several threads ask
+            if self._student_course_grades is None:
+                store = GradeStore()
+                for student in self.data["students"]:
+                    grades = student.get("grades")
+                    if not isinstance(grades, list):
+                        continue
+                    for g, entry in enumerate(grades):
+                        if store.row_of(student["student_id"], entry["course_name"], "") is None:
+                            store.upsert(student["student_id"], entry["course_name"], "", entry["grade"], g)
+                self._student_course_grades = store
+        return self._student_course_grades
+
+    def grade_aggregates(self):
+        """GradeAggregates of every student and course, built on first use."""
+        with self._state_lock:
+            if self._grade_aggregates is None:
+                assignment_grades = self.assignment_grades()
+                course_grades = self.student_course_grades()
+                aggregates = GradeAggregates()
+                weights = self._assignment_weights()
+                for row in range(len(assignment_grades)):
+                    course_id = assignment_grades.courses.keys[assignment_grades.course_col[row]]
+                    assignment_name = assignment_grades.assignments.keys[assignment_grades.assignment_col[row]]
+                    aggregates.update_course(course_id, None, assignment_grades.value(row),
+                                             weights.get((course_id, assignment_name), 1))
+                for row in range(len(course_grades)):
+                    course = self.find_course(course_grades.courses.keys[course_grades.course_col[row]])
+                    aggregates.update_student(course_grades.students.keys[course_grades.student_col[row]], None,
+                                              course_grades.value(row), course.get("credits", 1) if course else 1)
+                self._grade_aggregates = aggregates
+        return self._grade_aggregates
+
+    def course_search(self):
+        """CourseSearchIndex of the catalog, built on first use."""
+        with self._state_lock:
+            if self._course_search is None:
+                index = CourseSearchIndex()
+                for course in self.data["courses"]:
+                    index.add_course(course)
+                self._course_search = index
+        return self._course_search
+
+    def search_courses(self, query, limit=10):
+        """[(course, score)] of the catalog courses best matching query."""
+        with self.lock.read():
+            return [(self.find_course_by_id(course_id), score)
+                    for course_id, score in self.course_search().search(query, limit)]
+
+    def _assignment_weights(self):
+        """{(course_id, assignment name): weight} of every catalog assignment."""
+        weights = {}
+        for course in self.data["courses"]:
+            for assignment in course.get("assignments", []):
+                weights[(course["course_id"], assignment["assignment_name"])] = assignment.get("weight", 1)
+        return weights
+
+    def leaderboards(self):
+        """Leaderboards of every course and assignment, built on first use."""
+        with self._state_lock:
+            if self._leaderboards is None:
+                assignment_grades = self.assignment_grades()
+                leaderboards = Leaderboards()
+                weights = self._assignment_weights()
+                for row in range(len(assignment_grades)):
+                    course_id = assignment_grades.courses.keys[assignment_grades.course_col[row]]
+                    assignment_name = assignment_grades.assignments.keys[assignment_grades.assignment_col[row]]
+                    leaderboards.update(course_id, assignment_name,
+                                        assignment_grades.students.keys[assignment_grades.student_col[row]], None,
+                                        assignment_grades.value(row), weights.get((course_id, assignment_name), 1))
+                self._leaderboards = leaderboards
+        return self._leaderboards
+
+    def leaderboard(self, course_id, assignment_name=None):
+        """Leaderboard of a course, or of one of its assignments."""
+        return self.leaderboards().board(course_id, assignment_name)
+
+    def student_grade_summary(self, student_id):
+        """Running totals of a student's course grades (a RunningGrade)."""
+        return self.grade_aggregates().student(student_id)
+
+    def course_grade_summary(self, course_id):
+        """Running totals of a course's assignment grades (a RunningGrade)."""
+        return self.grade_aggregates().course(course_id)
+
+    def append_record(self, section, record):
+        """Append a record to a data section and keep its indexes in sync."""
+        if section in ENTITY_TYPES and not isinstance(record, Record):
+            record = ENTITY_TYPES[section].from_dict(record)
+        # _state_lock too, so a cache being built on another thread sees the
+        # record either in the data or as an update, never both or neither
+        with self.lock.write(), self._state_lock:
+            self.apply_change("append", [section], record)
+            if section in self._indexed_sections:
+                self._index_record(section, len(self.data[section]) - 1)
+            if self._calendar is not None:
+                if section == "courses" and record.get("schedule"):
+                    self._calendar.add(record["course_id"], record["schedule"])
+                elif section == "schedules":
+                    self._calendar.add(record["course_id"], record)
+            if section == "courses" and self._course_search is not None:
+                self._course_search.add_course(record)
+            if section == "assignments" and self._deadlines is not None:
+                self._deadlines.add(record["course_id"], record["title"], record["due_date"], record["description"])
+        return record
+
+    @contextlib.contextmanager
+    def record_locks(self, course_id=None, student_id=None):
+        """Hold a read lock plus the locks of one course and/or one student.
+
+        Enough to edit that course's assignments or that student's record
+        while other threads edit other courses and students. Locks are
+        always taken in the same order (read lock, course, student), so two
+        threads cannot deadlock on them.
+        """
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(self.lock.read())
+            if course_id is not None:
+                stack.enter_context(self._course_locks(course_id))
+            if student_id is not None:
+                stack.enter_context(self._student_locks(student_id))
+            yield
+
+    def student_path(self, student_id):
+        return ["students", self._index("_students_by_id")[student_id]]
+
+    def instructor_path(self, instructor_id):
+        return ["instructors", self._index("_instructors_by_id")[instructor_id]]
+
+    def course_position(self, course_id):
+        return self._index("_courses_by_id").get(course_id)
+
+    def resolve_courses(self, course_ids):
+        """Catalog course dicts for a list of course_id references."""
+        courses = []
+        for course_id in course_ids:
+            course = self.find_course_by_id(course_id)
+            if course:
+                courses.append(course)
+        return courses
+
+    def student_courses(self, student_id):
+        student = self.find_student(student_id)
+        return self.resolve_courses(student.get("courses", [])) if student else []
+
+    def instructor_courses(self, instructor_id):
+        instructor = self.find_instructor(instructor_id)
+        return self.resolve_courses(instructor.get("courses_taught", [])) if instructor else []
+
+    def enroll_student(self, student_id, course):
+        """Reference a catalog course from the student's enrollments."""
+        with self.record_locks(student_id=student_id):
+            student_data = self.find_student(student_id)
+            if not student_data or course["course_id"] in student_data.get("courses", []):
+                return False
+            student_path = self.student_path(student_id)
+            if "courses" not in student_data:
+                self.apply_change("set", student_path + ["courses"], [])
+            self.apply_change("append", student_path + ["courses"], course["course_id"])
+            self._add_to_roster("students", course["course_id"], student_id)
+        self.save_data()  # Needs the write lock, so only after the record locks are released
+        return True
+
+    def assign_teacher(self, instructor_id, course):
+        """Reference a catalog course from the instructor's courses_taught.
+
+        Call with the write lock held, together with the check that the
+        instructor does not teach it yet. Does not save.
+        """
+        self.apply_change("append", self.instructor_path(instructor_id) + ["courses_taught"], course["course_id"])
+        self._add_to_roster("instructors", course["course_id"], instructor_id)
+
+    def record_assignment_grade(self, course_position, assignment_index, student_id, grade):
+        """Store a grade on a course assignment and on the student's record.
+
+        Overwrites any earlier grade for the same student. Returns the
+        student's data, or None if the student does not exist (the grade is
+        still kept on the assignment, as before). Does not save.
+        Holds the course's and the student's record locks while it runs.
+        """
+        course_data = self.data["courses"][course_position]
+        with self.record_locks(course_data["course_id"], student_id):
+            assignment_data = course_data["assignments"][assignment_index]
+            assignment_path = ["courses", course_position, "assignments", assignment_index]
+            if "grades" not in assignment_data:
+                self.apply_change("set", assignment_path + ["grades"], [])
+
+            # Add the grade to the assignment
+            assignment_grades = self.assignment_grades()
+            with self._state_lock:
+                row = assignment_grades.row_of(student_id, course_data["course_id"], assignment_data["assignment_name"])
+            if row is not None:
+                # Update the existing grade
+                self.apply_change("set", assignment_path + ["grades", assignment_grades.ref_col[row], "grade"], grade)
+            else:
+                # Add new grade if none exists
+                self.apply_change("append", assignment_path + ["grades"], {
+                    "student_id": student_id,
+                    "grade": grade
+                })
+            with self._state_lock:
+                old_grade = None if row is None else assignment_grades.value(row)
+                assignment_grades.upsert(student_id, course_data["course_id"], assignment_data["assignment_name"], grade,
+                                         len(assignment_data["grades"]) - 1 if row is None else -1)
+                if self._grade_aggregates is not None:
+                    self._grade_aggregates.update_course(course_data["course_id"], old_grade, grade,
+                                                         assignment_data.get("weight", 1))
+                if self._leaderboards is not None:
+                    self._leaderboards.update(course_data["course_id"], assignment_data["assignment_name"], student_id,
+                                              old_grade, grade, assignment_data.get("weight", 1))
+
+            # Now add the grade to the student's record as well
+            student_data = self.find_student(student_id)
+            if not student_data:
+                return None
+            student_path = self.student_path(student_id)
+            # Ensure grades is a list
+            if not isinstance(student_data.get("grades"), list):
+                self.apply_change("set", student_path + ["grades"], [])  # Convert to a list if it's not one
+
+            course_name = course_data["name"]
+            course_grades = self.student_course_grades()
+            with self._state_lock:
+                row = course_grades.row_of(student_id, course_name, "")
+            if row is not None:
+                self.apply_change("set", student_path + ["grades", course_grades.ref_col[row], "grade"], grade)  # Update grade if it exists
+            else:
+                # Add new grade if none exists
+                self.apply_change("append", student_path + ["grades"], {
+                    "course_name": course_name,
+                    "grade": grade
+                })
+            with self._state_lock:
+                old_grade = None if row is None else course_grades.value(row)
+                course_grades.upsert(student_id, course_name, "", grade, len(student_data["grades"]) - 1 if row is None else -1)
+                if self._grade_aggregates is not None:
+                    self._grade_aggregates.update_student(student_id, old_grade, grade, course_data.get("credits", 1))
+            return student_data
+
+    def taught_course_position(self, instructor_data, course_name):
+        """Catalog position of course_name if the instructor teaches it."""
+        position = self._index("_courses_by_name").get(course_name)
+        if position is None:
+            return None
+        if self.data["courses"][position]["course_id"] not in instructor_data["courses_taught"]:
+            return None
+        return position
+
+    def transaction(self):
+        """Group several mutations so they are persisted with one write.
+
+            with admin.transaction() as tx:
+                for student_id in section:
+                    instructor.assign_grade(student_id, ...)
+            print(tx.coalesced)
+        """
+        return Transaction(self)
+
+    def rollback(self, undo_mark=0):
+        """Undo changes made inside the current transaction back to undo_mark."""
+        while len(self._undo) > undo_mark:
+            target, key, existed, old_value = self._undo.pop()
+            if key is None:
+                target.pop()
+            elif existed:
+                target[key] = old_value
+            else:
+                del target[key]
+        self.rebuild_indexes()
+
+    def _resolve(self, path):
+        return resolve_path(self.data, path)
+
+    def apply_change(self, op, path, value):
+        """Apply one change to self.data and queue it for the journal.
+
+        "append" adds value to the list at path, "set" stores value under the
+        last key of path. Every mutation of self.data must go through here:
+        when the store supports it (journaled JSON, SQLite) save_data persists
+        only these changes. After editing self.data directly, call compact().
+        Callers on other threads hold the write lock, or a read lock plus
+        the record_locks of what they edit.
+        """
+        with self._state_lock:
+            if op == "append":
+                target = self._resolve(path)
+                if self._transaction_depth:
+                    self._undo.append((target, None, False, None))
+                target.append(value)
+            elif op == "set":
+                parent = self._resolve(path[:-1])
+                key = path[-1]
+                if self._transaction_depth:
+                    existed = isinstance(parent, list) or key in parent
+                    self._undo.append((parent, key, existed, parent[key] if existed else None))
+                parent[key] = value
+            else:
+                raise ValueError(f"Unknown change operation: {op}")
+            if self._timetables or self._calendar is not None:
+                self._invalidate_views(op, path, value)
+            self._journal_seq += 1
+            # Queued even when the store rewrites whole snapshots, so the changes
+            # can be replayed over another session's save (see _rebase).
+            # Encoded only when a store journals it; the value is snapshotted
+            # now because a later change may mutate it in place.
+            change = {"seq": self._journal_seq, "op": op, "path": path, "value": snapshot_value(value)}
+            if op == "append":
+                change["index"] = len(target) - 1  # Lets a merge remap later paths to it
+            self._pending.append((op, path, change))
+
+    def _lookup(self, section, index_name, key):
+        position = self._index(index_name).get(key)
+        if METRICS.enabled:
+            METRICS.count("platform_index_lookups_total", index=index_name.strip("_"),
+                          result="miss" if position is None else "hit")
+        if position is None:
+            return None
+        return self.data[section][position]
+
+    def find_user(self, email):
+        return self._lookup("users", "_users_by_email", email)
+
+    def find_student(self, student_id):
+        return self._lookup("students", "_students_by_id", student_id)
+
+    def find_instructor(self, instructor_id):
+        return self._lookup("instructors", "_instructors_by_id", instructor_id)
+
+    def find_course(self, name):
+        return self._lookup("courses", "_courses_by_name", name)
+
+    def find_course_by_id(self, course_id):
+        return self._lookup("courses", "_courses_by_id", course_id)
+
+    def add_assignment(self, assignment_id, title, description, due_date, course_id):
+        assignment = Assignment(assignment_id, title, description, due_date, course_id)
+        self.append_record("assignments", assignment.get_details())
+        self.save_data()
+        print(f"Assignment {title} added successfully!")
+
+    def list_assignments(self, course_id=None):
+        with self.lock.read():
+            if METRICS.enabled:
+                METRICS.count("platform_records_scanned_total", len(self.data["assignments"]), op="list_assignments")
+            if course_id:
+                assignments = [a for a in self.data["assignments"] if a["course_id"] == course_id]
+            else:
+                assignments = self.data["assignments"]
+
+            if assignments:
+                print("Assignments:")
+                for assignment in assignments:
+                    print(f"- {assignment['title']} (ID: {assignment['assignment_id']})")
+            else:
+                print("No assignments found.")
+
+    def add_schedule(self, course_id, start_date, end_date, class_time, days):
+        schedule = Schedule(course_id, start_date, end_date, class_time, days)
+        self.append_record("schedules", schedule.get_details())
+        self.save_data()
+        print(f"Schedule for course {course_id} added successfully!")
+
+    def list_schedules(self):
+        with self.lock.read():
+            if self.data["schedules"]:
+                print("Course Schedules:")
+                for schedule in self.data["schedules"]:
+                    print(
+                        f"- Course ID: {schedule['course_id']}, Start: {schedule['start_date']}, "
+                        f"End: {schedule['end_date']}, Time: {schedule['class_time']}, Days: {schedule['days']}"
+                    )
+            else:
+                print("No schedules found.")
+
+    def add_grade(self, student_id, course_id, assignment_id, grade_value):
+        grade = Grade(student_id, course_id, assignment_id, grade_value)
+        self.append_record("grades", grade.get_details())
+        self.save_data()
+        print(f"Grade {grade_value} added for student {student_id} in course {course_id}.")
+
+    def list_grades(self, student_id=None, course_id=None):
+        with self.lock.read():
+            grades = self.data["grades"]
+            if METRICS.enabled:
+                METRICS.count("platform_records_scanned_total", len(grades), op="list_grades")
+            if student_id:
+                grades = [g for g in grades if g["student_id"] == student_id]
+            if course_id:
+                grades = [g for g in grades if g["course_id"] == course_id]
+
+            if grades:
+                print("Grades:")
+                for grade in grades:
+                    print(
+                        f"- Student ID: {grade['student_id']}, Course ID: {grade['course_id']}, "
+                        f"Assignment ID: {grade['assignment_id']}, Grade: {grade['grade_value']}"
+                    )
+            else:
+                print("No grades found.")
+
+    @property
+    def version(self):
+        """Data version: the sequence number of the last change, across all sessions."""
+        return self._journal_seq
+
+    @property
+    def verbose(self):
+        """Whether loads, saves and transactions print status messages (the store's setting)."""
+        return self.store.verbose
+
+    @verbose.setter
+    def verbose(self, verbose):
+        self.store.verbose = verbose
+
+    def say(self, message):
+        self.store.say(message)
+
+    def _load_store(self):
+        data, seq = self.store.load()
+        # A migrated file is persisted with a full snapshot on the next save
+        migrated = normalize_data(data)
+        decode_data(data)
+        return data, seq, migrated
+
+    def load_data(self):
+        with self.lock.write(), self.store.lock():
+            self.data, self._journal_seq, self._migrated = self._load_store()
+            self._disk_stamp = self.store.stamp()
+            self._pending = []
+            self.rebuild_indexes()
+
+    def refresh(self):
+        """Reload if another session has saved since we last looked.
+
+        Costs a stat of the data files when nothing changed. Unsaved changes
+        of this session are replayed on top of what was reloaded. Returns
+        True if the data was reloaded.
+        """
+        if self._transaction_depth or self.store.stamp() == self._disk_stamp:
+            return False
+        with self.lock.write():
+            if self._transaction_depth or self.store.stamp() == self._disk_stamp:
+                return False  # Another thread already reloaded
+            with self.store.lock():
+                self._rebase()
+        self.say("Data reloaded: another session saved changes.")
+        return True
+
+    def _rebase(self):
+        """Reload from the store and replay our unsaved changes on top.
+
+        Our appends may land at other positions than they had here (another
+        session appended first), so later changes that address them by
+        position are remapped. They are renumbered after the reloaded
+        version, which keeps the journal's sequence numbers increasing.
+        Called with the write lock held.
+        """
+        verbose, self.verbose = self.verbose, False  # The caller reports the reload
+        try:
+            data, seq, migrated = self._load_store()
+        finally:
+            self.verbose = verbose
+        moved = {}  # List path -> {our position: position in the reloaded data}
+        pending = []
+        for op, path, change in self._pending:
+            change = dict(change)
+            new_path = [path[0]]
+            for key in path[1:]:
+                positions = moved.get(tuple(new_path))
+                new_path.append(positions.get(key, key) if positions else key)
+            value = snapshot_value(change["value"])  # The queued copy stays untouched
+            if new_path[0] in ENTITY_TYPES and len(new_path) == (1 if op == "append" else 2) \
+                    and not isinstance(value, Record):
+                value = ENTITY_TYPES[new_path[0]].from_dict(value)
+            if op == "append":
+                position = len(resolve_path(data, new_path))
+                moved.setdefault(tuple(new_path), {})[change["index"]] = position
+                change["index"] = position
+            apply_path_change(data, op, new_path, value)
+            seq += 1
+            change["seq"] = seq
+            change["path"] = new_path
+            pending.append((op, new_path, change))
+        self.data, self._journal_seq, self._pending = data, seq, pending
+        self._migrated = self._migrated or migrated
+        self._disk_stamp = self.store.stamp()
+        self.rebuild_indexes()
+
+    def save_data(self, full=False):
+        # The write lock first: a transaction on another thread holds it, so
+        # this waits for that to finish rather than joining its deferred save
+        with self.lock.write():
+            if self._transaction_depth:
+                # Deferred until the transaction exits
+                self._deferred_saves += 1
+                self._deferred_full = self._deferred_full or full
+                return
+            with self.store.lock(exclusive=True):
+                if self.store.stamp() != self._disk_stamp:
+                    # Another session saved since we loaded: merge rather than overwrite it
+                    self._rebase()
+                    self.say("Merged with changes saved by another session.")
+                if self._migrated:
+                    full = True
+                    self._migrated = False
+                written = self.store.bytes_written
+                if full or not self.store.tracks_changes:
+                    self.store.write_snapshot(self.data, self._journal_seq)
+                    kind = "snapshot"
+                elif self._pending:
+                    self.store.write_changes(self.data, self._journal_seq, self._pending)
+                    kind = "changes"
+                else:
+                    kind = "none"  # The store tracks changes and nothing changed since the last save
+                self._disk_stamp = self.store.stamp()
+                if METRICS.enabled:
+                    METRICS.count("platform_saves_total", kind=kind)
+                    METRICS.count("platform_save_bytes_total", self.store.bytes_written - written)
+                    METRICS.count("platform_saved_changes_total", len(self._pending))
+            self._pending = []
+            self.say("Data saved successfully.")
+
+    def compact(self):
+        """Write a fresh snapshot (and empty the journal, if any)."""
+        self.save_data(full=True)
+
+    def sign_up(self, name, email, phone, address, date_of_birth, password, role):
+        hashed_password = self.hasher.hash(password)
+        user_id = len(self.data["users"]) + 1
+
+        if role == "student":
+            student_id = input("Enter Student ID: ")
+            student = Student(name, phone, address, date_of_birth, student_id)
+            user = User(id=user_id, email=email, password=hashed_password, role=role, person=student)
+            self.append_record("users", user.get_details())
+            self.append_record("students", student.get_details())
+            self.save_data()
+            print(f"Student {name} signed up successfully with ID {student_id}!")
+        elif role == "instructor":
+            instructor_id = input("Enter Instructor ID: ")
+            instructor = Instructor(name, phone, address, date_of_birth, instructor_id)
+            user = User(id=user_id, email=email, password=hashed_password, role=role, person=instructor)
+            self.append_record("users", user.get_details())
+            self.append_record("instructors", instructor.get_details())
+            self.save_data()
+            print(f"Instructor {name} signed up successfully with ID {instructor_id}!")
+        elif role == "admin":
+            admin = Admin(name, phone, address, date_of_birth)
+            user = User(id=user_id, email=email, password=hashed_password, role=role, person=admin)
+            self.append_record("users", user.get_details())
+            self.save_data()
+
+    def login(self, email, password):
+        user = self.find_user(email)
+        if user:
+            if self.hasher.verify(password, user["password"]):
+                if self.hasher.needs_rehash(user["password"]):
+                    # Upgrade legacy sha256 (or weaker) hashes now that we have the password
+                    position = self._index("_users_by_email")[email]
+                    self.apply_change("set", ["users", position, "password"], self.hasher.hash(password))
+                    self.save_data()
+                print(f"Welcome {user['person']['name']}!")
+                return user["role"]
+            else:
+                print("Invalid password.")
+                return None
+        print("User not found.")
+        return None
+
+    def add_course(self, course):
+        self.append_record("courses", course)
+        self.save_data()
+        print(f"Added course {course['name']}.")
+
+    def list_courses(self):
+        with self.lock.read():
+            print("Available courses:")
+            for course in self.data["courses"]:
+                print(f"- {course['name']}")
+
+    def view_student_courses(self, student_id):
+        with self.lock.read():
+            student = self.find_student(student_id)
+            if student:
+                print(f"Courses for student {student['name']}:")
+                for course in self.resolve_courses(student["courses"]):
+                    print(f"- {course['name']}")
+            else:
+                print("Student not found.")
+
+
+GENERATED_PASSWORD = "password"  # Every generated account's password
+SUBJECTS = ("Algorithms", "Biology", "Calculus", "Chemistry", "Databases", "Economics", "Ethics", "Geometry",
+            "History", "Linguistics", "Literature", "Networks", "Physics", "Programming", "Psychology", "Statistics")
+SCHEDULE_DAYS = (["Monday", "Wednesday"], ["Tuesday", "Thursday"], ["Monday", "Wednesday", "Friday"], ["Friday"],
+                 ["Saturday"])
+SCHEDULE_TIMES = ("8:00 AM", "9:30 AM", "11:00 AM", "1:00 PM", "2:30 PM", "4:00 PM", "5:30 PM")
+
+
+def generate_platform(students=1000, instructors=None, courses=None, enrollments=4, assignments=5, graded=0.8,
+                      seed=1, hasher=None):
+    """Synthetic platform data in the current (normalized) format.
+
+    instructors and courses default to one per 50 and one per 20 students.
+    Each student takes `enrollments` distinct courses that do not clash,
+    picked with a skew toward the first courses of the catalog so some
+    classes are large; each
+    course has `assignments` assignments, and each enrolled student is graded
+    on an assignment with probability `graded`. Students carry a course
+    grade (the mean of their assignment grades) for every course they were
+    graded in, mirrored in data["grades"]. Every account's password is
+    GENERATED_PASSWORD, hashed once with hasher, so generating a million
+    users does not cost a million key derivations.
+    """
+    rng = random.Random(seed)
+    instructors = instructors or max(1, students // 50)
+    courses = courses or max(1, students // 20)
+    hasher = hasher or PasswordHasher()
+    password = hasher.hash(GENERATED_PASSWORD)
+    data = empty_data()
+    data["_schema"] = SCHEMA_VERSION
+
+    def birthday(first_year, years):
+        return (date(first_year, 1, 1) + timedelta(days=rng.randrange(365 * years))).isoformat()
+
+    def person(kind, n, id_key, person_id, courses_key):
+        details = {
+            "name": f"{kind.title()} {n}",
+            "phone": f"09{rng.randrange(10 ** 9):09d}",
+            "address": f"{rng.randrange(1, 999)} {rng.choice(SUBJECTS)} Street",
+            "date_of_birth": birthday(1960 if kind == "instructor" else 1998, 30 if kind == "instructor" else 8),
+            id_key: person_id,
+            courses_key: [],
+        }
+        if kind == "student":
+            details["grades"] = []
+        # As sign_up stores it: a copy of the person before any enrollment
+        data["users"].append({
+            "email": f"{kind}{n}@example.edu", "password": password, "role": kind,
+            "person": {key: ([] if isinstance(value, list) else value) for key, value in details.items()},
+        })
+        return details
+
+    for n in range(instructors):
+        data["instructors"].append(person("instructor", n, "instructor_id", f"I{n:06d}", "courses_taught"))
+    for n in range(courses):
+        course = {
+            "course_id": f"C{n:06d}",
+            "name": f"{SUBJECTS[n % len(SUBJECTS)]} {100 + n // len(SUBJECTS)}",
+            "description": f"{SUBJECTS[n % len(SUBJECTS)]} course",
+            "schedule": {"start_date": "2024-01-15", "end_date": "2024-05-31",
+                         "class_time": rng.choice(SCHEDULE_TIMES), "days": rng.choice(SCHEDULE_DAYS)},
+            "assignments": [
+                {"assignment_name": f"Assignment {a + 1}", "description": f"Assignment {a + 1}",
+                 "due_date": (date(2024, 1, 29) + timedelta(days=rng.randrange(120))).isoformat(), "grades": []}
+                for a in range(assignments)
+            ],
+        }
+        data["courses"].append(course)
+        data["instructors"][n % instructors]["courses_taught"].append(course["course_id"])
+
+    # Course popularity falls off like 1/sqrt(rank)
+    weights = list(itertools.accumulate(1 / (rank + 1) ** 0.5 for rank in range(courses)))
+    enrollments = min(enrollments, courses)
+    for n in range(students):
+        student = person("student", n, "student_id", f"S{n:07d}", "courses")
+        taken = set()
+        busy = set()  # (day, class_time) slots already in the student's week
+        for _ in range(enrollments * 10):  # Gives up on a full week rather than looping forever
+            if len(taken) == enrollments:
+                break
+            position = rng.choices(range(courses), cum_weights=weights)[0]
+            schedule = data["courses"][position]["schedule"]
+            slots = {(day, schedule["class_time"]) for day in schedule["days"]}
+            if position not in taken and not slots & busy:
+                taken.add(position)
+                busy |= slots
+        for position in sorted(taken):
+            course = data["courses"][position]
+            student["courses"].append(course["course_id"])
+            marks = []
+            for assignment in course["assignments"]:
+                if rng.random() < graded:
+                    mark = rng.randrange(50, 101)
+                    marks.append(mark)
+                    assignment["grades"].append({"student_id": student["student_id"], "grade": str(mark)})
+            if marks:
+                mean = round(sum(marks) / len(marks))
+                student["grades"].append({"course_name": course["name"], "grade": str(mean)})
+                data["grades"].append({"student_id": student["student_id"], "course_id": course["course_id"],
+                                       "assignment_id": "final", "grade_value": mean})
+        data["students"].append(student)
+    data["users"].append({
+        "email": "admin@example.edu", "password": password, "role": "admin",
+        "person": {"name": "Admin", "phone": "0900000000", "address": "Registrar's Office", "date_of_birth": "1980-01-01"},
+    })
+    return data
+
+
+def write_platform(data_file, journal=False, lazy=False, snapshot_format="json", compression="none", **sizes):
+    """Generate a platform (see generate_platform) and write it to data_file."""
+    data = generate_platform(**sizes)
+    for suffix in (".journal", ".sections"):
+        if os.path.exists(data_file + suffix):
+            os.remove(data_file + suffix)
+    JsonStore(data_file, journal, lazy=lazy, snapshot_format=snapshot_format,
+              compression=compression).write_snapshot(data, 0)
+    return data
+
+
+IMPORT_KINDS = ("users", "students", "instructors", "courses", "enrollments", "grades")
+
+
+def iter_import_rows(path):
+    """Yield (line_number, row) from a CSV or JSON-Lines file, one at a time.
+
+    A line that cannot be parsed yields the exception instead of a row, so
+    the caller can report it and carry on with the next line.
+    """
+    with open(path, "r", newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, e
+        else:
+            reader = csv.DictReader(f)
+            while True:
+                try:
+                    row = next(reader)
+                except StopIteration:
+                    break
+                except csv.Error as e:
+                    yield reader.line_num, e
+                    continue
+                yield reader.line_num, row
+
+
+class BulkImporter:
+    """Streams records from CSV / JSON-Lines files into a PlatformAdmin.
+
+    Rows are validated like the interactive menus would (email, phone,
+    grade range) and applied in chunks, each inside one transaction so a
+    chunk costs a single persistence write. Invalid rows are skipped and
+    reported; only one chunk of rows is held in memory at a time.
+    """
+    def __init__(self, admin, chunk_size=1000, default_password="password123", hash_workers=None):
+        self.admin = admin
+        self.chunk_size = chunk_size
+        self.default_password = default_password
+        self.hash_workers = hash_workers  # Processes for password hashing (None: one per CPU)
+        self._hash_executor = None  # Started on first use, shared by every chunk of a run
+        self.imported = 0
+        self.errors = []  # (line_number, message)
+
+    def import_file(self, kind, path):
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Unknown import kind: {kind}")
+        handler = getattr(self, f"_import_{kind}")
+        imported, errors = self.imported, len(self.errors)
+        rows = iter_import_rows(path)
+        with self._hash_pool():
+            while True:
+                chunk = list(itertools.islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                if kind in ("users", "students", "instructors"):
+                    self._hash_passwords(chunk)
+                with self.admin.transaction():
+                    for line_number, row in chunk:
+                        try:
+                            if isinstance(row, Exception):
+                                raise ValueError(f"Invalid {'JSON' if isinstance(row, ValueError) else 'CSV'}: {row}")
+                            if not isinstance(row, dict):
+                                raise ValueError(f"Expected a JSON object, got {type(row).__name__}")
+                            handler(row)
+                            self.imported += 1
+                        except (KeyError, ValueError, TypeError) as e:
+                            self.errors.append((line_number, f"Missing field: {e}" if isinstance(e, KeyError) else str(e)))
+                    self.admin.save_data()
+        print(f"Imported {self.imported - imported} {kind} from {path}; {len(self.errors) - errors} rows skipped.")
+        return self
+
+    @contextlib.contextmanager
+    def _hash_pool(self):
+        """Scope of one run: the hashing processes it starts are shut down at the end."""
+        try:
+            yield
+        finally:
+            if self._hash_executor is not None:
+                self._hash_executor.shutdown()
+                self._hash_executor = None
+
+    def _hash_passwords(self, chunk):
+        """Fill in password_hash for a chunk of account rows in parallel."""
+        rows = [row for _, row in chunk if isinstance(row, dict) and not row.get("password_hash")]
+        passwords = [row.get("password") or self.default_password for row in rows]
+        if self._hash_executor is None and self.admin.hasher.parallel(len(passwords), self.hash_workers):
+            self._hash_executor = ProcessPoolExecutor(max_workers=self.hash_workers)
+        hashes = self.admin.hasher.hash_many(passwords, self.hash_workers, self._hash_executor)
+        for row, hashed in zip(rows, hashes):
+            row["password_hash"] = hashed
+
+    def _import_person(self, row, role):
+        name = row["name"]
+        email = row["email"]
+        phone = str(row.get("phone", ""))
+        if not Person.validate_email(email):
+            raise ValueError(f"Invalid email: {email}")
+        if not Person.validate_phone(phone):
+            raise ValueError(f"Invalid phone: {phone}")
+        if self.admin.find_user(email):
+            raise ValueError(f"Email already registered: {email}")
+        address = row.get("address", "")
+        date_of_birth = row.get("date_of_birth", "")
+        if role == "student":
+            person = Student(name, phone, address, date_of_birth, str(row["student_id"]))
+            if self.admin.find_student(person.student_id):
+                raise ValueError(f"Student ID already exists: {person.student_id}")
+            section = "students"
+        elif role == "instructor":
+            person = Instructor(name, phone, address, date_of_birth, str(row["instructor_id"]))
+            if self.admin.find_instructor(person.instructor_id):
+                raise ValueError(f"Instructor ID already exists: {person.instructor_id}")
+            section = "instructors"
+        elif role == "admin":
+            person = Admin(name, phone, address, date_of_birth)
+            section = None
+        else:
+            raise ValueError(f"Invalid role: {role}")
+        hashed_password = row.get("password_hash") or self.admin.hasher.hash(row.get("password") or self.default_password)
+        user = User(id=len(self.admin.data["users"]) + 1, email=email, password=hashed_password, role=role, person=person)
+        self.admin.append_record("users", user.get_details())
+        if section:
+            self.admin.append_record(section, person.get_details())
+
+    def _import_users(self, row):
+        self._import_person(row, row["role"])
+
+    def _import_students(self, row):
+        self._import_person(row, "student")
+
+    def _import_instructors(self, row):
+        self._import_person(row, "instructor")
+
+    def _import_courses(self, row):
+        course_id = str(row["course_id"])
+        if self.admin.find_course_by_id(course_id) or self.admin.find_course(row["name"]):
+            raise ValueError(f"Course already exists: {course_id}")
+        course = {"course_id": course_id, "name": row["name"], "description": row.get("description", "")}
+        if row.get("start_date"):
+            days = row.get("days", [])
+            if isinstance(days, str):
+                days = [day.strip() for day in days.split(";") if day.strip()]
+            course["schedule"] = {
+                "start_date": row["start_date"],
+                "end_date": row.get("end_date", ""),
+                "class_time": row.get("class_time", ""),
+                "days": days,
+            }
+        course["assignments"] = []
+        self.admin.append_record("courses", course)
+
+    def _course_from_row(self, row):
+        course = None
+        if row.get("course_id"):
+            course = self.admin.find_course_by_id(str(row["course_id"]))
+        elif row.get("course_name"):
+            course = self.admin.find_course(row["course_name"])
+        if not course:
+            raise ValueError(f"Course not found: {row.get('course_id') or row.get('course_name')}")
+        return course
+
+    def _import_enrollments(self, row):
+        student_id = str(row["student_id"])
+        student = self.admin.find_student(student_id)
+        if not student:
+            raise ValueError(f"Student not found: {student_id}")
+        course = self._course_from_row(row)
+        clashes = self.admin.schedule_conflicts(course, student.get("courses", []))
+        if clashes:
+            raise ValueError(f"Schedule conflict with {', '.join(c['course_id'] for c in clashes)}")
+        self.admin.enroll_student(student_id, course)
+
+    def _import_grades(self, row):
+        student_id = str(row["student_id"])
+        grade = row["grade"]
+        if not Grade.is_valid_grade(float(grade)):
+            raise ValueError(f"Grade out of range: {grade}")
+        if not self.admin.find_student(student_id):
+            raise ValueError(f"Student not found: {student_id}")
+        course = self._course_from_row(row)
+        course_position = self.admin.course_position(course["course_id"])
+        assignment_index = next((k for k, a in enumerate(course.get("assignments", [])) if a["assignment_name"] == row["assignment_name"]), None)
+        if assignment_index is None:
+            raise ValueError(f"Assignment {row['assignment_name']} not found in course {course['name']}")
+        self.admin.record_assignment_grade(course_position, assignment_index, student_id, str(grade))
+
+
+SCRIPT_OPS = (
+    "sign_up", "enroll", "create_assignment", "assign_grade",
+    "list_students", "list_instructors", "list_courses", "list_assignments", "list_grades", "list_schedules",
+)
+
+
+class ScriptRunner(BulkImporter):
+    """Runs a stream of JSON operations against one loaded PlatformAdmin.
+
+    Each input line is an object such as
+        {"op": "enroll", "student_id": "1106", "course_id": "CS06"}
+    and produces one JSON result line ({"line", "op", "ok", "result" or
+    "error"}), followed by a summary line. Operations are validated like
+    the bulk importer's rows. Changes are committed every commit_every
+    operations, or once at the end when commit_every is None. Messages the
+    platform prints go to stderr so stdout stays machine-readable.
+    """
+    def __init__(self, admin, commit_every=None, out=None, chunk_size=1000, default_password="password123",
+                 hash_workers=None):
+        super().__init__(admin, chunk_size, default_password, hash_workers)
+        self.commit_every = commit_every
+        self.out = out or sys.stdout
+        self.ops = 0
+        self.commits = 0
+
+    def run(self, lines):
+        start = time.perf_counter()
+        ops = self._parse(lines)
+        batch_size = self.commit_every or self.chunk_size
+        with contextlib.redirect_stdout(sys.stderr), self._hash_pool():
+            # Without commit_every the whole stream is one transaction
+            with self.admin.transaction() if self.commit_every is None else contextlib.nullcontext():
+                while True:
+                    self.admin.refresh()  # No-op inside the single end-of-run transaction
+                    batch = list(itertools.islice(ops, batch_size))
+                    if not batch:
+                        break
+                    self._hash_passwords([(n, op) for n, op in batch if isinstance(op, dict) and op.get("op") == "sign_up"])
+                    seq = self.admin._journal_seq
+                    with self.admin.transaction():
+                        for line_number, op in batch:
+                            self._write(self._execute(line_number, op))
+                        if self.admin._journal_seq != seq:
+                            # Read-only batches are not written back
+                            self.admin.save_data()
+                            self.commits += 1
+        if self.commit_every is None:
+            self.commits = min(self.commits, 1)
+        summary = {
+            "ops": self.ops,
+            "ok": self.imported,
+            "failed": len(self.errors),
+            "commits": self.commits,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        self._write({"summary": summary})
+        return summary
+
+    @staticmethod
+    def _parse(lines):
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, e
+
+    def _write(self, result):
+        self.out.write(json.dumps(result, default=encode_record) + "\n")
+
+    def _execute(self, line_number, op):
+        self.ops += 1
+        result = {"line": line_number, "op": op.get("op") if isinstance(op, dict) else None}
+        try:
+            if not isinstance(op, dict):
+                raise ValueError(f"Invalid JSON: {op}")
+            if op.get("op") not in SCRIPT_OPS:
+                raise ValueError(f"Unknown operation: {op.get('op')}")
+            result["result"] = getattr(self, f"_op_{op['op']}")(op)
+            result["ok"] = True
+            self.imported += 1
+        except (KeyError, ValueError, TypeError) as e:
+            message = f"Missing field: {e}" if isinstance(e, KeyError) else str(e)
+            result["ok"] = False
+            result["error"] = message
+            self.errors.append((line_number, message))
+        return result
+
+    def _op_sign_up(self, op):
+        self._import_person(op, op.get("role", "student"))
+        return {"email": op["email"]}
+
+    def _op_enroll(self, op):
+        self._import_enrollments(op)
+        return {"student_id": str(op["student_id"]), "course_id": self._course_from_row(op)["course_id"]}
+
+    def _taught_course(self, op):
+        """The op's course; if it names an instructor, they must teach it."""
+        course = self._course_from_row(op)
+        if op.get("instructor_id") is not None:
+            instructor = self.admin.find_instructor(str(op["instructor_id"]))
+            if not instructor:
+                raise ValueError(f"Instructor not found: {op['instructor_id']}")
+            if course["course_id"] not in instructor.get("courses_taught", []):
+                raise ValueError(f"Instructor {op['instructor_id']} does not teach {course['name']}")
+        return course
+
+    def _op_create_assignment(self, op):
+        course = self._taught_course(op)
+        if any(a["assignment_name"] == op["assignment_name"] for a in course.get("assignments", [])):
+            raise ValueError(f"Assignment {op['assignment_name']} already exists in {course['name']}")
+        self.admin.add_course_assignment(self.admin.course_position(course["course_id"]), {
+            "assignment_name": op["assignment_name"],
+            "description": op.get("description", ""),
+            "due_date": op.get("due_date", ""),
+            "grades": [],
+        })
+        return {"course_id": course["course_id"], "assignment_name": op["assignment_name"]}
+
+    def _op_assign_grade(self, op):
+        self._taught_course(op)
+        self._import_grades(op)
+        return {"student_id": str(op["student_id"]), "grade": op["grade"]}
+
+    def _op_list_students(self, op):
+        return self.admin.data["students"]
+
+    def _op_list_instructors(self, op):
+        return self.admin.data["instructors"]
+
+    def _op_list_courses(self, op):
+        return self.admin.data["courses"]
+
+    def _op_list_assignments(self, op):
+        assignments = self.admin.data["assignments"]
+        if op.get("course_id"):
+            assignments = [a for a in assignments if a["course_id"] == op["course_id"]]
+        return assignments
+
+    def _op_list_grades(self, op):
+        grades = self.admin.data["grades"]
+        if op.get("student_id"):
+            grades = [g for g in grades if g["student_id"] == op["student_id"]]
+        if op.get("course_id"):
+            grades = [g for g in grades if g["course_id"] == op["course_id"]]
+        return grades
+
+    def _op_list_schedules(self, op):
+        return self.admin.data["schedules"]
+
+
+# Report -> (section it is split by, columns)
+EXPORT_REPORTS = {
+    "transcripts": ("students", ("student_id", "student_name", "course_id", "course_name", "assignment", "grade")),
+    "rosters": ("courses", ("course_id", "course_name", "role", "person_id", "name")),
+    "gradebooks": ("courses", ("course_id", "course_name", "assignment", "student_id", "student_name", "grade")),
+}
+_export_admins = {}  # Store spec -> PlatformAdmin, one load per export worker process
+
+
+def export_format(path):
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def write_export_rows(rows, f, fields, fmt, header=True):
+    """Write rows (dicts) to f as CSV or JSON Lines, one at a time. Returns the count."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(f, fields)
+        if header:
+            writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+            count += 1
+    return count
+
+
+def _export_job(job):
+    # Top-level so ProcessPoolExecutor can pickle it. The worker loads the
+    # saved data once and keeps it for the rest of its jobs.
+    spec, report, fmt, start, stop, part = job
+    admin = _export_admins.get(spec)
+    if admin is None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if spec[0] == "sqlite":
+                admin = PlatformAdmin(store=SqliteStore(spec[1]))
+            else:
+                admin = PlatformAdmin(spec[1])
+        _export_admins[spec] = admin
+    exporter = ReportExporter(admin)
+    with open(part, "w", newline="") as f:
+        count = write_export_rows(getattr(exporter, report)(start, stop), f, EXPORT_REPORTS[report][1], fmt,
+                                  header=False)
+    return part, count
+
+
+class ReportExporter:
+    """Streams transcripts, rosters and gradebooks to CSV / JSON-Lines files.
+
+    Each report is a generator of flat rows, written as it is produced, so
+    an export never holds its result set in memory. With workers > 1 the
+    students (transcripts) or courses (rosters, gradebooks) are split into
+    chunks that a process pool writes to part files, which are then
+    appended to the output in order; the output is the same either way.
+    Workers read the saved data, so unsaved changes are saved first.
+    """
+    def __init__(self, admin, workers=1, chunk_size=1000):
+        self.admin = admin
+        self.workers = workers  # Processes (None: one per CPU)
+        self.chunk_size = chunk_size  # Students or courses per worker job
+
+    def _name(self, section, person_id):
+        person = self.admin.find_student(person_id) if section == "students" else self.admin.find_instructor(person_id)
+        return person["name"] if person else ""
+
+    def transcripts(self, start=0, stop=None):
+        """Every grade of students[start:stop]: assignment grades, then each course grade."""
+        admin = self.admin
+        assignment_grades = admin.assignment_grades()
+        for student in itertools.islice(admin.data["students"], start, stop):
+            student_id = student["student_id"]
+            course_grades = student.get("grades")
+            course_grades = course_grades if isinstance(course_grades, list) else []
+            reported = set()
+            for course in admin.resolve_courses(student.get("courses", [])):
+                row = {"student_id": student_id, "student_name": student["name"],
+                       "course_id": course["course_id"], "course_name": course["name"]}
+                for assignment in course.get("assignments", []):
+                    grade = assignment_grades.get(student_id, course["course_id"], assignment["assignment_name"])
+                    if grade is not None:
+                        yield dict(row, assignment=assignment["assignment_name"], grade=grade)
+                for entry in course_grades:
+                    if entry.get("course_name") == course["name"]:
+                        yield dict(row, assignment=GradebookAnalytics.COURSE_GRADE, grade=entry["grade"])
+                reported.add(course["name"])
+            # Course grades kept for courses the student is no longer enrolled in
+            for entry in course_grades:
+                if entry.get("course_name") not in reported:
+                    course = admin.find_course(entry.get("course_name"))
+                    yield {"student_id": student_id, "student_name": student["name"],
+                           "course_id": course["course_id"] if course else "", "course_name": entry.get("course_name"),
+                           "assignment": GradebookAnalytics.COURSE_GRADE, "grade": entry["grade"]}
+
+    def rosters(self, start=0, stop=None):
+        """Instructors, then students, of courses[start:stop]."""
+        rosters = self.admin.rosters()
+        for course in itertools.islice(self.admin.data["courses"], start, stop):
+            for section, role in (("instructors", "instructor"), ("students", "student")):
+                for person_id in rosters[section].get(course["course_id"], ()):
+                    yield {"course_id": course["course_id"], "course_name": course["name"], "role": role,
+                           "person_id": person_id, "name": self._name(section, person_id)}
+
+    def gradebooks(self, start=0, stop=None):
+        """Assignment grades of courses[start:stop], then the course grades of their students."""
+        admin = self.admin
+        course_grades = admin.student_course_grades()
+        rosters = admin.rosters()
+        for course in itertools.islice(admin.data["courses"], start, stop):
+            row = {"course_id": course["course_id"], "course_name": course["name"]}
+            for assignment in course.get("assignments", []):
+                for entry in assignment.get("grades", []):
+                    yield dict(row, assignment=assignment["assignment_name"], student_id=entry["student_id"],
+                               student_name=self._name("students", entry["student_id"]), grade=entry["grade"])
+            for student_id in rosters["students"].get(course["course_id"], ()):
+                grade = course_grades.get(student_id, course["name"], "")
+                if grade is not None:
+                    yield dict(row, assignment=GradebookAnalytics.COURSE_GRADE, student_id=student_id,
+                               student_name=self._name("students", student_id), grade=grade)
+
+    def _store_spec(self):
+        store = self.admin.store
+        if isinstance(store, SqliteStore):
+            return ("sqlite", store.db_file)
+        return ("json", store.data_file)
+
+    def export(self, report, path, fmt=None):
+        """Write one report to path (CSV, or JSON Lines for .jsonl). Returns the number of rows."""
+        if report not in EXPORT_REPORTS:
+            raise ValueError(f"Unknown report: {report}")
+        fmt = fmt or export_format(path)
+        section, fields = EXPORT_REPORTS[report]
+        with self.admin.lock.read():
+            total = len(self.admin.data[section])
+        parallel = self.workers != 1 and total > self.chunk_size
+        if parallel and self.admin._pending:
+            self.admin.save_data()
+        with open(path, "w", newline="") as f:
+            if not parallel:
+                with self.admin.lock.read():
+                    rows = write_export_rows(getattr(self, report)(0, total), f, fields, fmt)
+            else:
+                if fmt == "csv":
+                    csv.writer(f).writerow(fields)
+                rows = 0
+                jobs = [
+                    (self._store_spec(), report, fmt, start, min(start + self.chunk_size, total), f"{path}.part{n}")
+                    for n, start in enumerate(range(0, total, self.chunk_size))
+                ]
+                f.flush()
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    # map yields in job order; each part is streamed in and deleted
+                    for part, count in pool.map(_export_job, jobs):
+                        with open(part, "r", newline="") as part_file:
+                            shutil.copyfileobj(part_file, f)
+                        os.remove(part)
+                        rows += count
+        print(f"Exported {rows} {report} rows to {path}.")
+        return rows
+
+
+# Methods timed while METRICS is enabled
+INSTRUMENTED_METHODS = (
+    (PlatformAdmin, ("load_data", "save_data", "refresh", "sign_up", "login", "add_course", "enroll_student",
+                     "record_assignment_grade", "add_course_assignment", "add_assignment", "add_schedule", "add_grade",
+                     "list_courses", "search_courses", "list_assignments", "list_schedules", "list_grades",
+                     "view_student_courses", "student_timetable", "upcoming_deadlines", "schedule_conflicts",
+                     "in_class_at")),
+    (Instructor, ("assign_course", "create_assignment", "assign_grade", "view_courses", "view_leaderboard",
+                  "view_schedule")),
+    (Student, ("enroll_course", "assign_grade", "view_courses", "view_grades", "view_assignment_grades",
+               "view_schedule")),
+    (BulkImporter, ("import_file",)),
+    (ScriptRunner, ("run",) + tuple(f"_op_{op}" for op in SCRIPT_OPS)),
+    (ReportExporter, ("export",)),
+)
+
+
+class PlatformService:
+    """HTTP/JSON front end serving one shared, in-memory PlatformAdmin.
+
+    Runs on the stdlib asyncio event loop. Reads are answered straight from
+    memory, interleaved with each other and with writes. Every mutation is
+    queued to a single writer task. It drains whatever is waiting (up to
+    batch_size) and applies it in memory inside one transaction; the save
+    then runs in a worker thread, so requests keep being read and answered
+    meanwhile, and the callers get their answers once it is done. A write
+    is only acknowledged once it is saved (readers may see it a moment
+    earlier). If the save fails, the data is reloaded from the store.
+
+        GET  /students /instructors /courses /assignments /grades /schedules
+        GET  /students/<id>  /students/<id>/timetable  /students/<id>/deadlines?days=7
+        GET  /courses/search?q=...  /in-class?at=YYYY-MM-DDTHH:MM  /metrics
+        POST /login /logout /signup /enroll /grades /assignments /schedules
+
+    POST /login answers with a session token for the user's role and ID.
+    Every other request needs it as "Authorization: Bearer <token>" and is
+    checked against that identity, as the menus do: only instructors grade
+    and add assignments, and only in courses they teach; students enroll
+    themselves; admins enroll anyone, add schedules and sign users up.
+    Instructors and admins may read everything. Students may read the
+    catalog (courses, without anyone's grades, assignments and schedules)
+    and their own /students/<id> records.
+    """
+    SESSION_SECONDS = 8 * 60 * 60
+
+    def __init__(self, admin, batch_size=256):
+        self.admin = admin
+        self.batch_size = batch_size
+        self.runner = ScriptRunner(admin, out=io.StringIO())  # Reused for validated writes
+        self.queue = None
+        self.writer = None
+        self.batches = 0
+        self.writes = 0
+        self.sessions = {}  # token -> {"email", "role", "id", "expires"}, oldest first
+        admin.verbose = False  # Nothing to print to: save and load messages are dropped
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self.queue = asyncio.Queue()
+        self.writer = asyncio.create_task(self._write_loop())
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        server = await self.start(host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Serving on http://{address[0]}:{address[1]}")
+        async with server:
+            await server.serve_forever()
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            results = []
+            try:
+                # No awaits in here, so readers never see half of a batch
+                with self.admin.transaction():
+                    for write, _ in batch:
+                        try:
+                            results.append((True, write()))
+                        except (KeyError, ValueError, TypeError) as e:
+                            results.append((False, e))
+                await loop.run_in_executor(None, self._persist)
+            except Exception as e:  # Rolled back, or the save failed: nothing was kept
+                results = [(False, e)] * len(batch)
+            self.batches += 1
+            self.writes += len(batch)
+            for (ok, value), (_, future) in zip(results, batch):
+                if not future.done():
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+
+    def _persist(self):
+        """Save what the writer applied; run in a worker thread.
+
+        Holds the admin's write lock. If the save fails, the data is
+        reloaded, so memory holds only what was saved.
+        """
+        with self.admin.lock.write():
+            try:
+                self.admin.save_data()
+            except Exception:
+                self.admin.load_data()
+                raise
+
+    async def submit(self, write):
+        """Queue write (a callable) for the writer task and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((write, future))
+        return await future
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+                status, payload = await self.dispatch(method, target, body, headers)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload, default=encode_record).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # Client went away or sent something that is not HTTP
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body, headers=None):
+        """(status, JSON payload) for one request; headers have lowercase names."""
+        url = urllib.parse.urlsplit(target)
+        query = {key: values[-1] for key, values in urllib.parse.parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        authorization = (headers or {}).get("authorization", "")
+        try:
+            if method == "GET":
+                session = self.session(authorization)
+                if session is None:
+                    return 401, {"error": "Log in first (Authorization: Bearer <token>)"}
+                return await self._read(parts, query, session)
+            if method != "POST":
+                return 405, {"error": f"Method not allowed: {method}"}
+            fields = json.loads(body or b"{}")
+            if not isinstance(fields, dict):
+                raise ValueError("Expected a JSON object")
+            return await self._post(parts, fields, authorization)
+        except (KeyError, ValueError, TypeError) as e:
+            return 400, {"error": f"Missing field: {e}" if isinstance(e, KeyError) else str(e)}
+
+    @staticmethod
+    def _authorize_read(parts, session):
+        """None if session may GET parts, else the (status, payload) refusal."""
+        if session["role"] != "student":
+            return None
+        if parts[:1] == ["students"] and len(parts) > 1:
+            if parts[1] != str(session["id"]):
+                return 403, {"error": "Students can only see their own records"}
+            return None
+        if parts[:1] in (["courses"], ["assignments"], ["schedules"]):
+            return None
+        return 403, {"error": "Only instructors and admins can see that"}
+
+    @staticmethod
+    def _without_grades(course):
+        """course as a student may see it: its assignments without anyone's grades."""
+        return dict(course, assignments=[{key: value for key, value in assignment.items() if key != "grades"}
+                                         for assignment in course.get("assignments", [])])
+
+    async def _read(self, parts, query, session):
+        refusal = self._authorize_read(parts, session)
+        if refusal is not None:
+            return refusal
+        admin = self.admin
+        catalog = self._without_grades if session["role"] == "student" else lambda course: course
+        if parts == ["courses"]:
+            return 200, [catalog(course) for course in admin.data["courses"]]
+        if len(parts) == 1 and parts[0] in ("students", "instructors", "assignments", "grades", "schedules"):
+            return 200, getattr(self.runner, f"_op_list_{parts[0]}")(query)
+        if parts[:1] == ["students"] and len(parts) in (2, 3):
+            student = admin.find_student(parts[1])
+            if not student:
+                return 404, {"error": f"Student not found: {parts[1]}"}
+            if len(parts) == 2:
+                return 200, student
+            if parts[2] == "timetable":
+                return 200, admin.student_timetable(parts[1])
+            if parts[2] == "deadlines":
+                return 200, admin.upcoming_deadlines(int(query.get("days", 7)), student_id=parts[1])
+        if parts == ["courses", "search"]:
+            # search_courses takes the read lock, which a save in progress holds off
+            results = await asyncio.get_running_loop().run_in_executor(
+                None, admin.search_courses, query.get("q", ""), int(query.get("limit", 10)))
+            return 200, [dict(catalog(course), score=score) for course, score in results]
+        if parts == ["metrics"]:
+            return 200, METRICS.to_dict()
+        if parts == ["in-class"]:
+            when = datetime.strptime(query["at"], "%Y-%m-%dT%H:%M") if "at" in query else datetime.now()
+            courses, students, instructors, free_instructors, free_rooms = admin.in_class_at(when)
+            return 200, {
+                "courses": [c["course_id"] for c in courses],
+                "students": students,
+                "instructors": instructors,
+                "free_instructors": free_instructors,
+                "free_rooms": free_rooms,
+            }
+        return 404, {"error": f"Not found: /{'/'.join(parts)}"}
+
+    def open_session(self, user):
+        """A new session token for a users record. Drops sessions that have expired."""
+        now = time.monotonic()
+        # Every session lasts as long, so the expired ones are the oldest
+        while self.sessions:
+            token = next(iter(self.sessions))
+            if self.sessions[token]["expires"] >= now:
+                break
+            del self.sessions[token]
+        person = user.get("person") or {}
+        token = secrets.token_urlsafe(32)
+        self.sessions[token] = {
+            "email": user["email"],
+            "role": user["role"],
+            "id": person.get("student_id") or person.get("instructor_id"),
+            "expires": now + self.SESSION_SECONDS,
+        }
+        return token
+
+    def session(self, authorization):
+        """The live session named by an "Authorization: Bearer <token>" value, or None."""
+        scheme, _, token = authorization.partition(" ")
+        session = self.sessions.get(token.strip()) if scheme.lower() == "bearer" else None
+        if session is not None and session["expires"] < time.monotonic():
+            del self.sessions[token.strip()]
+            return None
+        return session
+
+    def _authorize(self, route, session, fields):
+        """None if session may POST fields to route, else the (status, payload) refusal.
+
+        Identity fields are filled in from the session, never trusted from
+        the request.
+        """
+        role = session["role"]
+        if route in ("grades", "assignments"):
+            if role != "instructor":
+                return 403, {"error": "Only instructors can do that"}
+            fields["instructor_id"] = session["id"]  # _taught_course checks they teach the course
+        elif route == "enroll":
+            if role == "student":
+                if str(fields.setdefault("student_id", session["id"])) != str(session["id"]):
+                    return 403, {"error": "Students can only enroll themselves"}
+            elif role != "admin":
+                return 403, {"error": "Only students and admins can enroll"}
+        elif route == "schedules":
+            if role == "instructor":
+                fields["instructor_id"] = session["id"]
+            elif role != "admin":
+                return 403, {"error": "Only instructors and admins can add schedules"}
+        elif route == "signup" and role != "admin":
+            return 403, {"error": "Only admins can sign users up"}
+        return None
+
+    async def _post(self, parts, fields, authorization=""):
+        route = parts[0] if len(parts) == 1 else None
+        if route == "login":
+            return await self._login(fields)
+        if route not in ("logout", "signup", "schedules", "enroll", "grades", "assignments"):
+            return 404, {"error": f"Not found: /{'/'.join(parts)}"}
+        session = self.session(authorization)
+        if session is None:
+            return 401, {"error": "Log in first (Authorization: Bearer <token>)"}
+        if route == "logout":
+            self.sessions.pop(authorization.partition(" ")[2].strip(), None)
+            return 200, {"email": session["email"]}
+        refusal = self._authorize(route, session, fields)
+        if refusal is not None:
+            return refusal
+        if route == "signup":
+            # Hash off the event loop; the writer only appends the records
+            loop = asyncio.get_running_loop()
+            fields["password_hash"] = await loop.run_in_executor(
+                None, self.admin.hasher.hash, fields.get("password") or self.runner.default_password)
+            fields.pop("password", None)
+            return 200, await self.submit(lambda: self.runner._op_sign_up(fields))
+        if route == "schedules":
+            return 200, await self.submit(lambda: self._add_schedule(fields))
+        ops = {"enroll": "enroll", "grades": "assign_grade", "assignments": "create_assignment"}
+        return 200, await self.submit(lambda: getattr(self.runner, f"_op_{ops[route]}")(fields))
+
+    async def _login(self, fields):
+        user = self.admin.find_user(fields["email"])
+        password = fields["password"]
+        loop = asyncio.get_running_loop()
+        if not user or not await loop.run_in_executor(None, self.admin.hasher.verify, password, user["password"]):
+            return 401, {"error": "Invalid email or password"}
+        if self.admin.hasher.needs_rehash(user["password"]):
+            hashed = await loop.run_in_executor(None, self.admin.hasher.hash, password)
+            await self.submit(lambda: self._set_password(fields["email"], hashed))
+        return 200, {"email": user["email"], "role": user["role"], "name": user["person"].get("name"),
+                     "token": self.open_session(user)}
+
+    def _set_password(self, email, hashed):
+        position = self.admin._index("_users_by_email")[email]
+        self.admin.apply_change("set", ["users", position, "password"], hashed)
+
+    def _add_schedule(self, fields):
+        course = self.runner._taught_course(fields)
+        schedule = Schedule(course["course_id"], fields.get("start_date", ""), fields.get("end_date", ""),
+                            fields["class_time"], fields.get("days", []))
+        CalendarIndex.meetings(schedule)  # Raises ValueError for times or days it cannot place
+        # As add_schedule, without its save and message: the writer saves the batch
+        self.admin.append_record("schedules", schedule.get_details())
+        return schedule.get_details()
+
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+                405: "Method Not Allowed"}
+
+
+def _percentile(sorted_values, start, end, q):
+    """Linearly interpolated percentile of sorted_values[start:end]."""
+    position = start + q * (end - start - 1)
+    lower = int(position)
+    upper = min(lower + 1, end - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class GradebookAnalytics:
+    """Columnar view of every numeric grade on the platform.
+
+    Grades come from three places: assignment grades on catalog courses,
+    records in data["grades"] (PlatformAdmin.add_grade), and the per-course
+    grades on each student. They are gathered once into typed arrays
+    (course code, assignment code, value), and statistics for every group
+    are computed in one sorted pass (with NumPy when it is installed).
+    Student course grades are reported as a "(course grade)" pseudo
+    assignment and left out of the course totals, since they repeat the
+    assignment grades.
+    """
+    COURSE_GRADE = "(course grade)"
+    PERCENTILES = (0.25, 0.75, 0.90)
+    HISTOGRAM_BINS = 11  # 0-9, 10-19, ..., 90-99, 100
+
+    def __init__(self, admin, pass_mark=75, use_numpy=True):
+        self.pass_mark = pass_mark
+        self.use_numpy = use_numpy and np is not None
+        self.course_ids = []  # course code -> course_id
+        self.course_codes = {}
+        self.assignment_keys = []  # assignment code -> (course_id, assignment name)
+        self.assignment_codes = {}
+        self.course_col = array("i")
+        self.assignment_col = array("i")
+        self.value_col = array("d")
+        self.in_course_total = array("b")
+        self.skipped = 0  # Grades that are not finite numbers
+        self.gather(admin)
+
+    def _code(self, codes, keys, key):
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(keys)
+            keys.append(key)
+        return code
+
+    def _add(self, course_id, assignment_name, value, in_course_total=True):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            self.skipped += 1
+            return
+        if not math.isfinite(value):
+            self.skipped += 1
+            return
+        self.course_col.append(self._code(self.course_codes, self.course_ids, course_id))
+        self.assignment_col.append(self._code(self.assignment_codes, self.assignment_keys, (course_id, assignment_name)))
+        self.value_col.append(value)
+        self.in_course_total.append(in_course_total)
+
+    def gather(self, admin):
+        with admin.lock.read():
+            self._gather(admin)
+
+    def _gather(self, admin):
+        for course in admin.data["courses"]:
+            for assignment in course.get("assignments", []):
+                for entry in assignment.get("grades", []):
+                    self._add(course["course_id"], assignment["assignment_name"], entry["grade"])
+        for entry in admin.data["grades"]:
+            self._add(entry["course_id"], entry["assignment_id"], entry["grade_value"])
+        for student in admin.data["students"]:
+            grades = student.get("grades")
+            if not isinstance(grades, list):
+                continue
+            for entry in grades:
+                course = admin.find_course(entry.get("course_name"))
+                course_id = course["course_id"] if course else entry.get("course_name")
+                self._add(course_id, self.COURSE_GRADE, entry["grade"], in_course_total=False)
+
+    def __len__(self):
+        return len(self.value_col)
+
+    def _group_stats(self, groups, values):
+        """Stats for each group code: {code: {...}}."""
+        if not values:
+            return {}
+        if self.use_numpy:
+            return self._group_stats_numpy(groups, values)
+        pairs = sorted(zip(groups, values))
+        sorted_groups = [g for g, _ in pairs]
+        sorted_values = [v for _, v in pairs]
+        stats = {}
+        start = 0
+        while start < len(pairs):
+            code = sorted_groups[start]
+            end = start + 1
+            while end < len(pairs) and sorted_groups[end] == code:
+                end += 1
+            group_values = sorted_values[start:end]
+            count = end - start
+            mean = sum(group_values) / count
+            variance = sum((v - mean) ** 2 for v in group_values) / (count - 1) if count > 1 else 0.0
+            histogram = [0] * self.HISTOGRAM_BINS
+            for v in group_values:
+                histogram[min(max(int(v // 10), 0), self.HISTOGRAM_BINS - 1)] += 1
+            stats[code] = {
+                "count": count,
+                "mean": mean,
+                "median": _percentile(sorted_values, start, end, 0.5),
+                "stdev": variance ** 0.5,
+                "min": sorted_values[start],
+                "max": sorted_values[end - 1],
+                "percentiles": {q: _percentile(sorted_values, start, end, q) for q in self.PERCENTILES},
+                "histogram": histogram,
+                "pass_rate": sum(1 for v in group_values if v >= self.pass_mark) / count,
+            }
+            start = end
+        return stats
+
+    def _group_stats_numpy(self, groups, values):
+        g = np.asarray(groups, dtype=np.intc)
+        v = np.asarray(values, dtype=np.float64)
+        order = np.lexsort((v, g))
+        g, v = g[order], v[order]
+        starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+        ends = np.r_[starts[1:], len(g)]
+        counts = ends - starts
+        means = np.add.reduceat(v, starts) / counts
+        squares = np.add.reduceat((v - np.repeat(means, counts)) ** 2, starts)
+        stdevs = np.sqrt(np.where(counts > 1, squares / np.maximum(counts - 1, 1), 0.0))
+        passed = np.add.reduceat((v >= self.pass_mark).astype(np.float64), starts)
+        bins = np.clip(v // 10, 0, self.HISTOGRAM_BINS - 1).astype(np.intp)
+        group_index = np.repeat(np.arange(len(starts)), counts)
+        histograms = np.bincount(group_index * self.HISTOGRAM_BINS + bins, minlength=len(starts) * self.HISTOGRAM_BINS)
+        histograms = histograms.reshape(len(starts), self.HISTOGRAM_BINS)
+
+        def percentile(q):
+            position = starts + q * (counts - 1)
+            lower = position.astype(np.intp)
+            upper = np.minimum(lower + 1, ends - 1)
+            return v[lower] + (v[upper] - v[lower]) * (position - lower)
+
+        medians = percentile(0.5)
+        quantiles = {q: percentile(q) for q in self.PERCENTILES}
+        stats = {}
+        for n, start in enumerate(starts):
+            stats[int(g[start])] = {
+                "count": int(counts[n]),
+                "mean": float(means[n]),
+                "median": float(medians[n]),
+                "stdev": float(stdevs[n]),
+                "min": float(v[start]),
+                "max": float(v[ends[n] - 1]),
+                "percentiles": {q: float(quantiles[q][n]) for q in self.PERCENTILES},
+                "histogram": histograms[n].tolist(),
+                "pass_rate": float(passed[n] / counts[n]),
+            }
+        return stats
+
+    def course_stats(self):
+        """{course_id: stats} over assignment grades."""
+        groups = array("i", (c for c, keep in zip(self.course_col, self.in_course_total) if keep))
+        values = array("d", (v for v, keep in zip(self.value_col, self.in_course_total) if keep))
+        return {self.course_ids[code]: stats for code, stats in self._group_stats(groups, values).items()}
+
+    def assignment_stats(self):
+        """{(course_id, assignment name): stats}."""
+        stats = self._group_stats(self.assignment_col, self.value_col)
+        return {self.assignment_keys[code]: group for code, group in stats.items()}
+
+    @staticmethod
+    def format_stats(stats):
+        p25, p75, p90 = (stats["percentiles"][q] for q in GradebookAnalytics.PERCENTILES)
+        return (
+            f"{stats['count']} grades, mean {stats['mean']:.1f}, median {stats['median']:.1f}, "
+            f"stdev {stats['stdev']:.1f}, min/max {stats['min']:.0f}/{stats['max']:.0f}, "
+            f"p25/p75/p90 {p25:.1f}/{p75:.1f}/{p90:.1f}, pass rate {stats['pass_rate']:.0%}"
+        )
+
+    @staticmethod
+    def format_histogram(histogram):
+        labels = [f"{n * 10}-{n * 10 + 9}" for n in range(len(histogram) - 1)] + ["100"]
+        return ", ".join(f"{label}: {count}" for label, count in zip(labels, histogram) if count)
+
+    def print_report(self, admin, course_ids=None):
+        """Print per-course and per-assignment statistics (optionally for some courses)."""
+        course_stats = self.course_stats()
+        assignment_stats = self.assignment_stats()
+        wanted = self.course_ids if course_ids is None else [c for c in self.course_ids if c in course_ids]
+        if not wanted:
+            print("No grades found.")
+            return
+        print(f"Gradebook report ({len(self)} grades, pass mark {self.pass_mark}):")
+        for course_id in wanted:
+            course = admin.find_course_by_id(course_id)
+            name = course["name"] if course else course_id
+            print(f"\nCourse {course_id} ({name})")
+            if course_id in course_stats:
+                print(f"  All assignments: {self.format_stats(course_stats[course_id])}")
+                print(f"  Histogram: {self.format_histogram(course_stats[course_id]['histogram'])}")
+            for (assignment_course, assignment_name), stats in assignment_stats.items():
+                if assignment_course == course_id:
+                    print(f"  {assignment_name}: {self.format_stats(stats)}")
+        if self.skipped:
+            print(f"\n{self.skipped} non-numeric grades were skipped.")
+
+
+def student_menu(admin, student_id):
+    while True:
+        METRICS.menu_action("student")  # Ends the timing of the previous choice
+        admin.refresh()  # Pick up what other sessions saved
+        print("\n--- Student Menu ---")
+        print("1. View Courses")
+        print("2. View Grades for Courses")
+        print("3. View Assignment Grades")
+        print("4. Enroll in a Course") 
+        print("5. View Schedule")  # New option to view schedule
+        print("6. Upcoming Deadlines")
+        print("7. Logout")
+        
+        choice = input("Select an option: ")
+        METRICS.menu_action("student", choice)
+
+        if choice == "1":
+            student_data = admin.find_student(student_id)
+            if student_data:
+                student = Student(
+                    student_data["name"],
+                    student_data["phone"],
+                    student_data["address"],
+                    student_data["date_of_birth"],
+                    student_data["student_id"]
+                )
+                student.courses = admin.resolve_courses(student_data.get("courses", []))
+                student.view_courses()
+            else:
+                print("Student not found.")
+
+        elif choice == "2":
+            student_data = admin.find_student(student_id)
+            if student_data:
+                student = Student(
+                    student_data["name"],
+                    student_data["phone"],
+                    student_data["address"],
+                    student_data["date_of_birth"],
+                    student_data["student_id"]
+                )
+                student.grades = student_data.get("grades", {})
+                student.view_grades(admin.student_grade_summary(student_id))
+            else:
+                print("Student not found.")
+
+        elif choice == "3":
+            student_data = admin.find_student(student_id)
+            if student_data:
+                student = Student(
+                    student_data["name"],
+                    student_data["phone"],
+                    student_data["address"],
+                    student_data["date_of_birth"],
+                    student_data["student_id"]
+                )
+                student.grades = student_data.get("grades", {})
+                student.view_assignment_grades(admin.student_grade_summary(student_id))
+            else:
+                print("Student not found.")
+
+        elif choice == "4":
+            query = input("Search courses (blank to list them all): ").strip()
+            matches = []
+            if query:
+                matches = admin.search_courses(query)
+                if not matches:
+                    print("No matching courses.")
+                for n, (match, _) in enumerate(matches, 1):
+                    print(f"{n}. {match['name']}")
+            else:
+                admin.list_courses()
+            course_name = input("Enter the name (or result number) of the course you want to enroll in: ").strip()
+            course = admin.find_course(course_name)
+            if not course and course_name.isdigit() and 1 <= int(course_name) <= len(matches):
+                course = matches[int(course_name) - 1][0]
+            if not course and course_name and not course_name.isdigit():
+                suggestions = admin.search_courses(course_name, limit=5)
+                if suggestions:
+                    print(f"Did you mean: {', '.join(match['name'] for match, _ in suggestions)}?")
+            if course:
+                student_data = admin.find_student(student_id)
+                clashes = admin.schedule_conflicts(course, student_data.get("courses", [])) if student_data else []
+                if clashes:
+                    print(f"Cannot enroll in {course['name']}: it clashes with "
+                          f"{', '.join(c['name'] for c in clashes)}.")
+                elif student_data:
+                    student = Student(
+                        student_data["name"],
+                        student_data["phone"],
+                        student_data["address"],
+                        student_data["date_of_birth"],
+                        student_data["student_id"]
+                    )
+                    student.courses = admin.resolve_courses(student_data.get("courses", []))
+                    student.enroll_course(course)
+
+                    # Only the course_id is stored; the catalog holds the course itself
+                    if admin.enroll_student(student_id, course):
+                        print(f"{student_data['name']} successfully enrolled in {course['name']}!")
+                else:
+                    print("Student not found.")
+            else:
+                print(f"Course with Name '{course_name}' not found.")
+
+
+        # Inside the student_menu function, when the user selects option 5 (View Schedule)
+        elif choice == "5":
+            # The timetable is cached, so this is usually just a lookup
+            timetable = admin.student_timetable(student_id)
+            if timetable is None:
+                print("Student not found.")
+            elif not timetable["meetings"] and not timetable["unscheduled"]:
+                print("You are not enrolled in any courses yet.")
+            else:
+                print("\nWeekly schedule:")
+                for meeting in timetable["meetings"]:
+                    schedule = meeting["schedule"]
+                    if meeting["weekday"] is None:
+                        when = f"{schedule.get('days')} {schedule.get('class_time')}"
+                    else:
+                        when = (f"{WEEKDAYS[meeting['weekday']].title():<9} "
+                                f"{meeting['start'] // 60:02d}:{meeting['start'] % 60:02d}-"
+                                f"{meeting['end'] // 60:02d}:{meeting['end'] % 60:02d}")
+                    print(f"{when}  {meeting['name']} "
+                          f"({schedule.get('start_date', '?')} to {schedule.get('end_date', '?')})")
+                for course_name in timetable["unscheduled"]:
+                    print(f"Schedule not available for {course_name}.")
+
+
+        elif choice == "6":
+            days = input("Show deadlines for how many days? (default 7): ").strip()
+            days = int(days) if days.isdigit() else 7
+            deadlines = admin.upcoming_deadlines(days, student_id=student_id)
+            if deadlines:
+                print(f"Assignments due in the next {days} days:")
+                for entry in deadlines:
+                    course = admin.find_course_by_id(entry["course_id"])
+                    course_name = course["name"] if course else entry["course_id"]
+                    print(f"- {entry['due_date']}: {entry['assignment_name']} ({course_name})")
+            else:
+                print(f"Nothing due in the next {days} days.")
+
+        elif choice == "7":
+            print("Logging out...")
+            break
+
+        else:
+            print("Invalid option, please try again.")
+
+
+
+def instructor_menu(admin, instructor_id):
+    # Retrieve instructor data at the beginning of the menu
+    instructor_data = admin.find_instructor(instructor_id)
+
+    # Check if instructor data exists
+    if not instructor_data:
+        print(f"Error: No instructor found with ID {instructor_id}.")
+        return  # Exit the function if no instructor is found
+
+    # Create the instructor instance once
+    instructor = Instructor(
+        instructor_data["name"],
+        instructor_data["phone"],
+        instructor_data["address"],
+        instructor_data["date_of_birth"],
+        instructor_data["instructor_id"]
+    )
+
+    # Instructor menu options
+    while True:
+        METRICS.menu_action("instructor")
+        admin.refresh()  # Pick up what other sessions saved
+        print("\n--- Instructor Menu ---")
+        print("1. View Courses")
+        print("2. Assign Grade")
+        print("3. Add Course to Teach")
+        print("4. Create Assignment")
+        print("5. Gradebook Report")
+        print("6. Leaderboards")
+        print("7. Logout")
+        choice = input("Select an option: ")
+        METRICS.menu_action("instructor", choice)
+
+        if choice == "1":
+            instructor.view_courses(admin)
+
+        elif choice == "2":
+            course_name = input("Enter course name: ")
+            assignment_name = input("Enter assignment name: ")
+            grade = input(f"Enter grade for assignment {assignment_name}: ")
+            student_id = input("Enter student ID: ")
+            instructor.assign_grade(student_id, course_name, assignment_name, grade, admin)
+
+        elif choice == "3":
+            course_name = input("Enter course name: ")
+            course_description = input("Enter course description: ")
+            course = {"name": course_name, "description": course_description, "assignments": []}
+            instructor.assign_course(course, admin)
+
+        elif choice == "4":
+            course_name = input("Enter course name: ")
+            assignment_name = input("Enter assignment name: ")
+            description = input("Enter assignment description: ")
+            due_date = input("Enter due date (YYYY-MM-DD): ")
+            instructor.create_assignment(course_name, assignment_name, description, due_date, admin)
+
+        elif choice == "5":
+            course_ids = admin.find_instructor(instructor_id)["courses_taught"]
+            GradebookAnalytics(admin).print_report(admin, course_ids)
+
+        elif choice == "6":
+            course_name = input("Enter course name: ")
+            assignment_name = input("Enter assignment name (blank for the whole course): ").strip()
+            k = input("How many students to show [10]: ").strip()
+            student_id = input("Student ID to look up (blank to skip): ").strip()
+            instructor.view_leaderboard(course_name, assignment_name, admin, int(k) if k.isdigit() else 10, student_id)
+
+        elif choice == "7":
+            print("Logging out...")
+            break
+
+        else:
+            print("Invalid choice. Please try again.")
+
+
+
+
+def admin_menu(admin):
+    while True:
+        METRICS.menu_action("admin")
+        admin.refresh()  # Pick up what other sessions saved
+        print("\n--- Admin Menu ---")
+        print("1. Add Student")
+        print("2. Add Instructor")
+        print("3. Add Course")
+        print("4. List Students")
+        print("5. List Instructors")
+        print("6. List Courses")
+        print("7. Gradebook Report")
+        print("8. Who Is In Class")
+        print("9. Export Reports")
+        print("10. Logout")
+        choice = input("Select an option: ")
+        METRICS.menu_action("admin", choice)
+
+        if choice == "1":
+            name = input("Enter student's name: ")
+            email = input("Enter student's email: ")
+            phone = input("Enter student's phone: ")
+            address = input("Enter student's address: ")
+            date_of_birth = input("Enter student's date of birth (YYYY-MM-DD): ")
+            student_id = input("Enter student ID: ")
+
+           
+            student = Student(name, phone, address, date_of_birth, student_id)
+            admin.append_record("students", student.get_details())
+
+            temp_password = "password123"  # Temporary default password
+            hashed_password = admin.hasher.hash(temp_password)
+            user_id = len(admin.data["users"]) + 1
+            user = User(id=user_id, email=email, password=hashed_password, role="student", person=student)
+            admin.append_record("users", user.get_details())
+
+            # admin.credentials[user_id] = {
+            #     "name": name,
+            #     "email": email,
+            #     "password": hashed_password,
+            #     "role": "student"
+            # }
+           
+            admin.save_data()
+            # admin.save_credentials()
+
+            print(f"Student {name} added successfully!")
+            print(f"Credentials for {name}:")
+            print(f"Username: {email}")
+            print(f"Password: {temp_password} (Change it after logging in!)")
+
+        elif choice == "2":
+            
+            name = input("Enter instructor's name: ")
+            email = input("Enter instructor's email: ")
+            phone = input("Enter instructor's phone: ")
+            address = input("Enter instructor's address: ")
+            date_of_birth = input("Enter instructor's date of birth (YYYY-MM-DD): ")
+            instructor_id = input("Enter instructor ID: ")
+
+            instructor = Instructor(name, phone, address, date_of_birth, instructor_id)
+            admin.append_record("instructors", instructor.get_details())
+
+            temp_password = "password123"  # Temporary default password
+            hashed_password = admin.hasher.hash(temp_password)
+            user_id = len(admin.data["users"]) + 1
+            user = User(id=user_id, email=email, password=hashed_password, role="student", person=instructor)
+            admin.append_record("users", user.get_details())
+
+            admin.save_data()
+            print(f"Instructor {name} added successfully!")
+            print(f"Credentials for {name}:")
+            print(f"Username: {email}")
+            print(f"Password: {temp_password} (Change it after logging in!)")
+
+        elif choice == "3":
+         
+            course_id = input("Enter course ID: ")
+            course_name = input("Enter course name: ")
+            course_description = input("Enter course description: ")
+            course = {"course_id": course_id, "name": course_name, "description": course_description}
+            admin.add_course(course)
+
+        elif choice == "4":
+            print("Listing all students:")
+            for student in admin.data["students"]:
+                print(f"- {student['name']} (ID: {student['student_id']})")
+
+        elif choice == "5":
+            print("Listing all instructors:")
+            for instructor in admin.data["instructors"]:
+                print(f"- {instructor['name']} (ID: {instructor['instructor_id']})")
+
+        elif choice == "6":
+            admin.list_courses()
+
+        elif choice == "7":
+            GradebookAnalytics(admin).print_report(admin)
+
+        elif choice == "8":
+            when = input("Enter date and time (YYYY-MM-DD HH:MM, blank for now): ").strip()
+            try:
+                when = datetime.strptime(when, "%Y-%m-%d %H:%M") if when else datetime.now()
+            except ValueError:
+                print("Invalid date and time.")
+                continue
+            courses, students, instructors, free_instructors, free_rooms = admin.in_class_at(when)
+            print(f"At {when:%A %Y-%m-%d %H:%M}:")
+            print(f"Courses in session: {', '.join(c['name'] for c in courses) or 'none'}")
+            print(f"Students in class: {len(students)}")
+            print(f"Instructors teaching: {', '.join(instructors) or 'none'}")
+            print(f"Free instructors: {', '.join(free_instructors) or 'none'}")
+            if admin.calendar().rooms:
+                print(f"Free rooms: {', '.join(free_rooms) or 'none'}")
+
+        elif choice == "9":
+            report = input(f"Report ({', '.join(EXPORT_REPORTS)}): ").strip()
+            if report not in EXPORT_REPORTS:
+                print("Unknown report.")
+                continue
+            path = input("Export to file (.csv or .jsonl): ").strip() or f"{report}.csv"
+            try:
+                ReportExporter(admin).export(report, path)
+            except OSError as e:
+                print(f"Could not write {path}: {e}")
+
+        elif choice == "10":
+            print("Logging out...")
+            break
+
+        else:
+            print("Invalid option. Please try again.")
+
+def main(admin=None):
+    admin = admin or PlatformAdmin()
+
+    while True:
+        METRICS.menu_action("main")
+        admin.refresh()  # Pick up what other sessions saved
+        print("\n--- Main Menu ---")
+        print("1. Sign Up")
+        print("2. Login")
+        print("3. Exit")
+        choice = input("Select an option: ")
+        METRICS.menu_action("main", choice)
+
+        if choice == "1":
+            name = input("Enter your name: ")
+            email = input("Enter your email: ")
+            phone = input("Enter phone number: ")
+            address = input("Enter address: ")
+            date_of_birth = input("Enter date of birth (YYYY-MM-DD): ")
+            password = input("Enter password: ")
+            role = input("Enter role (student/instructor/admin): ")
+            if role not in ["student", "instructor", "admin"]:
+                print("Invalid role. Please choose 'student', 'instructor', or 'admin'.")
+                continue
+            admin.sign_up(name, email, phone, address, date_of_birth, password, role)
+
+        elif choice == "2":
+            email = input("Enter email: ")
+            password = input("Enter password: ")
+            role = admin.login(email, password)
+            if role == "admin":
+                admin_menu(admin)
+            elif role == "instructor":
+                instructor_id = input("Enter your instructor ID: ")
+                instructor_menu(admin, instructor_id)
+            elif role == "student":
+                student_id = input("Enter your student ID: ")
+                student_menu(admin, student_id)
+            else:
+                print("Login failed.")
+
+        elif choice == "3":
+            print("Goodbye!")
+            break
+ 
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Online learning platform")
+    parser.add_argument("--data-file", default="data2.json", help="JSON data file")
+    parser.add_argument("--journal", action="store_true", help="append changes to a journal instead of rewriting the file")
+    parser.add_argument("--lazy", action="store_true", help="parse each data section only when it is first used")
+    parser.add_argument("--format", dest="snapshot_format", choices=SNAPSHOT_FORMATS, default="json",
+                        help="how snapshots are written (loads detect the format)")
+    parser.add_argument("--compression", choices=SNAPSHOT_COMPRESSIONS, default="none",
+                        help="compression for --format binary")
+    parser.add_argument("--convert", nargs=2, metavar=("SOURCE", "TARGET"),
+                        help="rewrite a data file in --format/--compression and exit")
+    parser.add_argument("--sqlite", metavar="DB_FILE", help="use a SQLite database instead of the JSON file")
+    parser.add_argument("--migrate", nargs=2, metavar=("JSON_FILE", "DB_FILE"), help="copy a JSON data file into SQLite and exit")
+    parser.add_argument("--import", dest="imports", nargs=2, action="append", metavar=("KIND", "FILE"),
+                        help=f"bulk import a CSV or JSON-Lines file and exit; KIND is one of {', '.join(IMPORT_KINDS)}")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="rows per write when importing; students or courses per worker job when exporting")
+    parser.add_argument("--export", nargs=2, action="append", metavar=("REPORT", "FILE"),
+                        help=f"export a report to a CSV or JSON-Lines file and exit; REPORT is one of "
+                             f"{', '.join(EXPORT_REPORTS)}")
+    parser.add_argument("--export-workers", type=int, default=1, help="processes used to export (0: one per CPU)")
+    parser.add_argument("--kdf", choices=PasswordHasher.KDFS, default="pbkdf2_sha256", help="password hashing function")
+    parser.add_argument("--kdf-cost", type=int, help="KDF iterations (pbkdf2) or n (scrypt)")
+    parser.add_argument("--hash-workers", type=int, help="processes used to hash imported passwords")
+    parser.add_argument("--script", metavar="FILE",
+                        help="run JSON-Lines operations from FILE ('-' for stdin) without the menus and exit")
+    parser.add_argument("--commit-every", type=int, metavar="N",
+                        help="with --script, commit after every N operations (default: once at the end)")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="serve the platform as an HTTP/JSON service on PORT")
+    parser.add_argument("--host", default="127.0.0.1", help="address for --serve to listen on")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="time operations and write metrics to FILE on exit (JSON for .json, else Prometheus text)")
+    parser.add_argument("--profile", metavar="FILE", help="profile the session with cProfile and write the stats to FILE")
+    parser.add_argument("--trace-memory", action="store_true", help="trace allocations and report the top sites on exit")
+    parser.add_argument("--generate", metavar="FILE",
+                        help="write a synthetic platform (sized by --students etc.) to FILE and exit")
+    parser.add_argument("--students", type=int, default=1000, help="students for --generate")
+    parser.add_argument("--instructors", type=int, help="instructors (default: one per 50 students)")
+    parser.add_argument("--courses", type=int, help="courses (default: one per 20 students)")
+    parser.add_argument("--enrollments", type=int, default=4, help="courses each student takes")
+    parser.add_argument("--assignments", type=int, default=5, help="assignments per course")
+    parser.add_argument("--graded", type=float, default=0.8, help="fraction of assignments graded per student")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for generated data")
+    args = parser.parse_args(argv)
+    try:
+        PasswordHasher(args.kdf, args.kdf_cost)
+    except ValueError as e:
+        parser.error(str(e))  # Now, rather than at the first password hashed
+    return args
+
+
+def admin_from_args(args):
+    hasher = PasswordHasher(args.kdf, args.kdf_cost)
+    if args.sqlite:
+        return PlatformAdmin(args.data_file, store=SqliteStore(args.sqlite), hasher=hasher)
+    return PlatformAdmin(args.data_file, journal=args.journal, lazy=args.lazy, hasher=hasher,
+                         snapshot_format=args.snapshot_format, compression=args.compression)
+
+
+def run_command(args):
+    """Run what the command line asked for: a tool, a server, or the menus."""
+    if args.migrate:
+        migrate_json_to_sqlite(*args.migrate)
+    elif args.convert:
+        convert_snapshot(*args.convert, args.snapshot_format, args.compression)
+    elif args.generate:
+        write_platform(args.generate, args.journal, args.lazy, args.snapshot_format, args.compression,
+                       students=args.students, instructors=args.instructors,
+                       courses=args.courses, enrollments=args.enrollments, assignments=args.assignments,
+                       graded=args.graded, seed=args.seed, hasher=PasswordHasher(args.kdf, args.kdf_cost))
+        print(f"Generated {args.students} students into {args.generate}.")
+    elif args.serve is not None:
+        try:
+            asyncio.run(PlatformService(admin_from_args(args)).serve(args.host, args.serve))
+        except KeyboardInterrupt:
+            print("Stopped.")
+    elif args.script:
+        with contextlib.redirect_stdout(sys.stderr):
+            admin = admin_from_args(args)
+        runner = ScriptRunner(admin, commit_every=args.commit_every, hash_workers=args.hash_workers)
+        if args.script == "-":
+            runner.run(sys.stdin)
+        else:
+            with open(args.script, "r") as f:
+                runner.run(f)
+    elif args.export:
+        exporter = ReportExporter(admin_from_args(args), args.export_workers or None, args.chunk_size)
+        for report, path in args.export:
+            exporter.export(report, path)
+    elif args.imports:
+        importer = BulkImporter(admin_from_args(args), chunk_size=args.chunk_size, hash_workers=args.hash_workers)
+        for kind, path in args.imports:
+            importer.import_file(kind, path)
+        for line_number, message in importer.errors[:20]:
+            print(f"  line {line_number}: {message}")
+    else:
+        main(admin_from_args(args))
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.metrics:
+        METRICS.enable()
+    try:
+        with METRICS.capture(args.profile, args.trace_memory):
+            run_command(args)
+    finally:
+        if args.metrics:
+            METRICS.dump(args.metrics)
@@ -0,0 +1,87 @@
+import importlib.util
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(ROOT, "case3 (5) (4).py")
+SAMPLE_DATA = os.path.join(ROOT, "data2 (6).json")
+
+
+def load_app():
+    """The platform script as module "case3" (its file name cannot be imported)."""
+    if "case3" in sys.modules:
+        return sys.modules["case3"]
+    spec = importlib.util.spec_from_file_location("case3", APP_FILE)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["case3"] = module  # Before running it, so process pools can pickle its functions
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def app():
+    return load_app()
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    """A copy of the sample data file."""
+    path = str(tmp_path / "data.json")
+    shutil.copy(SAMPLE_DATA, path)
+    return path
+
+
+@pytest.fixture
+def hasher(app):
+    """A cheap hasher, so accounts can be created and logged into quickly."""
+    return app.PasswordHasher(cost=1000)
+
+
+@pytest.fixture
+def open_session(app, data_file, tmp_path):
+    """Factory for sessions sharing one store of the given backend."""
+    db_file = str(tmp_path / "data.db")
+
+    def open_session(backend):
+        if backend == "sqlite":
+            return app.PlatformAdmin(store=app.SqliteStore(db_file))
+        return app.PlatformAdmin(data_file, journal=backend == "journal", lazy=backend == "lazy")
+
+    app.migrate_json_to_sqlite(data_file, db_file)
+    return open_session
+
+
+def dump(app, data):
+    """Canonical JSON of every data section, for comparing two loads."""
+    return json.dumps({section: data[section] for section in app.DATA_SECTIONS}, sort_keys=True,
+                      default=app.encode_record)
+
+
+def edit(admin):
+    """A few changes of each kind: appends, a nested append and field sets."""
+    student_id = admin.data["students"][0]["student_id"]
+    admin.append_record("students", {"name": "New", "phone": "09123456789", "address": "Street",
+                                     "date_of_birth": "2000-01-01", "student_id": "NEW1", "courses": [], "grades": []})
+    admin.enroll_student("NEW1", admin.data["courses"][0])
+    admin.record_assignment_grade(0, 0, student_id, "91")
+    admin.apply_change("set", admin.student_path(student_id) + ["phone"], "09999999999")
+    admin.save_data()
+
+
+def add_course(admin, course_id, name, description="", assignments=(), schedule=None):
+    course = {"course_id": course_id, "name": name, "description": description,
+              "assignments": [{"assignment_name": a, "description": "", "due_date": "2030-01-01", "grades": []}
+                              for a in assignments]}
+    if schedule:
+        course["schedule"] = schedule
+    admin.add_course(course)
+    return course
+
+
+def add_student(app, admin, student_id, name=None):
+    admin.append_record("students", app.Student(name or f"Student {student_id}", "09123456789", "Street",
+                                                "2000-01-01", student_id).get_details())
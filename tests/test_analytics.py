@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from conftest import add_course, add_student
+
+
+@pytest.fixture
+def admin(app, tmp_path):
+    admin = app.PlatformAdmin(str(tmp_path / "empty.json"))
+    add_course(admin, "C1", "Algebra", assignments=["Quiz", "Exam"])
+    add_course(admin, "C2", "Biology", assignments=["Lab"])
+    return admin
+
+
+def grade(admin, course_id, assignment_index, student_id, value):
+    admin.record_assignment_grade(admin.course_position(course_id), assignment_index, student_id, value)
+
+
+def test_stats_on_a_known_dataset(app, admin):
+    for n, value in enumerate(["50", "70", "80", "90", "100"]):
+        grade(admin, "C1", 0, f"s{n}", value)
+    quiz = app.GradebookAnalytics(admin, pass_mark=75, use_numpy=False).assignment_stats()[("C1", "Quiz")]
+    assert quiz["count"] == 5
+    assert quiz["mean"] == pytest.approx(78)
+    assert quiz["median"] == pytest.approx(80)
+    assert quiz["stdev"] == pytest.approx(370 ** 0.5)
+    assert (quiz["min"], quiz["max"]) == (50, 100)
+    assert quiz["percentiles"] == pytest.approx({0.25: 70, 0.75: 90, 0.90: 96})
+    assert quiz["histogram"] == [0, 0, 0, 0, 0, 1, 0, 1, 1, 1, 1]
+    assert quiz["pass_rate"] == pytest.approx(0.6)
+
+
+def test_course_totals_leave_out_student_course_grades(app, admin):
+    add_student(app, admin, "s1")
+    grade(admin, "C1", 0, "s1", "60")
+    grade(admin, "C1", 1, "s1", "80")
+    analytics = app.GradebookAnalytics(admin, use_numpy=False)
+    assert analytics.course_stats()["C1"]["count"] == 2
+    # The student's course grade (the last one recorded) is its own pseudo assignment
+    assert analytics.assignment_stats()[("C1", analytics.COURSE_GRADE)]["mean"] == 80
+
+
+def test_non_finite_and_non_numeric_grades_are_skipped(app, admin):
+    for n, value in enumerate(["90", "nan", "inf", "-inf", "1e999", "A+", "70"]):
+        grade(admin, "C2", 0, f"s{n}", value)
+    analytics = app.GradebookAnalytics(admin, use_numpy=False)
+    assert analytics.skipped == 5
+    lab = analytics.assignment_stats()[("C2", "Lab")]
+    assert (lab["count"], lab["mean"], lab["max"]) == (2, 80, 90)
+
+
+def test_grade_records_are_included(app, admin):
+    admin.add_grade("s1", "C2", "Lab", "64")
+    lab = app.GradebookAnalytics(admin, use_numpy=False).assignment_stats()[("C2", "Lab")]
+    assert (lab["count"], lab["mean"]) == (1, 64)
+
+
+def test_numpy_and_array_paths_agree(app, admin):
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    for n in range(200):
+        grade(admin, "C1", n % 2, f"s{n}", str(round(rng.uniform(0, 100), 2)))
+        if n % 3 == 0:
+            grade(admin, "C2", 0, f"s{n}", str(rng.randrange(101)))
+    grade(admin, "C2", 0, "s-bad", "inf")
+    plain = app.GradebookAnalytics(admin, use_numpy=False)
+    vectorized = app.GradebookAnalytics(admin, use_numpy=True)
+    assert vectorized.use_numpy and not plain.use_numpy
+    for expected, actual in [(plain.course_stats(), vectorized.course_stats()),
+                             (plain.assignment_stats(), vectorized.assignment_stats())]:
+        assert expected.keys() == actual.keys()
+        for key, stats in expected.items():
+            assert actual[key]["count"] == stats["count"]
+            assert actual[key]["histogram"] == stats["histogram"]
+            for name in ("mean", "median", "stdev", "min", "max", "pass_rate"):
+                assert actual[key][name] == pytest.approx(stats[name]), (key, name)
+            assert actual[key]["percentiles"] == pytest.approx(stats["percentiles"])
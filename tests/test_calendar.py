@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import add_course, add_student
+
+
+@pytest.fixture
+def admin(app, tmp_path):
+    admin = app.PlatformAdmin(str(tmp_path / "empty.json"))
+    spring = {"start_date": "2030-01-01", "end_date": "2030-06-30", "days": ["Monday", "Wednesday"]}
+    add_course(admin, "C1", "Algebra", schedule=dict(spring, class_time="9:00 AM - 10:30 AM", room="R1"))
+    add_course(admin, "C2", "Biology", schedule=dict(spring, class_time="10:00 AM - 11:00 AM", room="R2"))
+    add_course(admin, "C3", "Chemistry", schedule=dict(spring, class_time="10:30 AM - 12:00 PM", room="R1"))
+    add_course(admin, "C4", "Drawing", schedule={"start_date": "2030-09-01", "end_date": "2030-12-31",
+                                                 "days": ["Monday"], "class_time": "9:00 AM - 10:00 AM"})
+    add_student(app, admin, "s1")
+    admin.enroll_student("s1", admin.find_course_by_id("C1"))
+    return admin
+
+
+def test_schedule_conflicts_only_check_the_given_courses(admin):
+    biology = admin.find_course_by_id("C2")
+    assert [c["course_id"] for c in admin.schedule_conflicts(biology, ["C1"])] == ["C1"]
+    assert sorted(c["course_id"] for c in admin.schedule_conflicts(biology, ["C1", "C3", "C4"])) == ["C1", "C3"]
+    # C4 meets at the same time as C1 but in another term
+    assert admin.schedule_conflicts(admin.find_course_by_id("C4"), ["C1"]) == []
+    assert admin.schedule_conflicts(biology, []) == []
+
+
+def test_calendar_conflicts_with_and_without_course_ids(app, admin):
+    calendar = admin.calendar()
+    schedule = {"days": ["Wednesday"], "class_time": "10:45 AM", "start_date": "2030-02-01", "end_date": "2030-02-28"}
+    assert sorted(calendar.conflicts(schedule)) == ["C2", "C3"]
+    assert calendar.conflicts(schedule, {"C3"}) == ["C3"]
+    assert calendar.conflicts(schedule, {"C1", "C4"}) == []
+
+
+def test_in_class_at(admin):
+    courses, students, instructors, free_instructors, free_rooms = admin.in_class_at(datetime(2030, 3, 4, 9, 30))
+    assert [c["course_id"] for c in courses] == ["C1"]
+    assert students == ["s1"]
+    assert free_rooms == ["R2"]
+    assert admin.in_class_at(datetime(2030, 3, 5, 9, 30))[0] == []  # Tuesday
+
+
+def test_interval_list_finds_overlaps(app):
+    intervals = app.IntervalList()
+    intervals.add("2030-01-01", "2030-12-31", "year")
+    intervals.add("2030-02-01", "2030-02-28", "february")
+    intervals.add("2030-06-01", "2030-06-30", "june")
+    assert sorted(intervals.overlapping("2030-02-15", "2030-02-15")) == ["february", "year"]
+    assert sorted(intervals.overlapping("2030-05-01", "2030-06-01")) == ["june", "year"]
+    assert list(intervals.overlapping("2031-01-01", "2031-01-31")) == []
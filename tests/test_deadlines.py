@@ -0,0 +1,38 @@
+from datetime import date
+
+import pytest
+
+from conftest import add_course, add_student
+
+TODAY = date(2030, 3, 4)
+
+
+@pytest.fixture
+def admin(app, tmp_path):
+    admin = app.PlatformAdmin(str(tmp_path / "empty.json"))
+    add_course(admin, "C1", "Algebra")
+    add_course(admin, "C2", "Biology")
+    add_student(app, admin, "s1")
+    admin.enroll_student("s1", admin.find_course_by_id("C1"))
+    return admin
+
+
+def test_upcoming_deadlines_in_window_earliest_first(admin):
+    admin.add_assignment("A1", "Essay", "", "2030-03-10", "C1")
+    admin.add_assignment("A2", "Lab", "", "2030-03-05", "C2")
+    admin.add_assignment("A3", "Later", "", "2030-04-30", "C1")
+    admin.add_assignment("A4", "Past", "", "2030-03-01", "C1")
+    admin.add_assignment("A5", "Undated", "", "soon", "C1")
+    names = [entry["assignment_name"] for entry in admin.upcoming_deadlines(7, TODAY)]
+    assert names == ["Lab", "Essay"]
+    assert [e["assignment_name"] for e in admin.upcoming_deadlines(7, TODAY, course_id="C2")] == ["Lab"]
+    assert [e["assignment_name"] for e in admin.upcoming_deadlines(7, TODAY, student_id="s1")] == ["Essay"]
+    assert admin.deadlines().unparsed == 1
+
+
+def test_deadlines_added_after_the_index_is_built(admin):
+    assert admin.upcoming_deadlines(7, TODAY) == []
+    admin.add_assignment("A1", "Essay", "", "2030-03-10", "C1")
+    admin.add_course_assignment(admin.course_position("C2"), {
+        "assignment_name": "Quiz", "description": "", "due_date": "2030-03-06", "grades": []})
+    assert [e["assignment_name"] for e in admin.upcoming_deadlines(7, TODAY)] == ["Quiz", "Essay"]
@@ -0,0 +1,88 @@
+import inspect
+import json
+import os
+
+import pytest
+
+from conftest import add_course, add_student
+
+
+@pytest.fixture
+def admin(app, tmp_path):
+    admin = app.PlatformAdmin(str(tmp_path / "data.json"))
+    add_course(admin, "C1", "Algebra", assignments=["Quiz", "Exam"])
+    add_course(admin, "C2", "Biology", assignments=["Lab"])
+    add_course(admin, "C3", "Chemistry")
+    instructor = app.Instructor("Teacher", "09123456789", "Street", "1980-01-01", "I1").get_details()
+    admin.append_record("instructors", instructor)
+    with admin.lock.write():
+        admin.assign_teacher("I1", admin.find_course_by_id("C1"))
+    for n in range(5):
+        student_id = f"s{n}"
+        add_student(app, admin, student_id)
+        for course_id in ("C1", "C2", "C3")[:n % 3 + 1]:
+            admin.enroll_student(student_id, admin.find_course_by_id(course_id))
+        admin.record_assignment_grade(admin.course_position("C1"), n % 2, student_id, str(60 + n))
+    admin.record_assignment_grade(admin.course_position("C2"), 0, "s1", "75")
+    admin.save_data()
+    return admin
+
+
+def grade(admin, course_id, assignment_index, student_id, value):
+    admin.record_assignment_grade(admin.course_position(course_id), assignment_index, student_id, value)
+
+
+@pytest.mark.parametrize("report", ["transcripts", "rosters", "gradebooks"])
+@pytest.mark.parametrize("extension", ["csv", "jsonl"])
+def test_process_pool_output_matches_serial(app, admin, tmp_path, report, extension):
+    serial, parallel = str(tmp_path / f"serial.{extension}"), str(tmp_path / f"parallel.{extension}")
+    grade(admin, "C2", 0, "s4", "99")  # Unsaved: the workers only see it if it is saved first
+    rows = app.ReportExporter(admin).export(report, serial)
+    assert rows > 0
+    assert app.ReportExporter(admin, workers=2, chunk_size=2).export(report, parallel) == rows
+    with open(serial) as f, open(parallel) as g:
+        output = f.read()
+        assert g.read() == output
+    assert not [name for name in os.listdir(tmp_path) if ".part" in name]
+    assert len(output.splitlines()) == rows + (extension == "csv")
+    assert ("99" in output) == (report != "rosters")
+
+
+def test_transcripts_are_streamed_per_student(app, admin):
+    exporter = app.ReportExporter(admin)
+    rows = exporter.transcripts()
+    assert inspect.isgenerator(rows)
+    assert next(rows)["student_id"] == "s0"
+    grade(admin, "C1", 0, "s1", "88")
+    assert list(exporter.transcripts(1, 2)) == [
+        {"student_id": "s1", "student_name": "Student s1", "course_id": "C1", "course_name": "Algebra",
+         "assignment": "Quiz", "grade": "88"},
+        {"student_id": "s1", "student_name": "Student s1", "course_id": "C1", "course_name": "Algebra",
+         "assignment": "Exam", "grade": "61"},
+        {"student_id": "s1", "student_name": "Student s1", "course_id": "C1", "course_name": "Algebra",
+         "assignment": app.GradebookAnalytics.COURSE_GRADE, "grade": "88"},
+        {"student_id": "s1", "student_name": "Student s1", "course_id": "C2", "course_name": "Biology",
+         "assignment": "Lab", "grade": "75"},
+        {"student_id": "s1", "student_name": "Student s1", "course_id": "C2", "course_name": "Biology",
+         "assignment": app.GradebookAnalytics.COURSE_GRADE, "grade": "75"},
+    ]
+
+
+def test_transcripts_keep_grades_of_dropped_courses(app, admin):
+    admin.apply_change("set", admin.student_path("s1") + ["courses"], ["C2"])
+    rows = list(app.ReportExporter(admin).transcripts(1, 2))
+    assert [(row["course_id"], row["assignment"]) for row in rows] == [
+        ("C2", "Lab"), ("C2", app.GradebookAnalytics.COURSE_GRADE), ("C1", app.GradebookAnalytics.COURSE_GRADE)]
+
+
+def test_jsonl_rows_and_unknown_reports(app, admin, tmp_path):
+    path = str(tmp_path / "rosters.jsonl")
+    app.ReportExporter(admin).export("rosters", path)
+    with open(path) as f:
+        rows = [json.loads(line) for line in f]
+    assert rows[:2] == [
+        {"course_id": "C1", "course_name": "Algebra", "role": "instructor", "person_id": "I1", "name": "Teacher"},
+        {"course_id": "C1", "course_name": "Algebra", "role": "student", "person_id": "s0", "name": "Student s0"},
+    ]
+    with pytest.raises(ValueError):
+        app.ReportExporter(admin).export("payroll", path)
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+
+def student_row(student_id, email, **fields):
+    return dict({"name": f"Student {student_id}", "email": email, "phone": "09123456789",
+                 "student_id": student_id}, **fields)
+
+
+@pytest.fixture
+def admin(app, data_file, hasher):
+    return app.PlatformAdmin(data_file, hasher=hasher)
+
+
+def test_bad_json_lines_are_reported_and_the_rest_imported(app, admin, tmp_path):
+    path = tmp_path / "students.jsonl"
+    path.write_text("\n".join([
+        json.dumps(student_row("N1", "n1@example.com")),
+        '{"name": "truncated',
+        "[1, 2]",
+        "42",
+        json.dumps(student_row("N2", "n2@example.com")),
+        json.dumps(student_row("N3", "n3@example.com", password="secret")),
+        json.dumps({"email": "nameless@example.com"}),
+        json.dumps(student_row("N4", "n1@example.com")),
+    ]) + "\n")
+    importer = app.BulkImporter(admin, chunk_size=2, hash_workers=1).import_file("students", str(path))
+
+    assert importer.imported == 3
+    assert [student["student_id"] for student in admin.data["students"][-3:]] == ["N1", "N2", "N3"]
+    lines = [line for line, _ in importer.errors]
+    assert lines == [2, 3, 4, 7, 8]
+    messages = dict(importer.errors)
+    assert messages[2].startswith("Invalid JSON")
+    assert messages[3] == "Expected a JSON object, got list"
+    assert messages[4] == "Expected a JSON object, got int"
+    assert messages[7] == "Missing field: 'name'"
+    assert messages[8] == "Email already registered: n1@example.com"
+    # Saved, and the accounts can log in
+    reloaded = app.PlatformAdmin(admin.data_file, hasher=admin.hasher)
+    assert reloaded.find_student("N3") is not None
+    assert reloaded.login("n3@example.com", "secret") == "student"
+
+
+def test_bad_grade_rows_are_reported(app, admin, tmp_path):
+    student_id = admin.data["students"][0]["student_id"]
+    path = tmp_path / "grades.csv"
+    path.write_text(
+        "student_id,course_name,assignment_name,grade\n"
+        f"{student_id},OOP,OOP,88\n"
+        f"{student_id},OOP,OOP,250\n"
+        "nobody,OOP,OOP,70\n"
+        f"{student_id},OOP,Missing,70\n"
+        f"{student_id},Nope,OOP,70\n"
+        f"{student_id},OOP,OOP,abc\n"
+    )
+    importer = app.BulkImporter(admin).import_file("grades", str(path))
+
+    assert importer.imported == 1
+    assert dict(importer.errors) == {
+        3: "Grade out of range: 250",
+        4: "Student not found: nobody",
+        5: "Assignment Missing not found in course OOP",
+        6: "Course not found: Nope",
+        7: "could not convert string to float: 'abc'",
+    }
+    grades = admin.find_course("OOP")["assignments"][0]["grades"]
+    assert {"student_id": student_id, "grade": "88"} in grades
+
+
+def test_unknown_kind_is_rejected(app, admin, tmp_path):
+    with pytest.raises(ValueError, match="Unknown import kind"):
+        app.BulkImporter(admin).import_file("teachers", str(tmp_path / "x.csv"))
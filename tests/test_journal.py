@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+from conftest import dump, edit
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_json_round_trip(app, data_file, journal):
+    admin = app.PlatformAdmin(data_file, journal=journal)
+    edit(admin)
+    reloaded = app.PlatformAdmin(data_file, journal=journal)
+    assert dump(app, reloaded.data) == dump(app, admin.data)
+    assert reloaded.find_student("NEW1")["courses"] == [admin.data["courses"][0]["course_id"]]
+
+
+def test_journal_is_replayed_then_compacted(app, data_file):
+    admin = app.PlatformAdmin(data_file, journal=True)
+    edit(admin)
+    assert os.path.getsize(data_file + ".journal") > 0
+    admin.compact()
+    assert os.path.getsize(data_file + ".journal") == 0
+    assert dump(app, app.PlatformAdmin(data_file, journal=True).data) == dump(app, admin.data)
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from conftest import add_course, add_student
+
+
+def test_leaderboard_orders_best_first_with_shared_ranks(app):
+    board = app.Leaderboard()
+    for student_id, score in [("b", 90), ("a", 90), ("c", 75), ("d", 60)]:
+        board.set(student_id, score)
+    assert board.top(3) == [(1, "a", 90), (1, "b", 90), (3, "c", 75)]
+    assert board.bottom(2) == [(4, "d", 60), (3, "c", 75)]
+    assert board.rank("c") == (3, 75)
+    assert board.rank("nobody") is None
+
+
+def test_leaderboard_moves_a_regraded_student(app):
+    board = app.Leaderboard()
+    board.set("a", 50)
+    board.set("b", 70)
+    board.set("a", 95)
+    assert len(board) == 2
+    assert board.top() == [(1, "a", 95), (2, "b", 70)]
+    board.remove("a")
+    assert board.top() == [(1, "b", 70)]
+
+
+def test_leaderboard_matches_a_sorted_list_across_blocks(app):
+    board = app.Leaderboard()
+    board.BLOCK_SIZE = 4  # Small blocks, so they split and empty often
+    rng = random.Random(3)
+    scores = {}
+    for _ in range(2000):
+        student_id = f"s{rng.randrange(150)}"
+        if rng.random() < 0.25:
+            board.remove(student_id)
+            scores.pop(student_id, None)
+        else:
+            scores[student_id] = rng.randrange(40) + rng.choice([0, 0.5, 0.25])
+            board.set(student_id, scores[student_id])
+    ordered = sorted((-score, student_id) for student_id, score in scores.items())
+    assert len(board) == len(scores)
+    assert all(len(block) <= 2 * board.BLOCK_SIZE for block in board.blocks)
+    assert [student_id for _, student_id, _ in board.top(len(scores))] == [s for _, s in ordered]
+    assert [student_id for _, student_id, _ in board.bottom(25)] == [s for _, s in reversed(ordered)][:25]
+    for student_id, score in scores.items():
+        assert board.rank(student_id) == (sum(other > score for other in scores.values()) + 1, score)
+
+
+@pytest.fixture
+def admin(app, tmp_path):
+    admin = app.PlatformAdmin(str(tmp_path / "empty.json"))
+    add_course(admin, "C1", "Algebra", assignments=["Quiz", "Exam"])
+    for student_id in ("s1", "s2", "s3"):
+        add_student(app, admin, student_id)
+    return admin
+
+
+def grade(admin, assignment_index, student_id, value):
+    admin.record_assignment_grade(admin.course_position("C1"), assignment_index, student_id, value)
+
+
+def test_course_and_assignment_boards_follow_grading(app, admin):
+    admin.leaderboards()  # Built now, so grading below updates it in place
+    grade(admin, 0, "s1", "70")
+    grade(admin, 0, "s2", "90")
+    grade(admin, 1, "s1", "100")
+    grade(admin, 1, "s3", "80")
+    assert admin.leaderboard("C1", "Quiz").top() == [(1, "s2", 90.0), (2, "s1", 70.0)]
+    # Course boards rank the average of each student's assignment grades
+    assert admin.leaderboard("C1").top() == [(1, "s2", 90.0), (2, "s1", 85.0), (3, "s3", 80.0)]
+
+    grade(admin, 0, "s1", "100")  # A regrade moves s1 up
+    assert admin.leaderboard("C1").rank("s1") == (1, 100.0)
+
+
+def test_incremental_boards_match_a_rebuild(app, admin):
+    admin.leaderboards()
+    for assignment_index, student_id, value in [(0, "s1", "72.5"), (0, "s2", "88.1"), (1, "s1", "91.3"),
+                                                (1, "s3", "64.7"), (0, "s3", "79.9"), (0, "s1", "95.35"),
+                                                (1, "s2", "n/a"), (1, "s2", "70.15")]:
+        grade(admin, assignment_index, student_id, value)
+    boards = [("C1", None), ("C1", "Quiz"), ("C1", "Exam")]
+    incremental = [admin.leaderboard(*board).top() for board in boards]
+    admin._leaderboards = None
+    for board, expected in zip(boards, incremental):
+        rebuilt = admin.leaderboard(*board).top()
+        assert [(rank, student_id) for rank, student_id, _ in rebuilt] == [(rank, student_id) for rank, student_id, _ in expected]
+        assert [score for _, _, score in rebuilt] == pytest.approx([score for _, _, score in expected])
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from conftest import add_course, add_student
+
+
+class Clock:
+    def tick(self):
+        return "tock"
+
+    def fail(self):
+        raise ValueError("stopped")
+
+
+@pytest.fixture
+def metrics(app):
+    metrics = app.Metrics()
+    metrics.enable(methods=())  # Recording, with nothing wrapped
+    metrics.count("platform_saves_total", kind="journal")
+    metrics.count("platform_saves_total", 2, kind="journal")
+    metrics.count("platform_lookups_total", index='say "hi"\n')
+    metrics.gauge("platform_traced_memory_bytes", 1024)
+    metrics.observe("platform_operation_seconds", 0.003, op="save")
+    metrics.observe("platform_operation_seconds", 20.0, op="save")
+    return metrics
+
+
+def test_prometheus_output(metrics, tmp_path):
+    lines = metrics.to_prometheus().splitlines()
+    assert lines[:6] == [
+        "# TYPE platform_lookups_total counter",
+        'platform_lookups_total{index="say \\"hi\\"\\n"} 1',
+        "# TYPE platform_saves_total counter",
+        'platform_saves_total{kind="journal"} 3',
+        "# TYPE platform_traced_memory_bytes gauge",
+        "platform_traced_memory_bytes 1024",
+    ]
+    assert lines[6] == "# TYPE platform_operation_seconds histogram"
+    buckets = dict(line.rsplit(" ", 1) for line in lines[7:-2])
+    assert buckets['platform_operation_seconds_bucket{op="save",le="0.0025"}'] == "0"
+    assert buckets['platform_operation_seconds_bucket{op="save",le="0.005"}'] == "1"
+    assert buckets['platform_operation_seconds_bucket{op="save",le="10.0"}'] == "1"
+    assert buckets['platform_operation_seconds_bucket{op="save",le="+Inf"}'] == "2"
+    assert lines[-2:] == ['platform_operation_seconds_sum{op="save"} 20.003',
+                          'platform_operation_seconds_count{op="save"} 2']
+
+    metrics.dump(str(tmp_path / "metrics.prom"))
+    assert (tmp_path / "metrics.prom").read_text() == metrics.to_prometheus()
+
+
+def test_json_output(metrics, tmp_path):
+    metrics.dump(str(tmp_path / "metrics.json"))
+    dumped = json.loads((tmp_path / "metrics.json").read_text())
+    assert dumped["counters"][1] == {"name": "platform_saves_total", "labels": {"kind": "journal"}, "value": 3}
+    assert dumped["gauges"] == [{"name": "platform_traced_memory_bytes", "labels": {}, "value": 1024}]
+    [histogram] = dumped["histograms"]
+    assert (histogram["count"], histogram["sum"]) == (2, pytest.approx(20.003))
+    assert (histogram["buckets"]["0.0025"], histogram["buckets"]["0.005"], histogram["buckets"]["+Inf"]) == (0, 1, 2)
+    assert json.loads(json.dumps(metrics.to_dict())) == dumped
+
+
+def test_disabled_metrics_record_nothing_and_wrap_nothing(app):
+    metrics = app.Metrics()
+    tick = Clock.__dict__["tick"]
+    metrics.count("platform_saves_total")
+    metrics.gauge("platform_traced_memory_bytes", 1)
+    metrics.observe("platform_operation_seconds", 0.1)
+    metrics.menu_action("main", "1")
+    assert (metrics.counters, metrics.gauges, metrics.histograms) == ({}, {}, {})
+
+    metrics.enable(methods=[(Clock, ("tick", "fail"))])
+    assert Clock().tick() == "tock"
+    with pytest.raises(ValueError):
+        Clock().fail()
+    metrics.disable()
+    assert Clock.__dict__["tick"] is tick
+    assert Clock().tick() == "tock"
+    assert metrics.counters == {("platform_operation_errors_total", (("op", "Clock.fail"),)): 1}
+    assert [key for key in metrics.histograms] == [("platform_operation_seconds", (("op", "Clock.tick"),)),
+                                                   ("platform_operation_seconds", (("op", "Clock.fail"),))]
+    assert metrics.histograms[("platform_operation_seconds", (("op", "Clock.tick"),))][:-1].count(1) == 1
+
+
+def test_platform_operations_are_timed_only_while_enabled(app, tmp_path):
+    metrics = app.METRICS
+    enroll_student = app.PlatformAdmin.__dict__["enroll_student"]
+    admin = app.PlatformAdmin(str(tmp_path / "empty.json"))
+    add_course(admin, "C1", "Algebra")
+    add_student(app, admin, "s1")
+    metrics.enable()
+    try:
+        assert app.PlatformAdmin.__dict__["enroll_student"] is not enroll_student
+        admin.enroll_student("s1", admin.find_course_by_id("C1"))
+        admin.student_timetable("s1")
+        admin.student_timetable("s1")
+        dumped = metrics.to_dict()
+    finally:
+        metrics.disable()
+        metrics.reset()
+    assert app.PlatformAdmin.__dict__["enroll_student"] is enroll_student
+    timed = {h["labels"]["op"]: h["count"] for h in dumped["histograms"] if h["name"] == "platform_operation_seconds"}
+    assert timed["PlatformAdmin.enroll_student"] == 1
+    assert timed["PlatformAdmin.student_timetable"] == 2
+    cache = {c["labels"]["result"]: c["value"] for c in dumped["counters"]
+             if c["name"] == "platform_timetable_cache_total"}
+    assert cache == {"hit": 1, "miss": 1}
+
+    admin.student_timetable("s1")
+    assert metrics.to_dict() == {"counters": [], "gauges": [], "histograms": []}
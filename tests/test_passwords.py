@@ -0,0 +1,38 @@
+import pytest
+
+
+@pytest.mark.parametrize("kdf,cost", [
+    ("scrypt", 1), ("scrypt", 1000), ("scrypt", 2 ** 30), ("pbkdf2_sha256", 0), ("pbkdf2_sha256", "5"),
+])
+def test_bad_costs_are_rejected_up_front(app, kdf, cost):
+    with pytest.raises(ValueError):
+        app.PasswordHasher(kdf, cost)
+
+
+def test_unknown_kdf_is_rejected(app):
+    with pytest.raises(ValueError, match="Unknown KDF"):
+        app.PasswordHasher("md5")
+
+
+@pytest.mark.parametrize("kdf,cost", [("pbkdf2_sha256", 1000), ("scrypt", 2 ** 4), ("scrypt", 2 ** 16)])
+def test_hash_and_verify(app, kdf, cost):
+    hasher = app.PasswordHasher(kdf, cost)
+    stored = hasher.hash("secret")
+    assert hasher.verify("secret", stored)
+    assert not hasher.verify("wrong", stored)
+    assert not hasher.needs_rehash(stored)
+
+
+@pytest.mark.parametrize("stored", ["a$b", "scrypt$x$00$00", "scrypt$3$00$00", "md5$1$00$00",
+                                    "pbkdf2_sha256$10$zz$00", None])
+def test_malformed_hashes_do_not_verify(app, stored):
+    hasher = app.PasswordHasher(cost=1000)
+    assert hasher.verify("secret", stored) is False
+    assert hasher.needs_rehash(stored)
+
+
+def test_small_batches_are_hashed_in_process(app):
+    hasher = app.PasswordHasher(cost=1000)
+    assert not hasher.parallel(hasher.PARALLEL_MIN_BATCH - 1, workers=4)
+    assert not hasher.parallel(1000, workers=1)
+    assert len(hasher.hash_many(["a", "b", "c"], workers=4)) == 3
@@ -0,0 +1,96 @@
+import io
+import json
+
+import pytest
+
+from conftest import add_course
+
+
+@pytest.fixture
+def admin(app, tmp_path, hasher):
+    admin = app.PlatformAdmin(str(tmp_path / "empty.json"), hasher=hasher)
+    add_course(admin, "C1", "Algebra", assignments=["Quiz"])
+    add_course(admin, "C2", "Biology")
+    instructor = app.Instructor("Teacher", "09123456789", "Street", "1980-01-01", "I1").get_details()
+    instructor["courses_taught"] = ["C1"]
+    admin.append_record("instructors", instructor)
+    admin.save_data()
+    return admin
+
+
+def run(app, admin, ops, **options):
+    out = io.StringIO()
+    summary = app.ScriptRunner(admin, out=out, hash_workers=1, **options).run(
+        op if isinstance(op, str) else json.dumps(op) for op in ops)
+    return summary, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def sign_up(student_id):
+    return {"op": "sign_up", "name": f"Student {student_id}", "email": f"{student_id.lower()}@example.com",
+            "phone": "09123456789", "student_id": student_id}
+
+
+def test_operations_are_applied_and_saved(app, admin, capsys):
+    summary, results = run(app, admin, [
+        sign_up("S1"),
+        {"op": "enroll", "student_id": "S1", "course_id": "C1"},
+        {"op": "create_assignment", "course_id": "C1", "instructor_id": "I1", "assignment_name": "Exam"},
+        {"op": "assign_grade", "course_id": "C1", "instructor_id": "I1", "assignment_name": "Exam",
+         "student_id": "S1", "grade": 88},
+        {"op": "list_students"},
+    ])
+
+    assert [(r["line"], r["op"], r["ok"]) for r in results[:-1]] == [
+        (1, "sign_up", True), (2, "enroll", True), (3, "create_assignment", True), (4, "assign_grade", True),
+        (5, "list_students", True)]
+    assert results[3]["result"] == {"student_id": "S1", "grade": 88}
+    assert [student["student_id"] for student in results[4]["result"]] == ["S1"]
+    assert results[-1] == {"summary": summary}
+    assert (summary["ops"], summary["ok"], summary["failed"], summary["commits"]) == (5, 5, 0, 1)
+    assert capsys.readouterr().out == ""  # Platform messages go to stderr
+
+    reloaded = app.PlatformAdmin(admin.data_file, hasher=admin.hasher)
+    assert reloaded.find_student("S1")["courses"] == ["C1"]
+    exam = reloaded.find_course_by_id("C1")["assignments"][1]
+    assert (exam["assignment_name"], exam["grades"]) == ("Exam", [{"student_id": "S1", "grade": "88"}])
+    assert reloaded.login("s1@example.com", "password123") == "student"
+
+
+def test_bad_operations_are_reported_and_the_rest_applied(app, admin):
+    summary, results = run(app, admin, [
+        sign_up("S1"),
+        '{"op": "enroll", "student_id"',
+        "",
+        {"op": "drop_table"},
+        {"op": "enroll", "course_id": "C1"},
+        {"op": "enroll", "student_id": "S1", "course_id": "C9"},
+        {"op": "create_assignment", "course_id": "C2", "instructor_id": "I1", "assignment_name": "Lab"},
+        {"op": "create_assignment", "course_id": "C1", "assignment_name": "Quiz"},
+        {"op": "assign_grade", "course_id": "C1", "assignment_name": "Quiz", "student_id": "S1", "grade": 250},
+        sign_up("S1"),
+        {"op": "enroll", "student_id": "S1", "course_id": "C2"},
+    ])
+
+    errors = {r["line"]: r["error"] for r in results[:-1] if not r["ok"]}
+    assert errors[2].startswith("Invalid JSON")
+    assert errors[4] == "Unknown operation: drop_table"
+    assert errors[5] == "Missing field: 'student_id'"
+    assert errors[6] == "Course not found: C9"
+    assert errors[7] == "Instructor I1 does not teach Biology"
+    assert errors[8] == "Assignment Quiz already exists in Algebra"
+    assert errors[9] == "Grade out of range: 250"
+    assert errors[10] == "Email already registered: s1@example.com"
+    assert 3 not in errors  # Blank lines are skipped, not counted
+    assert (summary["ops"], summary["ok"], summary["failed"]) == (10, 2, 8)
+    assert admin.find_student("S1")["courses"] == ["C2"]
+
+
+def test_commit_every_saves_batches_that_changed_something(app, admin):
+    summary, _ = run(app, admin, [sign_up("S1"), sign_up("S2"), {"op": "list_students"}, {"op": "list_courses"},
+                                  {"op": "enroll", "student_id": "S2", "course_id": "C1"}], commit_every=2)
+    assert summary["commits"] == 2  # The read-only second batch is not written back
+    reloaded = app.PlatformAdmin(admin.data_file, hasher=admin.hasher)
+    assert reloaded.find_student("S2")["courses"] == ["C1"]
+
+    summary, _ = run(app, admin, [{"op": "list_courses"}, {"op": "list_schedules"}], commit_every=1)
+    assert (summary["ok"], summary["commits"]) == (2, 0)
@@ -0,0 +1,63 @@
+import pytest
+
+from conftest import add_course
+
+
+@pytest.fixture
+def admin(app, tmp_path):
+    admin = app.PlatformAdmin(str(tmp_path / "empty.json"))
+    add_course(admin, "C1", "Databases", "Storing records on disk", ["Normal forms"])
+    add_course(admin, "C2", "Distributed Systems", "Consensus and replicated databases")
+    add_course(admin, "C3", "Data Science", "Statistics with Python", ["Databases project"])
+    add_course(admin, "C4", "Pottery", "Wheel throwing")
+    return admin
+
+
+def ids(results):
+    return [course["course_id"] for course, _ in results]
+
+
+def test_name_matches_rank_above_assignments_and_descriptions(admin):
+    # C1 names it, C3 has an assignment about it, C2 only mentions it
+    assert ids(admin.search_courses("databases")) == ["C1", "C3", "C2"]
+
+
+def test_last_word_is_completed_as_a_prefix(admin):
+    assert ids(admin.search_courses("pot")) == ["C4"]
+    assert set(ids(admin.search_courses("dat"))) == {"C1", "C2", "C3"}
+    assert ids(admin.search_courses("data sci")) == ["C3"]
+
+
+def test_every_word_must_match(admin):
+    assert ids(admin.search_courses("databases consensus")) == ["C2"]
+    assert admin.search_courses("databases pottery") == []
+    assert admin.search_courses("") == []
+
+
+def test_limit_and_scores(admin):
+    results = admin.search_courses("databases", limit=2)
+    assert ids(results) == ["C1", "C3"]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_new_courses_and_assignments_are_searchable(app, admin):
+    admin.course_search()  # Built now, so the additions below update it in place
+    add_course(admin, "C5", "Quantum Basketry", "Weaving qubits")
+    admin.add_course_assignment(admin.course_position("C4"), {
+        "assignment_name": "Quantum glaze", "description": "", "due_date": "2030-01-01", "grades": []})
+    assert ids(admin.search_courses("quant")) == ["C5", "C4"]
+    incremental = admin.course_search().search("qu", 20)
+    admin._course_search = None
+    assert admin.course_search().search("qu", 20) == incremental
+
+
+def test_prefixes_find_rarely_used_words(app, tmp_path):
+    admin = app.PlatformAdmin(str(tmp_path / "empty.json"))
+    # 60 words starting with "in" used by two courses each, and one used by a single course
+    for n in range(60):
+        add_course(admin, f"P{n}a", f"In{n:02d}x")
+        add_course(admin, f"P{n}b", f"In{n:02d}x")
+    add_course(admin, "RARE", "Inzzz")
+    assert "RARE" in ids(admin.search_courses("in", limit=200))
+    assert ids(admin.search_courses("inz")) == ["RARE"]
+    assert len(admin.search_courses("in", limit=200)) == 121
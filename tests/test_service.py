@@ -0,0 +1,146 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def service(app, data_file, hasher):
+    admin = app.PlatformAdmin(data_file, hasher=hasher)
+    for user in admin.data["users"]:
+        user["password"] = hasher.hash("pw")
+    return app.PlatformService(admin)
+
+
+def run(service, requests):
+    """Run requests(call) against service, with its writer task going."""
+    async def main():
+        service.queue = asyncio.Queue()
+        service.writer = asyncio.create_task(service._write_loop())
+        try:
+            async def call(method, target, body=None, token=None):
+                headers = {"authorization": f"Bearer {token}"} if token else {}
+                return await service.dispatch(method, target, json.dumps(body or {}).encode(), headers)
+            return await requests(call)
+        finally:
+            service.writer.cancel()
+    return asyncio.run(main())
+
+
+async def login(call, email):
+    status, payload = await call("POST", "/login", {"email": email, "password": "pw"})
+    assert status == 200
+    return payload["token"]
+
+
+GRADE = {"student_id": "1106", "course_id": "CS06", "assignment_name": "OOP", "grade": 90}
+
+
+def test_writes_need_a_session(service):
+    async def requests(call):
+        assert (await call("POST", "/login", {"email": "josh@gmail.com", "password": "no"}))[0] == 401
+        assert (await call("POST", "/grades", GRADE))[0] == 401
+        assert (await call("POST", "/grades", GRADE, token="made-up"))[0] == 401
+        assert (await call("POST", "/enroll", {"course_id": "CS05"}))[0] == 401
+        assert (await call("GET", "/courses"))[0] == 401
+        assert (await call("GET", "/students/1106"))[0] == 401
+    run(service, requests)
+
+
+def test_only_the_course_instructor_grades(service):
+    async def requests(call):
+        student = await login(call, "gem@gmail.com")
+        admin = await login(call, "man@gmail.com")
+        teacher = await login(call, "josh@gmail.com")
+        assert (await call("POST", "/grades", GRADE, student))[0] == 403
+        assert (await call("POST", "/grades", GRADE, admin))[0] == 403
+        # The instructor comes from the session, not the request
+        other_course = dict(GRADE, course_id="Stat01", instructor_id="0207")
+        status, payload = await call("POST", "/grades", other_course, teacher)
+        assert status == 400 and "does not teach" in payload["error"]
+        assert await call("POST", "/grades", GRADE, teacher) == (200, {"student_id": "1106", "grade": 90})
+    run(service, requests)
+
+
+def test_students_enroll_only_themselves(service):
+    async def requests(call):
+        student = await login(call, "gem@gmail.com")
+        admin = await login(call, "man@gmail.com")
+        assert await call("POST", "/enroll", {"course_id": "CS05"}, student) == \
+            (200, {"student_id": "1106", "course_id": "CS05"})
+        assert (await call("POST", "/enroll", {"course_id": "CS05", "student_id": "0108"}, student))[0] == 403
+        assert (await call("POST", "/enroll", {"course_id": "CS05", "student_id": "0108"}, admin))[0] == 200
+        assert (await call("POST", "/logout", {}, student))[0] == 200
+        assert (await call("POST", "/enroll", {"course_id": "CS07"}, student))[0] == 401
+    run(service, requests)
+
+
+def test_students_read_only_the_catalog_and_their_own_records(service):
+    async def requests(call):
+        student = await login(call, "gem@gmail.com")
+        assert (await call("GET", "/students/1106", token=student))[0] == 200
+        assert (await call("GET", "/students/1106/timetable", token=student))[0] == 200
+        assert (await call("GET", "/students/1106/deadlines", token=student))[0] == 200
+        for target in ("/students/0108", "/students/0108/timetable", "/students", "/grades", "/instructors",
+                       "/in-class", "/metrics"):
+            assert (await call("GET", target, token=student))[0] == 403, target
+        status, courses = await call("GET", "/courses", token=student)
+        assert status == 200 and courses
+        assert all("grades" not in a for course in courses for a in course["assignments"])
+        status, found = await call("GET", "/courses/search?q=oop", token=student)
+        assert status == 200 and found and all("grades" not in a for a in found[0]["assignments"])
+
+        teacher = await login(call, "josh@gmail.com")
+        for target in ("/students", "/students/0108", "/grades", "/in-class"):
+            assert (await call("GET", target, token=teacher))[0] == 200, target
+        status, courses = await call("GET", "/courses", token=teacher)
+        assert any("grades" in a for course in courses for a in course["assignments"])
+    run(service, requests)
+
+
+def test_expired_sessions_are_dropped_on_login(service):
+    async def requests(call):
+        old = await login(call, "gem@gmail.com")
+        service.sessions[old]["expires"] = 0
+        await login(call, "josh@gmail.com")
+        assert old not in service.sessions and len(service.sessions) == 1
+    run(service, requests)
+
+
+def test_batches_are_saved_off_the_event_loop(app, service, capsys):
+    admin = service.admin
+    save_data = admin.save_data
+    threads = []
+
+    def recording_save_data(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return save_data(*args, **kwargs)
+
+    admin.save_data = recording_save_data
+
+    async def requests(call):
+        teacher = await login(call, "josh@gmail.com")
+        assert (await call("POST", "/grades", dict(GRADE, grade=67), teacher))[0] == 200
+    capsys.readouterr()
+    run(service, requests)
+    assert threads and threading.get_ident() not in threads  # The loop runs on this thread
+    assert capsys.readouterr().out == ""
+    oop = next(a for a in app.PlatformAdmin(admin.data_file).find_course_by_id("CS06")["assignments"]
+               if a["assignment_name"] == "OOP")
+    assert {"student_id": "1106", "grade": "67"} in oop["grades"]
+
+
+def test_a_failed_save_keeps_nothing(service, monkeypatch):
+    admin = service.admin
+
+    def failing_write(*args):
+        raise OSError("disk full")
+
+    async def requests(call):
+        teacher = await login(call, "josh@gmail.com")
+        monkeypatch.setattr(admin.store, "write_snapshot", failing_write)
+        with pytest.raises(OSError):
+            await call("POST", "/assignments", {"course_id": "CS06", "assignment_name": "Lost"}, teacher)
+    run(service, requests)
+    assert "Lost" not in [a["assignment_name"] for a in admin.find_course_by_id("CS06")["assignments"]]
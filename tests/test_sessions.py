@@ -0,0 +1,41 @@
+import pytest
+
+from conftest import add_student, dump
+
+BACKENDS = ["json", "journal", "lazy", "sqlite"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_concurrent_appends_are_merged(app, open_session, backend):
+    a, b = open_session(backend), open_session(backend)
+    add_student(app, a, "X1")
+    a.enroll_student("X1", a.find_course("OOP"))
+    a.save_data()
+    # b has not seen X1: its save merges instead of overwriting it
+    add_student(app, b, "Y1")
+    b.enroll_student("Y1", b.find_course("DBMS"))
+    b.apply_change("set", b.student_path("Y1") + ["phone"], "09999999999")
+    b.save_data()
+    first = a.data["students"][0]["student_id"]
+    a.enroll_student(first, a.find_course("DBMS"))
+    a.refresh()
+
+    fresh = open_session(backend)
+    ids = [student["student_id"] for student in fresh.data["students"]]
+    assert ids[-2:] == ["X1", "Y1"]
+    assert fresh.find_student("X1")["courses"] == [fresh.find_course("OOP")["course_id"]]
+    assert fresh.find_student("Y1")["courses"] == [fresh.find_course("DBMS")["course_id"]]
+    assert fresh.find_student("Y1")["phone"] == "09999999999"
+    assert fresh.find_course("DBMS")["course_id"] in fresh.find_student(first)["courses"]
+    assert dump(app, a.data) == dump(app, fresh.data)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_refresh_only_reloads_after_another_save(app, open_session, backend):
+    a, b = open_session(backend), open_session(backend)
+    assert not a.refresh()
+    add_student(app, b, "Z1")
+    b.save_data()
+    assert a.refresh()
+    assert a.find_student("Z1") is not None
+    assert not a.refresh()
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from conftest import dump
+
+
+@pytest.mark.parametrize("snapshot_format,compression", [
+    ("compact", "none"), ("binary", "none"), ("binary", "zlib"), ("binary", "lzma"),
+])
+def test_convert_round_trip(app, data_file, tmp_path, snapshot_format, compression):
+    if compression == "lzma" and app.lzma is None:
+        pytest.skip("this Python has no lzma")
+    original = dump(app, app.PlatformAdmin(data_file).data)
+    converted = str(tmp_path / "converted.data")
+    app.convert_snapshot(data_file, converted, snapshot_format, compression)
+    assert dump(app, app.PlatformAdmin(converted).data) == original
+    assert dump(app, app.PlatformAdmin(converted, lazy=True).data) == original
+    back = str(tmp_path / "back.json")
+    app.convert_snapshot(converted, back, "json")
+    assert dump(app, app.PlatformAdmin(back).data) == original
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_corrupt_binary_snapshot_is_reported(app, data_file, tmp_path, capsys, lazy):
+    path = str(tmp_path / "data.bin")
+    app.convert_snapshot(data_file, path, "binary", "zlib")
+    with open(path, "rb") as f:
+        _, directory = app.scan_binary_snapshot(f)
+    start, end, _ = directory["schedules"]
+    with open(path, "r+b") as f:
+        f.seek((start + end) // 2)
+        byte = f.read(1)
+        f.seek(-1, os.SEEK_CUR)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    capsys.readouterr()
+    admin = app.PlatformAdmin(path, lazy=lazy)
+    assert "Data file is corrupt (Checksum mismatch in section 'schedules')" in capsys.readouterr().out
+    assert admin.data["students"] == []
@@ -0,0 +1,21 @@
+from conftest import dump, edit
+
+
+def test_sqlite_round_trip(app, data_file, tmp_path):
+    db_file = str(tmp_path / "data.db")
+    app.migrate_json_to_sqlite(data_file, db_file)
+    admin = app.PlatformAdmin(store=app.SqliteStore(db_file))
+    assert dump(app, admin.data) == dump(app, app.PlatformAdmin(data_file).data)
+    edit(admin)
+    reloaded = app.PlatformAdmin(store=app.SqliteStore(db_file))
+    assert dump(app, reloaded.data) == dump(app, admin.data)
+
+
+def test_sqlite_grade_writes_only_its_row(app, data_file, tmp_path):
+    db_file = str(tmp_path / "data.db")
+    app.migrate_json_to_sqlite(data_file, db_file)
+    admin = app.PlatformAdmin(store=app.SqliteStore(db_file))
+    before = admin.store.bytes_written
+    admin.record_assignment_grade(0, 0, admin.data["students"][0]["student_id"], "77")
+    admin.save_data()
+    assert admin.store.bytes_written - before < 200
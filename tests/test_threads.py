@@ -0,0 +1,62 @@
+import sys
+import threading
+
+import pytest
+
+from conftest import dump
+
+
+@pytest.mark.parametrize("backend", ["journal", "sqlite"])
+def test_threads_share_one_session(app, open_session, backend):
+    admin = open_session(backend)
+    student_ids = [student["student_id"] for student in admin.data["students"]]
+    course = admin.data["courses"][0]
+    errors = []
+
+    def grade(n):
+        try:
+            for round_number in range(20):
+                student_id = student_ids[(n + round_number) % len(student_ids)]
+                admin.record_assignment_grade(0, 0, student_id, str(60 + n))
+                admin.save_data()
+        except Exception as e:  # Reported below; a thread's exception is otherwise lost
+            errors.append(e)
+
+    threads = [threading.Thread(target=grade, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    graded = [entry["student_id"] for entry in course["assignments"][0]["grades"]]
+    assert sorted(graded) == sorted(set(graded))
+    assert dump(app, open_session(backend).data) == dump(app, admin.data)
+
+
+def test_threads_assigning_courses_create_and_assign_each_once(app, data_file):
+    admin = app.PlatformAdmin(data_file)
+    instructor_id = admin.data["instructors"][0]["instructor_id"]
+    courses_before = len(admin.data["courses"])
+    names = [f"Threaded {n}" for n in range(4)]
+
+    def assign(n):
+        instructor = app.Instructor("Threaded", "09123456789", "", "1980-01-01", instructor_id)
+        for name in names:
+            instructor.assign_course({"name": name, "description": "", "assignments": []}, admin)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=assign, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    created = admin.data["courses"][courses_before:]
+    assert sorted(course["name"] for course in created) == names
+    assert len({course["course_id"] for course in admin.data["courses"]}) == len(admin.data["courses"])
+    taught = admin.find_instructor(instructor_id)["courses_taught"]
+    assert len(taught) == len(set(taught))
+    assert {course["course_id"] for course in created} <= set(taught)
@@ -0,0 +1,77 @@
+import pytest
+
+from conftest import add_course, add_student
+
+
+@pytest.fixture
+def admin(app, tmp_path):
+    admin = app.PlatformAdmin(str(tmp_path / "empty.json"))
+    spring = {"start_date": "2030-01-01", "end_date": "2030-06-30"}
+    add_course(admin, "C1", "Algebra", schedule=dict(spring, days=["Monday", "Wednesday"], class_time="9:00 AM"))
+    add_course(admin, "C2", "Biology", schedule=dict(spring, days=["Tuesday"], class_time="2 PM - 3:30 PM"))
+    add_course(admin, "C3", "Chemistry")
+    for student_id in ("s1", "s2"):
+        add_student(app, admin, student_id)
+        admin.enroll_student(student_id, admin.find_course_by_id("C1"))
+    return admin
+
+
+def meetings(timetable):
+    return [(m["weekday"], m["start"], m["end"], m["course_id"]) for m in timetable["meetings"]]
+
+
+def cached(admin, student_id):
+    """Whether the student's timetable is served from the cache."""
+    hits = admin.timetable_hits
+    admin.student_timetable(student_id)
+    return admin.timetable_hits == hits + 1
+
+
+def test_timetables_are_built_once(admin):
+    timetable = admin.student_timetable("s1")
+    assert meetings(timetable) == [(0, 540, 600, "C1"), (2, 540, 600, "C1")]
+    assert timetable["unscheduled"] == []
+    assert admin.student_timetable("s1") is timetable
+    assert (admin.timetable_hits, admin.timetable_misses) == (1, 1)
+    assert admin.student_timetable("nobody") is None
+
+
+def test_enrolling_refreshes_only_that_student(admin):
+    admin.student_timetable("s1")
+    admin.student_timetable("s2")
+    admin.enroll_student("s1", admin.find_course_by_id("C2"))
+    assert cached(admin, "s2")
+    assert not cached(admin, "s1")
+    assert meetings(admin.student_timetable("s1"))[1] == (1, 840, 930, "C2")
+
+
+def test_dropping_a_course_refreshes_the_timetable(admin):
+    admin.enroll_student("s1", admin.find_course_by_id("C2"))
+    admin.student_timetable("s1")
+    admin.apply_change("set", admin.student_path("s1") + ["courses"], ["C2"])
+    assert meetings(admin.student_timetable("s1")) == [(1, 840, 930, "C2")]
+
+
+def test_schedule_changes_refresh_the_course_students(admin):
+    admin.enroll_student("s1", admin.find_course_by_id("C3"))
+    assert admin.student_timetable("s1")["unscheduled"] == ["Chemistry"]
+    admin.student_timetable("s2")
+
+    admin.add_schedule("C3", "2030-01-01", "2030-06-30", "1:00 PM", ["Friday"])
+    assert cached(admin, "s2")
+    timetable = admin.student_timetable("s1")
+    assert (timetable["unscheduled"], meetings(timetable)[-1]) == ([], (4, 780, 840, "C3"))
+
+    algebra = admin.course_position("C1")
+    admin.apply_change("set", ["courses", algebra, "schedule", "class_time"], "11:00 AM")
+    assert not cached(admin, "s2")
+    assert meetings(admin.student_timetable("s2")) == [(0, 660, 720, "C1"), (2, 660, 720, "C1")]
+
+
+def test_assigning_an_instructor_keeps_timetables(app, admin):
+    admin.append_record("instructors", app.Instructor("Teacher", "09123456789", "Street", "1980-01-01",
+                                                      "I1").get_details())
+    admin.student_timetable("s1")
+    with admin.lock.write():
+        admin.assign_teacher("I1", admin.find_course_by_id("C1"))
+    assert cached(admin, "s1")